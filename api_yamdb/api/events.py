@@ -0,0 +1,273 @@
+"""События отзывов и комментариев для /api/v1/titles/{id}/events/.
+
+Создание, изменение и удаление отзывов и комментариев публикуются
+из сигналов (api.signals) через бэкенд EVENTS_BACKEND:
+
+    MemoryBackend    — доставка внутри процесса: тесты и запуск
+                       одним процессом ASGI;
+    PostgresBackend  — NOTIFY в транзакции записи и LISTEN в каждом
+                       процессе ASGI, событие доставляется после COMMIT.
+
+В процессе ASGI Broker раздаёт события потокам SSE (api.sse) и хранит
+последние EVENTS_LOG_SIZE событий. Id события назначается при доставке
+в процесс, а не при записи: транзакции завершаются не в том порядке,
+в котором начинались, и id, выданный до COMMIT, мог бы оказаться
+меньше id уже доставленного события. Клиент, переподключившийся
+с Last-Event-ID, получает пропущенные события из журнала, только если
+это id из журнала того же процесса: id разных процессов не сравниваются,
+часы и задержка доставки у процессов разные. Если id в журнале нет
+(выдан другим процессом, вытеснен, процесс перезапущен) или клиент
+не успевает читать поток, приходит событие reset: списки нужно
+загрузить заново.
+"""
+import asyncio
+import json
+import logging
+import random
+import threading
+import time
+from collections import defaultdict, deque
+
+import psycopg2
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils.module_loading import import_string
+
+from api.serializers import CommentSerializer, ReviewSerializer
+from reviews.models import ArchivedReview, Review
+
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'yamdb_events'
+RESET = {'event': 'reset'}
+# Число номеров процессов в младших разрядах id события
+PROCESS_IDS = 1000
+
+
+class EventIds:
+    """Возрастающие id событий процесса.
+
+    Время доставки в микросекундах и случайный номер процесса
+    в младших разрядах: id разных процессов почти никогда не совпадают.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.last = 0
+        self.process = random.randrange(PROCESS_IDS)
+
+    def __call__(self):
+        with self.lock:
+            self.last = max(self.last + 1, time.time_ns() // 1000)
+            return self.last * PROCESS_IDS + self.process
+
+
+next_id = EventIds()
+
+
+def encode(event):
+    return json.dumps(event, cls=DjangoJSONEncoder, ensure_ascii=False)
+
+
+def build(kind, action, title_id, data, **ids):
+    """Событие kind.action; data не передаётся, если событие
+    не помещается в EVENTS_MAX_PAYLOAD байт (ограничение NOTIFY)."""
+    event = dict(event=f'{kind}.{action}', title=title_id, **ids)
+    if data is not None:
+        with_data = dict(event, data=data)
+        if len(encode(with_data).encode()) <= settings.EVENTS_MAX_PAYLOAD:
+            return with_data
+    return event
+
+
+class Subscription:
+    """Очередь событий одного потока SSE."""
+
+    def __init__(self, title_id, size):
+        self.title_id = title_id
+        self.queue = asyncio.Queue(maxsize=size)
+
+    def offer(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Клиент не успевает читать: очередь заменяется сбросом
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESET)
+
+
+class Broker:
+    """Раздача событий подписчикам процесса и журнал последних событий.
+
+    deliver() вызывается из любого потока, подписчики живут в цикле
+    событий ASGI.
+    """
+
+    def __init__(self, log_size, queue_size):
+        self.log = deque(maxlen=log_size)
+        self.queue_size = queue_size
+        self.subscribers = defaultdict(set)
+        self.lock = threading.Lock()
+        self.loop = None
+
+    def deliver(self, event):
+        """Доставка события: id назначается здесь, в порядке доставки."""
+        with self.lock:
+            event = dict(event, id=next_id())
+            self.log.append(event)
+            subscribers = list(self.subscribers.get(event['title'], ()))
+        for subscription in subscribers:
+            self.loop.call_soon_threadsafe(subscription.offer, event)
+
+    def reset(self):
+        """Сброс всех подписчиков, когда события могли быть потеряны.
+
+        Журнал очищается: продолжить с прежних id уже нельзя.
+        """
+        with self.lock:
+            self.log.clear()
+            subscribers = [
+                subscription
+                for group in self.subscribers.values()
+                for subscription in group
+            ]
+        for subscription in subscribers:
+            self.loop.call_soon_threadsafe(subscription.offer, RESET)
+
+    def subscribe(self, title_id):
+        self.loop = asyncio.get_event_loop()
+        subscription = Subscription(title_id, self.queue_size)
+        with self.lock:
+            self.subscribers[title_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscribers = self.subscribers[subscription.title_id]
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self.subscribers[subscription.title_id]
+
+    def since(self, title_id, event_id):
+        """События произведения после event_id и полнота журнала.
+
+        Журнал полон, только если событие event_id в нём есть.
+        """
+        with self.lock:
+            found, missed = False, []
+            for event in self.log:
+                if found and event['title'] == title_id:
+                    missed.append(event)
+                found = found or event['id'] == event_id
+            return missed, found
+
+
+class MemoryBackend:
+    """Доставка событий в Broker своего процесса."""
+
+    def __init__(self, broker):
+        self.broker = broker
+
+    def publish(self, event):
+        transaction.on_commit(lambda: self.broker.deliver(event))
+
+    async def start(self):
+        pass
+
+
+class PostgresBackend:
+    """Доставка через NOTIFY/LISTEN во все процессы ASGI.
+
+    NOTIFY отправляется в транзакции записи, поэтому подписчики
+    не увидят событий отменённых изменений. Процесс ASGI слушает
+    канал отдельным соединением psycopg2 без потока: сокет соединения
+    опрашивается циклом событий.
+    """
+
+    def __init__(self, broker):
+        self.broker = broker
+        self.listener = None
+        # Дескриптор сокета: у закрытого соединения fileno() недоступен
+        self.fd = None
+        self.starting = None
+
+    def publish(self, event):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT pg_notify(%s, %s)', (CHANNEL, encode(event))
+            )
+
+    async def start(self):
+        if self.starting is None or self.failed():
+            self.starting = asyncio.ensure_future(self.listen())
+        await asyncio.shield(self.starting)
+
+    def failed(self):
+        return self.starting.done() and (
+            self.starting.cancelled() or self.starting.exception()
+        )
+
+    async def listen(self):
+        database = settings.DATABASES['default']
+        loop = asyncio.get_event_loop()
+        self.listener = await loop.run_in_executor(None, lambda: (
+            psycopg2.connect(
+                dbname=database['NAME'], user=database['USER'],
+                password=database['PASSWORD'], host=database['HOST'],
+                port=database['PORT'],
+            )
+        ))
+        self.listener.autocommit = True
+        with self.listener.cursor() as cursor:
+            cursor.execute(f'LISTEN {CHANNEL}')
+        self.fd = self.listener.fileno()
+        loop.add_reader(self.fd, self.receive)
+
+    def receive(self):
+        try:
+            self.listener.poll()
+        except Exception:
+            logger.exception('Соединение LISTEN потеряно, переподключение')
+            self.reconnect()
+            return
+        while self.listener.notifies:
+            notify = self.listener.notifies.pop(0)
+            self.broker.deliver(json.loads(notify.payload))
+
+    def reconnect(self):
+        loop = asyncio.get_event_loop()
+        loop.remove_reader(self.fd)
+        self.listener.close()
+        # События, отправленные без соединения, потеряны
+        self.broker.reset()
+        self.starting = asyncio.ensure_future(self.listen())
+
+
+broker = Broker(settings.EVENTS_LOG_SIZE, settings.EVENTS_QUEUE_SIZE)
+backend = import_string(settings.EVENTS_BACKEND)(broker)
+
+
+def publish(kind, action, title_id, data=None, **ids):
+    backend.publish(build(kind, action, title_id, data, **ids))
+
+
+def publish_record(instance, action):
+    """Событие created, updated или deleted отзыва или комментария.
+
+    Запись может быть и архивной.
+    """
+    data = None
+    if isinstance(instance, (Review, ArchivedReview)):
+        if action != 'deleted':
+            data = ReviewSerializer(instance).data
+        publish('review', action, instance.title_id, data, review=instance.pk)
+        return
+    if action != 'deleted':
+        data = CommentSerializer(instance).data
+    publish(
+        'comment', action, instance.review.title_id, data,
+        review=instance.review_id, comment=instance.pk,
+    )
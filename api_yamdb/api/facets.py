@@ -0,0 +1,98 @@
+"""Количество произведений по жанрам, категориям и годам.
+
+Каждый фасет считается одним сгруппированным запросом по произведениям,
+отобранным TitleFilter без параметра самого фасета: при выбранном жанре
+остальные жанры показывают, сколько произведений будет после
+переключения на них. Результат кэшируется по нормализованным параметрам
+фильтра и версии каталога, которая увеличивается при любом изменении
+произведений, жанров и категорий.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from rest_framework.exceptions import ValidationError
+
+from api.filters import TitleFilter
+from reviews.models import Category, Genre, Title
+
+
+VERSION_KEY = 'titles:catalog_version'
+
+
+def catalog_version():
+    return cache.get(VERSION_KEY, 0)
+
+
+def bump_catalog_version():
+    """Сброс всех закэшированных фасетов сменой версии."""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, 1, timeout=None)
+
+
+def filter_params(query_params):
+    """Непустые параметры TitleFilter в постоянном порядке."""
+    return {
+        name: query_params[name]
+        for name in sorted(TitleFilter.base_filters)
+        if query_params.get(name)
+    }
+
+
+def cache_key(params):
+    signature = '&'.join(f'{name}={value}' for name, value in params.items())
+    digest = hashlib.md5(signature.encode()).hexdigest()
+    return f'titles:facets:{catalog_version()}:{digest}'
+
+
+def filtered(params, without=None):
+    """Произведения по фильтру без параметра without."""
+    data = {name: value for name, value in params.items() if name != without}
+    filterset = TitleFilter(data=data, queryset=Title.objects.all())
+    if not filterset.is_valid():
+        raise ValidationError(filterset.errors)
+    return filterset.qs.order_by().values('pk')
+
+
+def count_facet(model, relation, titles):
+    return [
+        {'slug': slug, 'name': name, 'count': count}
+        for slug, name, count in model.objects.annotate(
+            count=Count(relation, filter=Q(**{f'{relation}__in': titles}))
+        ).order_by('slug').values_list('slug', 'name', 'count')
+    ]
+
+
+def year_facet(titles):
+    return [
+        {'year': year, 'count': count}
+        for year, count in Title.objects.filter(pk__in=titles)
+        .order_by('year').values('year')
+        .annotate(count=Count('pk')).values_list('year', 'count')
+    ]
+
+
+def compute(params):
+    return {
+        'count': filtered(params).count(),
+        'genre': count_facet(
+            Genre, 'titlegenre__title', filtered(params, 'genre')
+        ),
+        'category': count_facet(
+            Category, 'category', filtered(params, 'category')
+        ),
+        'year': year_facet(filtered(params, 'year')),
+    }
+
+
+def title_facets(query_params):
+    params = filter_params(query_params)
+    key = cache_key(params)
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute(params)
+        cache.set(key, facets, settings.FACETS_CACHE_TIMEOUT)
+    return facets
@@ -1,13 +1,25 @@
 import django_filters as filters
-from reviews.models import Title
+from django.db.models import Exists, OuterRef
+
+from reviews.models import Title, TitleGenre
 
 
 class TitleFilter(filters.FilterSet):
     category = filters.CharFilter(field_name='category__slug')
-    genre = filters.CharFilter(field_name='genre__slug')
+    genre = filters.CharFilter(method='filter_genre')
     name = filters.CharFilter(field_name="name", lookup_expr='icontains')
     year = filters.NumberFilter(field_name='year')
 
     class Meta:
         model = Title
         fields = ('category', 'genre', 'name', 'year')
+
+    def filter_genre(self, queryset, name, value):
+        """Фильтр подзапросом EXISTS по индексу (genre, title).
+
+        JOIN со связями вернул бы произведение несколько раз и
+        потребовал бы DISTINCT.
+        """
+        return queryset.annotate(in_genre=Exists(
+            TitleGenre.objects.filter(title=OuterRef('pk'), genre__slug=value)
+        )).filter(in_genre=True)
@@ -0,0 +1,31 @@
+from django.core.management import BaseCommand
+
+from reviews.archive import archive
+
+
+class Command(BaseCommand):
+    help = ('Переносит отзывы старше заданного срока вместе '
+            'с комментариями в архивные таблицы, пачками')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int,
+            help='Возраст отзывов в днях, по умолчанию ARCHIVE_AFTER_DAYS'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int,
+            help='Отзывов в пачке, по умолчанию ARCHIVE_CHUNK_SIZE'
+        )
+
+    def handle(self, *args, **options):
+        moved = archive(options['days'], options['chunk_size'], self.report)
+        self.stdout.write(self.style.SUCCESS(
+            'Готово. ' + self.format(moved)
+        ))
+
+    def format(self, moved):
+        return (f'Перенесено отзывов: {moved["reviews"]}, '
+                f'комментариев: {moved["comments"]}')
+
+    def report(self, moved):
+        self.stdout.write(self.format(moved))
@@ -0,0 +1,44 @@
+from datetime import timedelta
+
+from django.core.management import BaseCommand
+from django.utils import timezone
+
+from reviews.similarity import build, changed_titles
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает похожие произведения по оценкам пользователей, '
+            'для всех или только для изменившихся за последние часы')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since-hours', type=float,
+            help='Только произведения, оцененные авторами отзывов '
+                 'за этот срок, и произведения, в списках которых они есть'
+        )
+        parser.add_argument(
+            '--block-size', type=int,
+            help='Произведений в блоке, по умолчанию '
+                 'RECOMMENDATIONS_BLOCK_SIZE'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int,
+            help='Отзывов в пачке, по умолчанию RECOMMENDATIONS_CHUNK_SIZE'
+        )
+
+    def handle(self, *args, **options):
+        titles = None
+        if options['since_hours'] is not None:
+            titles = changed_titles(
+                timezone.now() - timedelta(hours=options['since_hours'])
+            )
+            if not titles:
+                self.stdout.write('Новых отзывов нет')
+                return
+        saved = build(
+            titles, options['block_size'], options['chunk_size'], self.report
+        )
+        self.stdout.write(self.style.SUCCESS(f'Сохранено пар: {saved}'))
+
+    def report(self, done, total):
+        self.stdout.write(f'Произведений: {done} из {total}')
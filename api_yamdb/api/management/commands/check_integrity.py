@@ -0,0 +1,68 @@
+import itertools
+import multiprocessing
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.db import connections
+
+from reviews.integrity import CHECKS, key_ranges, merge, run
+
+
+class Command(BaseCommand):
+    help = ('Проверяет счётчики, ссылки и повторы отзывов пачками '
+            'по первичному ключу и при --repair исправляет нарушения')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='append', choices=sorted(CHECKS),
+            help='Только эта проверка, можно указать несколько раз'
+        )
+        parser.add_argument(
+            '--repair', action='store_true', help='Исправить нарушения'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=settings.INTEGRITY_CHUNK_SIZE,
+            help='Записей в пачке, по умолчанию INTEGRITY_CHUNK_SIZE'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Процессов, между которыми делится диапазон ключей'
+        )
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        if workers > 1:
+            # Процессы откроют свои соединения с БД
+            connections.close_all()
+            pool = multiprocessing.Pool(workers)
+            starmap = pool.starmap
+        else:
+            pool, starmap = None, itertools.starmap
+        try:
+            left = sum(
+                self.run_check(name, starmap, options)
+                for name in options['check'] or CHECKS
+            )
+        finally:
+            if pool is not None:
+                pool.close()
+        if left:
+            raise CommandError(
+                f'Не исправлено нарушений: {left}, запустите с --repair'
+            )
+        self.stdout.write(self.style.SUCCESS('Нарушений не осталось'))
+
+    def run_check(self, name, starmap, options):
+        """Проверка name, возвращает количество неисправленных нарушений."""
+        ranges = key_ranges(CHECKS[name].model, options['workers'])
+        result = merge(starmap(run, [
+            (name, start, stop, options['chunk_size'], options['repair'])
+            for start, stop in ranges
+        ]))
+        line = f'{name}: нарушений {result["found"]}'
+        if result['found']:
+            line += f', например id {result["sample"]}'
+        if options['repair']:
+            line += f', исправлено {result["repaired"]}'
+        self.stdout.write(line)
+        return result['found'] - result['repaired']
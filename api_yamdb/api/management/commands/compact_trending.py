@@ -0,0 +1,18 @@
+from django.core.management import BaseCommand
+
+from reviews.trending import compact
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает популярность произведений по отзывам '
+            'за TRENDING_WINDOW. Запускается периодически, например '
+            'раз в сутки, и после развёртывания')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        count = compact(options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Популярных произведений: {count}'
+        ))
@@ -0,0 +1,67 @@
+import os
+from datetime import datetime, time
+
+from django.core.management import BaseCommand
+from django.utils import timezone
+
+from reviews import trending
+from reviews.counters import refresh_review_counters, refresh_title_counters
+from reviews.generator import Generator, insert, next_ids, write_csv
+
+
+def end_date(value):
+    return timezone.make_aware(
+        datetime.combine(datetime.strptime(value, '%Y-%m-%d'), time()),
+        timezone.utc,
+    )
+
+
+class Command(BaseCommand):
+    help = ('Генерирует синтетические данные для проверки под нагрузкой: '
+            'CSV-файлы в формате static/data или вставка в базу')
+
+    def add_arguments(self, parser):
+        target = parser.add_mutually_exclusive_group(required=True)
+        target.add_argument(
+            '--output', help='Каталог для CSV-файлов'
+        )
+        target.add_argument(
+            '--insert', action='store_true',
+            help='Вставить записи в базу после существующих'
+        )
+        parser.add_argument(
+            '--scale', type=float, default=1,
+            help='Множитель количеств: при 1 — 1000 пользователей, '
+                 '500 произведений, 20000 отзывов, 10000 комментариев'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--end', type=end_date,
+            help='Дата последнего отзыва, ГГГГ-ММ-ДД, по умолчанию сегодня'
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        end = options['end'] or end_date(f'{timezone.now().date()}')
+        if options['insert']:
+            generator = Generator(
+                options['seed'], options['scale'], end, next_ids()
+            )
+            counts = insert(generator, options['batch_size'], self.report)
+            # Вставка идёт без сигналов, счётчики пересчитываются целиком
+            refresh_title_counters()
+            refresh_review_counters()
+            trending.compact()
+        else:
+            os.makedirs(options['output'], exist_ok=True)
+            generator = Generator(options['seed'], options['scale'], end)
+            counts = write_csv(generator, options['output'], self.report)
+        self.stdout.write(self.style.SUCCESS('Готово. ' + self.format(counts)))
+
+    def format(self, counts):
+        return ', '.join(
+            f'{table}: {count}' for table, count in counts.items()
+        )
+
+    def report(self, counts):
+        self.stdout.write(self.format(counts))
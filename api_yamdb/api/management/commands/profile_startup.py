@@ -0,0 +1,102 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+
+SCRIPT = 'from api_yamdb.startup import main; main()'
+
+
+def parse_importtime(output):
+    """Строки -X importtime: [(модуль, собственное, суммарное время в мкс)]."""
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        if not own.strip().isdigit():
+            continue
+        modules.append((name.strip(), int(own), int(cumulative)))
+    return modules
+
+
+class Command(BaseCommand):
+    help = ('Замеряет запуск процесса: время импорта по пакетам, этапы '
+            'django.setup() и первый запрос с прогревом и без')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', action='append', dest='paths',
+            help='Путь первого запроса и прогрева, по умолчанию WARMUP_PATHS'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=3,
+            help='Количество запусков, берётся медиана'
+        )
+        parser.add_argument(
+            '--top', type=int, default=15,
+            help='Сколько самых медленных модулей показать'
+        )
+
+    def run(self, mode, paths, importtime=False):
+        command = [sys.executable]
+        if importtime:
+            command += ['-X', 'importtime']
+        command += ['-c', SCRIPT, mode, *paths]
+        env = dict(os.environ, PYTHONPATH=str(settings.BASE_DIR))
+        result = subprocess.run(
+            command, cwd=settings.BASE_DIR, env=env,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            universal_newlines=True
+        )
+        if result.returncode:
+            raise CommandError(result.stderr)
+        return json.loads(result.stdout.splitlines()[-1]), result.stderr
+
+    def phases(self, mode, paths, repeat):
+        """Медиана длительности каждого этапа по repeat запускам."""
+        runs = defaultdict(list)
+        for _ in range(repeat):
+            phases, _ = self.run(mode, paths)
+            for name, duration in phases:
+                runs[name].append(duration)
+        return {name: statistics.median(values)
+                for name, values in runs.items()}
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or list(settings.WARMUP_PATHS)
+        _, output = self.run('warm', paths, importtime=True)
+        self.write_imports(parse_importtime(output), options['top'])
+
+        cold = self.phases('cold', paths, options['repeat'])
+        warm = self.phases('warm', paths, options['repeat'])
+        self.stdout.write('\nЭтапы запуска, мс (без прогрева / с прогревом):')
+        for name in warm:
+            cold_value = f'{cold[name]:9.1f}' if name in cold else ' ' * 9
+            self.stdout.write(f'  {name:<16}{cold_value} {warm[name]:9.1f}')
+        self.stdout.write(self.style.SUCCESS(
+            f'\nПервый запрос {paths[0]}: {cold["first request"]:.1f} мс '
+            f'без прогрева, {warm["first request"]:.1f} мс после прогрева'
+        ))
+
+    def write_imports(self, modules, top):
+        packages = defaultdict(int)
+        for name, own, _ in modules:
+            packages[name.split('.')[0]] += own
+        total = sum(packages.values())
+        self.stdout.write(f'Импорт модулей: {total / 1000:.1f} мс')
+        self.stdout.write('По пакетам (собственное время), мс:')
+        for name, own in sorted(
+            packages.items(), key=lambda item: -item[1]
+        )[:top]:
+            self.stdout.write(f'  {name:<32}{own / 1000:9.1f}')
+        self.stdout.write('Самые медленные модули (с зависимостями), мс:')
+        for name, _, cumulative in sorted(
+            modules, key=lambda item: -item[2]
+        )[:top]:
+            self.stdout.write(f'  {name:<48}{cumulative / 1000:9.1f}')
@@ -0,0 +1,24 @@
+from django.core.management import BaseCommand, CommandError
+
+from api import snapshots
+
+
+class Command(BaseCommand):
+    help = 'Публикует JSON-снимки каталога для nginx'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'sections', nargs='*',
+            help='Разделы каталога: genres, categories, titles. '
+                 'По умолчанию все'
+        )
+
+    def handle(self, *args, **options):
+        sections = options['sections'] or snapshots.SNAPSHOT_SECTIONS
+        unknown = set(sections) - set(snapshots.SNAPSHOT_SECTIONS)
+        if unknown:
+            raise CommandError(f'Неизвестные разделы: {", ".join(unknown)}')
+        total = snapshots.publish(sections)
+        self.stdout.write(
+            self.style.SUCCESS(f'Опубликовано снимков: {total}')
+        )
@@ -0,0 +1,54 @@
+from django.core.management import BaseCommand, CommandError
+
+from api.tasks import purge_title_task, purge_user_task
+from jobs.queue import enqueue
+from reviews.models import Title, User
+
+
+class Command(BaseCommand):
+    help = ('Удаляет пользователя или произведение со всеми отзывами '
+            'и комментариями пачками, с выводом прогресса')
+
+    def add_arguments(self, parser):
+        target = parser.add_mutually_exclusive_group(required=True)
+        target.add_argument('--user', help='username пользователя')
+        target.add_argument('--title', type=int, help='id произведения')
+        parser.add_argument(
+            '--chunk-size', type=int,
+            help='Размер пачки, по умолчанию PURGE_CHUNK_SIZE'
+        )
+        parser.add_argument(
+            '--background', action='store_true',
+            help='Поставить удаление в очередь задач'
+        )
+
+    def handle(self, *args, **options):
+        if options['user']:
+            pk = User.objects.filter(
+                username=options['user']
+            ).values_list('pk', flat=True).first()
+            if pk is None:
+                raise CommandError('Пользователь не найден')
+            name, task = 'purge_user', purge_user_task
+        else:
+            pk = options['title']
+            if not Title.objects.filter(pk=pk).exists():
+                raise CommandError('Произведение не найдено')
+            name, task = 'purge_title', purge_title_task
+
+        if options['background']:
+            enqueue(name, {'pk': pk}, idempotency_key=f'{name}:{pk}')
+            self.stdout.write('Удаление поставлено в очередь')
+            return
+
+        deleted = task(pk, options['chunk_size'], self.report)
+        self.stdout.write(self.style.SUCCESS(
+            'Готово. ' + self.format(deleted)
+        ))
+
+    def format(self, deleted):
+        return (f'Удалено отзывов: {deleted["reviews"]}, '
+                f'комментариев: {deleted["comments"]}')
+
+    def report(self, deleted):
+        self.stdout.write(self.format(deleted))
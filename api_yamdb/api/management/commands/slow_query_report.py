@@ -0,0 +1,94 @@
+import json
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from api.querylog import normalize
+
+
+def read_records(lines):
+    """Записи журнала медленных запросов; прочие строки пропускаются."""
+    for line in lines:
+        start = line.find('{')
+        if start == -1:
+            continue
+        try:
+            record = json.loads(line[start:])
+        except ValueError:
+            continue
+        if isinstance(record, dict) and record.get('event') == 'slow_query':
+            yield record
+
+
+def summarize(records):
+    groups = defaultdict(lambda: {
+        'durations': [], 'views': defaultdict(int), 'explain': None
+    })
+    for record in records:
+        group = groups[record['fingerprint']]
+        group['durations'].append(record['duration_ms'])
+        group['views'][record.get('view') or '-'] += 1
+        group['sql'] = record['sql']
+        if record.get('explain') is not None:
+            group['explain'] = record['explain']
+    return groups
+
+
+class Command(BaseCommand):
+    help = ('Сводка журнала медленных запросов по нормализованным '
+            'запросам, отсортированная по суммарному времени')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'file', nargs='?',
+            help='Файл журнала или - для stdin, по умолчанию SLOW_QUERY_LOG'
+        )
+        parser.add_argument('--top', type=int, default=10)
+        parser.add_argument(
+            '--explain', action='store_true',
+            help='Показать последний план EXPLAIN для каждого запроса'
+        )
+
+    def handle(self, *args, **options):
+        path = options['file'] or settings.SLOW_QUERY_LOG
+        if not path:
+            raise CommandError('Укажите файл журнала или SLOW_QUERY_LOG')
+        if path == '-':
+            groups = summarize(read_records(sys.stdin))
+        else:
+            try:
+                with open(path, encoding='utf-8') as log:
+                    groups = summarize(read_records(log))
+            except OSError as error:
+                raise CommandError(error)
+        if not groups:
+            self.stdout.write('Медленных запросов нет')
+            return
+
+        ranked = sorted(
+            groups.items(), key=lambda item: -sum(item[1]['durations'])
+        )
+        for fingerprint, group in ranked[:options['top']]:
+            self.write_group(fingerprint, group, options['explain'])
+
+    def write_group(self, fingerprint, group, explain):
+        durations = sorted(group['durations'])
+        p95 = durations[min(len(durations) - 1, int(len(durations) * 0.95))]
+        views = ', '.join(
+            f'{view} ({count})' for view, count in sorted(
+                group['views'].items(), key=lambda item: -item[1]
+            )
+        )
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'{fingerprint}: {len(durations)} раз, '
+            f'всего {sum(durations):.0f} мс, '
+            f'среднее {sum(durations) / len(durations):.1f} мс, '
+            f'p95 {p95:.1f} мс, максимум {durations[-1]:.1f} мс'
+        ))
+        self.stdout.write(f'  view: {views}')
+        self.stdout.write(f'  {normalize(group["sql"])}')
+        if explain and group['explain'] is not None:
+            self.stdout.write(json.dumps(group['explain'], indent=2))
+        self.stdout.write('')
@@ -0,0 +1,14 @@
+from django.core.management import BaseCommand
+
+from api.throttling import rejected_counts
+
+
+class Command(BaseCommand):
+    help = 'Показывает количество запросов, отклонённых ограничением частоты'
+
+    def handle(self, *args, **options):
+        counts = rejected_counts()
+        if not counts:
+            self.stdout.write('Отклонённых запросов нет')
+        for key, count in sorted(counts.items()):
+            self.stdout.write(f'{key}: {count}')
@@ -0,0 +1,145 @@
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_string
+
+from api.profiling import is_admin, profile_request, requested_modes
+from api.querylog import QueryLog, view_name
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def parse_accept_encoding(header):
+    """'gzip;q=0.5, br' -> {'gzip': 0.5, 'br': 1.0}"""
+    accepted = {}
+    for item in header.split(','):
+        coding, *params = (part.strip() for part in item.split(';'))
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding.lower()] = quality
+    return accepted
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Сжатие ответов brotli или gzip.
+
+    Сжимаются ответы с типом из COMPRESSION_CONTENT_TYPES, размер которых
+    не меньше COMPRESSION_MIN_LENGTH. HTML не сжимается: в страницах
+    с CSRF-токеном и отражённым вводом сжатие открывает атаку BREACH.
+    Кодировка выбирается по q из Accept-Encoding, при равных q —
+    в порядке COMPRESSION_ENCODINGS; brotli — только если установлен
+    пакет Brotli.
+    Статику и JSON-снимки каталога сжимает nginx.
+    """
+
+    def compress(self, encoding, content):
+        if encoding == 'br':
+            return brotli.compress(
+                content, quality=settings.COMPRESSION_BROTLI_QUALITY
+            )
+        return compress_string(content)
+
+    def select_encoding(self, request):
+        """Кодировка с наибольшим q из Accept-Encoding.
+
+        При равных q выбирается первая в COMPRESSION_ENCODINGS,
+        кодировки с q=0 не используются.
+        """
+        accepted = parse_accept_encoding(
+            request.META.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        best, best_quality = None, 0
+        for encoding in settings.COMPRESSION_ENCODINGS:
+            if encoding == 'br' and brotli is None:
+                continue
+            quality = accepted.get(encoding, accepted.get('*', 0))
+            if quality > best_quality:
+                best, best_quality = encoding, quality
+        return best
+
+    def is_compressible(self, response):
+        content_type = response.get('Content-Type', '').split(';')[0]
+        return (
+            not response.streaming
+            and not response.has_header('Content-Encoding')
+            and content_type in settings.COMPRESSION_CONTENT_TYPES
+            and len(response.content) >= settings.COMPRESSION_MIN_LENGTH
+        )
+
+    def process_response(self, request, response):
+        if not self.is_compressible(response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = self.select_encoding(request)
+        if encoding is None:
+            return response
+        compressed = self.compress(encoding, response.content)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
+
+
+class SlowQueryLogMiddleware:
+    """Журнал медленных запросов к БД, см. api.querylog.
+
+    Отключается пустым SLOW_QUERY_MS.
+    """
+
+    def __init__(self, get_response):
+        if settings.SLOW_QUERY_MS is None:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.query_log = QueryLog(
+            settings.SLOW_QUERY_MS, settings.SLOW_QUERY_EXPLAIN_RATE
+        )
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(request.query_log)
+                )
+            return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_log.view = view_name(request, view_func)
+
+
+class ProfilingMiddleware:
+    """Профилирование запроса по заголовку X-Profile или ?profile=.
+
+    Доступно только администраторам, см. api.profiling.
+    Без PROFILING_ENABLED middleware не подключается.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        modes = requested_modes(request)
+        if modes is None or not is_admin(request):
+            return self.get_response(request)
+        return profile_request(request, self.get_response, modes)
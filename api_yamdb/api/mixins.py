@@ -0,0 +1,190 @@
+from django.db.models import Prefetch
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from rest_framework import serializers, status
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from api.events import publish_record
+from jobs.queue import HANDLERS, enqueue
+from reviews.archive import ORDERING, HotArchiveList
+from reviews.deletion import Purge, is_large
+from reviews.models import Comment, Review
+from reviews.moderation import set_hidden
+
+
+# Методы, которые находят запись и в архиве
+ARCHIVE_METHODS = (*SAFE_METHODS, 'DELETE')
+
+
+class SparseQuerysetMixin:
+    """Загрузка из БД только тех данных, что попадут в ответ.
+
+    По полям сериализатора (с учётом ?fields= и ?omit=) строятся only(),
+    select_related() для внешних ключей и prefetch_related() для
+    many-to-many. Для пропущенных вложенных полей JOIN и дополнительные
+    запросы не выполняются. Поля-свойства модели, зависящие от колонок,
+    описываются в Meta.source_fields сериализатора.
+    """
+
+    def get_queryset(self):
+        return self.sparse_queryset(super().get_queryset())
+
+    def sparse_queryset(self, queryset):
+        if self.request is None or self.request.method not in SAFE_METHODS:
+            return queryset
+        serializer = self.get_serializer()
+        opts = queryset.model._meta
+        concrete = {field.name: field for field in opts.concrete_fields}
+        many_to_many = {field.name: field for field in opts.many_to_many}
+        source_fields = getattr(serializer.Meta, 'source_fields', {})
+        only = {opts.pk.name}
+        for field in serializer.fields.values():
+            source = field.source
+            only.update(source_fields.get(source, ()))
+            if source in many_to_many:
+                queryset = queryset.prefetch_related(
+                    self.related_prefetch(many_to_many[source], field)
+                )
+            elif source in concrete:
+                only.add(source)
+                related = self.related_only(field)
+                if concrete[source].is_relation and related:
+                    queryset = queryset.select_related(source)
+                    only.update(f'{source}__{name}' for name in related)
+        return queryset.only(*only)
+
+    @staticmethod
+    def related_only(field):
+        """Колонки связанной модели, которые читает поле сериализатора."""
+        if isinstance(field, serializers.ListSerializer):
+            field = field.child
+        if isinstance(field, serializers.Serializer):
+            return [
+                child.source for child in field.fields.values()
+                if child.source != '*'
+            ]
+        if isinstance(field, serializers.SlugRelatedField):
+            return [field.slug_field]
+        return []
+
+    def related_prefetch(self, model_field, field):
+        related_model = model_field.related_model
+        only = {related_model._meta.pk.name, *self.related_only(field)}
+        return Prefetch(
+            model_field.name,
+            queryset=related_model.objects.only(*only)
+        )
+
+
+class ParentLookupMixin:
+    """Родительская запись из URL: произведение отзывов, отзыв комментариев.
+
+    Записи запоминаются на время запроса; подзапросы /batch/ разделяют
+    их между собой и не повторяют одинаковые запросы к БД.
+    """
+
+    def get_parent(self, model, **lookup):
+        request = self.request._request
+        if not hasattr(request, 'parents'):
+            request.parents = {}
+        key = (model, tuple(sorted(lookup.items())))
+        if key not in request.parents:
+            request.parents[key] = get_object_or_404(model, **lookup)
+        return request.parents[key]
+
+
+class ArchiveMixin:
+    """Чтение архивных записей после записей основной таблицы.
+
+    Список сначала читает основную таблицу и обращается к архиву,
+    только когда страница выходит за неё. Архивную запись можно
+    получить по id и удалить (чужую модератор скрывает), но не изменить.
+    Наследник описывает архив в get_archive_queryset и может вернуть
+    общее количество записей из счётчиков в get_archive_count.
+    """
+
+    def get_archive_queryset(self):
+        raise NotImplementedError
+
+    def get_archive_count(self):
+        return None
+
+    def list(self, request, *args, **kwargs):
+        records = HotArchiveList(
+            self.filter_queryset(self.get_queryset()).order_by(*ORDERING),
+            self.sparse_queryset(
+                self.get_archive_queryset()
+            ).order_by(*ORDERING),
+            self.get_archive_count(),
+        )
+        page = self.paginate_queryset(records)
+        if page is None:
+            serializer = self.get_serializer(records[:], many=True)
+            return Response(serializer.data)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    def get_object(self):
+        try:
+            return super().get_object()
+        except Http404:
+            if self.request.method not in ARCHIVE_METHODS:
+                raise
+        instance = get_object_or_404(
+            self.sparse_queryset(self.get_archive_queryset()),
+            pk=self.kwargs[self.lookup_url_kwarg or self.lookup_field],
+        )
+        self.check_object_permissions(self.request, instance)
+        return instance
+
+
+class PurgeMixin:
+    """Удаление объекта вместе с отзывами и комментариями.
+
+    Обычно удаление выполняется сразу пачками (см. reviews.deletion).
+    Если связанных строк больше PURGE_SYNC_LIMIT, удаление ставится
+    в очередь задачей purge_task и ответ — 202 вместо 204.
+    """
+    purge_task = None
+
+    def get_purge_querysets(self, instance):
+        """Связанные строки, объём которых решает, удалять ли в фоне."""
+        return ()
+
+    def destroy(self, request, *args, **kwargs):
+        instance = self.get_object()
+        if any(map(is_large, self.get_purge_querysets(instance))):
+            self.perform_background_destroy(instance)
+            return Response(status=status.HTTP_202_ACCEPTED)
+        self.perform_destroy(instance)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def perform_destroy(self, instance):
+        HANDLERS[self.purge_task](pk=instance.pk)
+
+    def perform_background_destroy(self, instance):
+        enqueue(
+            self.purge_task,
+            {'pk': instance.pk},
+            idempotency_key=f'{self.purge_task}:{instance.pk}'
+        )
+
+
+class HideOnDestroyMixin:
+    """Удаление чужой записи модератором скрывает её.
+
+    Скрытые записи попадают в очередь модерации, где их можно
+    восстановить или удалить окончательно. Автор удаляет свою запись сразу,
+    архивную — через reviews.deletion, со счётчиками и событиями.
+    """
+
+    def perform_destroy(self, instance):
+        if instance.author_id == self.request.user.pk:
+            if isinstance(instance, (Review, Comment)):
+                super().perform_destroy(instance)
+            else:
+                Purge().record(instance)
+        else:
+            if set_hidden(instance, True):
+                publish_record(instance, 'deleted')
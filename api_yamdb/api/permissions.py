@@ -46,3 +46,13 @@ class ModeratorPermission(permissions.BasePermission):
             request.method in permissions.SAFE_METHODS
             or user.is_authenticated and not user.is_moderator
         )
+
+
+class IsAdminOrModerator(permissions.BasePermission):
+    """Доступ только для модераторов и администраторов."""
+
+    def has_permission(self, request, view):
+        user = request.user
+        return (
+            user.is_authenticated and (user.is_admin or user.is_moderator)
+        )
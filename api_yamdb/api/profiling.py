@@ -0,0 +1,169 @@
+"""Профилирование отдельных запросов к API.
+
+Администратор включает профилирование заголовком X-Profile или
+параметром ?profile= со значением cprofile, sample или all (также 1).
+Результат сохраняется в PROFILING_ROOT/<id>/:
+
+    profile.pstats    — cProfile, открывается pstats или snakeviz;
+    stacks.collapsed  — стеки семплирующего профилировщика в формате
+                        flamegraph.pl и speedscope;
+    request.json      — запрос, ответ и SQL-запросы с отметками времени.
+
+id возвращается в заголовке X-Profile-Id, итоги — в Server-Timing.
+"""
+import cProfile
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+
+MODES = {
+    '1': ('cprofile', 'sample'),
+    'all': ('cprofile', 'sample'),
+    'cprofile': ('cprofile',),
+    'sample': ('sample',),
+}
+
+
+def requested_modes(request):
+    value = request.META.get('HTTP_X_PROFILE') or request.GET.get('profile')
+    return MODES.get(value)
+
+
+def is_admin(request):
+    """Проверка JWT до DRF: профилирование доступно только админам."""
+    try:
+        authenticated = JWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return False
+    return authenticated is not None and authenticated[0].is_admin
+
+
+def collapse(frame):
+    """Стек кадра одной строкой: модуль:функция;модуль:функция..."""
+    names = []
+    while frame is not None:
+        module = frame.f_globals.get('__name__', '?')
+        names.append(f'{module}:{frame.f_code.co_name}')
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class Sampler(threading.Thread):
+    """Периодический снимок стека потока, обрабатывающего запрос."""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[collapse(frame)] += 1
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+class SQLTimeline:
+    """Обёртка execute_wrapper: SQL с началом и длительностью в мс."""
+
+    def __init__(self, started):
+        self.started = started
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'start_ms': round((started - self.started) * 1000, 2),
+                'duration_ms': round(
+                    (time.perf_counter() - started) * 1000, 2
+                ),
+                'database': context['connection'].alias,
+                'sql': sql,
+            })
+
+
+def prune(root, keep):
+    """Удаление старых профилей сверх keep последних."""
+    profiles = sorted(
+        (entry for entry in os.scandir(root) if entry.is_dir()),
+        key=lambda entry: entry.name
+    )
+    for entry in profiles[:-keep]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def save(profile_id, summary, profiler, sampler):
+    directory = os.path.join(settings.PROFILING_ROOT, profile_id)
+    os.makedirs(directory)
+    if profiler is not None:
+        profiler.dump_stats(os.path.join(directory, 'profile.pstats'))
+    if sampler is not None:
+        with open(os.path.join(directory, 'stacks.collapsed'), 'w') as file:
+            for stack, count in sampler.stacks.most_common():
+                file.write(f'{stack} {count}\n')
+    with open(os.path.join(directory, 'request.json'), 'w') as file:
+        json.dump(summary, file, ensure_ascii=False, indent=2)
+    prune(settings.PROFILING_ROOT, settings.PROFILING_KEEP)
+
+
+def profile_request(request, get_response, modes):
+    """Выполнение запроса под профилировщиками из modes."""
+    profile_id = f'{time.strftime("%Y%m%d-%H%M%S")}-{uuid.uuid4().hex[:8]}'
+    started = time.perf_counter()
+    timeline = SQLTimeline(started)
+    profiler = cProfile.Profile() if 'cprofile' in modes else None
+    sampler = None
+    if 'sample' in modes:
+        sampler = Sampler(
+            threading.get_ident(), settings.PROFILING_SAMPLE_INTERVAL
+        )
+
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(timeline))
+        if sampler is not None:
+            sampler.start()
+            stack.callback(sampler.stop)
+        if profiler is not None:
+            profiler.enable()
+            stack.callback(profiler.disable)
+        response = get_response(request)
+
+    duration = (time.perf_counter() - started) * 1000
+    sql_duration = sum(query['duration_ms'] for query in timeline.queries)
+    save(profile_id, {
+        'method': request.method,
+        'path': request.get_full_path(),
+        'status': response.status_code,
+        'modes': modes,
+        'duration_ms': round(duration, 2),
+        'sql_duration_ms': round(sql_duration, 2),
+        'queries': timeline.queries,
+    }, profiler, sampler)
+    response['X-Profile-Id'] = profile_id
+    response['Server-Timing'] = (
+        f'total;dur={duration:.1f}, '
+        f'sql;dur={sql_duration:.1f};desc="{len(timeline.queries)} queries"'
+    )
+    return response
@@ -0,0 +1,159 @@
+"""Журнал медленных запросов к БД.
+
+Запросы дольше SLOW_QUERY_MS пишутся в логгер api.querylog одной строкой
+JSON: SQL, отпечаток нормализованного запроса и параметров, длительность,
+view, из которого выполнен запрос, и короткий стек вызовов из кода
+проекта. Для доли SLOW_QUERY_EXPLAIN_RATE медленных SELECT на PostgreSQL
+к записи добавляется план EXPLAIN (ANALYZE, BUFFERS). Запрос при этом
+выполняется повторно, поэтому доля по умолчанию нулевая.
+
+Сводку по отпечаткам строит manage.py slow_query_report.
+"""
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import time
+import traceback
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+
+
+logger = logging.getLogger(__name__)
+
+STACK_DEPTH = 5
+# Кадры самого журнала в стек не попадают
+OWN_FILES = {
+    os.path.abspath(__file__),
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'middleware.py'),
+}
+
+NORMALIZE = (
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'%s'), '?'),
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)'), '(...)'),
+    (re.compile(r'\s+'), ' '),
+)
+
+
+def normalize(sql):
+    """SQL без значений.
+
+    Литералы и параметры заменяются на ?, а списки IN (?, ?, ...)
+    сворачиваются, чтобы запросы с разным числом параметров
+    попадали в одну группу.
+    """
+    for pattern, replacement in NORMALIZE:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def digest(value):
+    return hashlib.md5(value.encode()).hexdigest()[:16]
+
+
+def fingerprint(sql):
+    return digest(normalize(sql))
+
+
+def view_name(request, view_func):
+    """Имя view для журнала: TitleViewSet.list, TokenViewSet.post."""
+    cls = getattr(view_func, 'cls', None)
+    if cls is None:
+        return f'{view_func.__module__}.{view_func.__qualname__}'
+    method = request.method.lower()
+    actions = getattr(view_func, 'actions', None) or {}
+    return f'{cls.__name__}.{actions.get(method, method)}'
+
+
+def project_stack():
+    """Последние кадры стека из кода проекта, без библиотек."""
+    frames = [
+        frame for frame in traceback.extract_stack()
+        if frame.filename.startswith(str(settings.BASE_DIR))
+        and 'site-packages' not in frame.filename
+        and frame.filename not in OWN_FILES
+    ]
+    return [
+        f'{os.path.relpath(frame.filename, settings.BASE_DIR)}:'
+        f'{frame.lineno} {frame.name}'
+        for frame in frames[-STACK_DEPTH:]
+    ]
+
+
+class QueryLog:
+    """Обёртка для connection.execute_wrapper на время запроса."""
+
+    def __init__(self, threshold_ms, explain_rate=0):
+        self.threshold_ms = threshold_ms
+        self.explain_rate = explain_rate
+        self.view = None
+        self.explaining = False
+
+    def __call__(self, execute, sql, params, many, context):
+        if self.explaining:
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        error = None
+        try:
+            return execute(sql, params, many, context)
+        except Exception as exc:
+            error = exc
+            raise
+        finally:
+            duration = (time.perf_counter() - started) * 1000
+            if duration >= self.threshold_ms:
+                self.log(
+                    sql, params, many, duration, context['connection'], error
+                )
+
+    def log(self, sql, params, many, duration, connection, error=None):
+        record = {
+            'event': 'slow_query',
+            'fingerprint': fingerprint(sql),
+            'params': digest(repr(params)),
+            'duration_ms': round(duration, 2),
+            'view': self.view,
+            'database': connection.alias,
+            'sql': sql,
+            'stack': project_stack(),
+        }
+        if error is not None:
+            # Например, отмена по statement_timeout
+            record['error'] = repr(error)
+        elif not many and self.should_explain(sql, connection):
+            record['explain'] = self.explain(sql, params, connection)
+        logger.warning(json.dumps(record, ensure_ascii=False, default=str))
+
+    def should_explain(self, sql, connection):
+        statement = sql.lstrip().upper()
+        return (
+            connection.vendor == 'postgresql'
+            and statement.startswith('SELECT')
+            and 'FOR UPDATE' not in statement
+            and random.random() < self.explain_rate
+        )
+
+    def explain(self, sql, params, connection):
+        """План с фактическим выполнением.
+
+        Выполняется в точке сохранения: ошибка EXPLAIN не прервёт
+        транзакцию запроса.
+        """
+        self.explaining = True
+        try:
+            with transaction.atomic(using=connection.alias):
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        'EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) ' + sql,
+                        params
+                    )
+                    return cursor.fetchone()[0]
+        except DatabaseError as error:
+            return {'error': str(error)}
+        finally:
+            self.explaining = False
@@ -0,0 +1,42 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSON-рендерер на orjson.
+
+    Если orjson не установлен, клиент запросил отступы или orjson
+    не может сериализовать данные, используется стандартный рендерер
+    DRF на stdlib json.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+        if orjson is None or indent:
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        try:
+            # Ключи-числа и None, как в stdlib json, становятся строками
+            ret = orjson.dumps(
+                data, default=JSONEncoder().default,
+                option=orjson.OPT_NON_STR_KEYS,
+            )
+        except TypeError:
+            # Например, целые больше 64 бит: их сериализует stdlib json
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        # Как и JSONRenderer, экранируем разделители строк,
+        # недопустимые в JavaScript-строках
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(
+            b'\xe2\x80\xa9', b'\\u2029'
+        )
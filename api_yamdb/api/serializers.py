@@ -1,31 +1,126 @@
 import re
+from contextlib import contextmanager
 
-from django.db.models import Avg
+from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
 from rest_framework.relations import SlugRelatedField
 from rest_framework.validators import UniqueValidator
 from django.core.validators import MaxValueValidator, MinValueValidator
 
-from reviews.models import User, Category, Genre, Title, Comment, Review
-
-
-class UserSerializer(serializers.ModelSerializer):
+from api.batch import METHODS
+from reviews import trending
+from reviews.models import (
+    User, Category, Genre, Title, Comment, Review, ArchivedReview,
+)
+
+
+def query_param_set(request, name):
+    """Множество значений параметра вида ?name=a,b,c."""
+    value = request.query_params.get(name, '')
+    return {item.strip() for item in value.split(',') if item.strip()}
+
+
+class DynamicFieldsMixin:
+    """Выбор полей ответа через параметры запроса.
+
+    ?fields=id,name — отдать только перечисленные поля;
+    ?omit=description — не отдавать перечисленные поля;
+    ?include=review_count — добавить необязательные поля
+    из Meta.optional_fields (их также можно перечислить в ?fields=).
+    """
+
+    def is_sparse_request(self):
+        """Поля выбираются только у корневого сериализатора на чтение."""
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS:
+            return False
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+    def get_fields(self):
+        fields = super().get_fields()
+        optional = getattr(self.Meta, 'optional_fields', ())
+        if not self.is_sparse_request():
+            for name in optional:
+                fields.pop(name, None)
+            return fields
+        request = self.context['request']
+        only = query_param_set(request, 'fields')
+        omit = query_param_set(request, 'omit')
+        include = query_param_set(request, 'include') | only
+        for name in list(fields):
+            if (
+                name in optional and name not in include
+                or only and name not in only
+                or name in omit
+            ):
+                fields.pop(name)
+        return fields
+
+
+def unique_errors(model, data, fields, instance=None):
+    """Ошибки полей, значения которых уже заняты другими записями.
+
+    Вызывается только после нарушения ограничения уникальности в БД,
+    формат ошибок совпадает с UniqueValidator.
+    """
+    queryset = model.objects.all()
+    if instance is not None:
+        queryset = queryset.exclude(pk=instance.pk)
+    return {
+        name: [UniqueValidator.message]
+        for name in fields
+        if name in data and queryset.filter(**{name: data[name]}).exists()
+    }
+
+
+class UniqueConstraintMixin:
+    """Уникальность полей Meta.unique_fields проверяет БД.
+
+    Вместо SELECT на каждое поле перед записью выполняется сама запись,
+    а нарушение ограничения превращается в ошибки полей.
+    """
+
+    @contextmanager
+    def unique_violation_errors(self, validated_data):
+        try:
+            with transaction.atomic():
+                yield
+        except IntegrityError:
+            errors = unique_errors(
+                self.Meta.model, validated_data,
+                self.Meta.unique_fields, self.instance
+            )
+            if not errors:
+                raise
+            raise serializers.ValidationError(errors)
+
+    def create(self, validated_data):
+        with self.unique_violation_errors(validated_data):
+            return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        with self.unique_violation_errors(validated_data):
+            return super().update(instance, validated_data)
+
+
+class UserSerializer(
+    UniqueConstraintMixin, DynamicFieldsMixin, serializers.ModelSerializer
+):
     """Сериализация модели юзера"""
 
     username = serializers.CharField(
         max_length=150,
         required=True,
-        validators=(
-            UniqueValidator(queryset=User.objects.all()),
-        )
     )
     email = serializers.EmailField(
         max_length=255,
         required=True,
-        validators=(
-            UniqueValidator(queryset=User.objects.all()),
-        )
     )
 
     class Meta:
@@ -38,6 +133,7 @@ class UserSerializer(serializers.ModelSerializer):
             'last_name',
             'bio'
         )
+        unique_fields = ('username', 'email')
 
     def validate_username(self, value):
         if value == 'me':
@@ -51,9 +147,6 @@ class SignUpSerializer(serializers.Serializer):
     email = serializers.EmailField(
         max_length=255,
         required=True,
-        validators=(
-            UniqueValidator(queryset=User.objects.all()),
-        )
     )
     username = serializers.CharField(
         max_length=150,
@@ -70,6 +163,27 @@ class SignUpSerializer(serializers.Serializer):
             'Не верный формат username'
         )
 
+    def create(self, validated_data):
+        """Регистрация нового пользователя или повторная для существующего.
+
+        Для нового пользователя выполняется только INSERT. Если INSERT
+        нарушил уникальность, ищется пользователь с той же парой
+        username и email, иначе возвращаются ошибки занятых полей.
+        """
+        try:
+            with transaction.atomic():
+                return User.objects.create(**validated_data)
+        except IntegrityError:
+            user = User.objects.filter(**validated_data).first()
+            if user is not None:
+                return user
+            errors = unique_errors(
+                User, validated_data, ('username', 'email')
+            )
+            if not errors:
+                raise
+            raise serializers.ValidationError(errors)
+
 
 class TokenSerializer(serializers.ModelSerializer):
     """Сериализация токена авторизации"""
@@ -82,33 +196,56 @@ class TokenSerializer(serializers.ModelSerializer):
         fields = ('confirmation_code', 'username')
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = ('name', 'slug')
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
 
     class Meta:
         model = Genre
         fields = ('name', 'slug')
 
 
-class TitleSerializer(serializers.ModelSerializer):
-    rating = serializers.SerializerMethodField()
+class TitleSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    rating = serializers.ReadOnlyField()
     genre = GenreSerializer(read_only=True, many=True)
     category = CategorySerializer(read_only=True)
 
     class Meta:
-        fields = '__all__'
+        fields = (
+            'id',
+            'rating',
+            'genre',
+            'category',
+            'name',
+            'year',
+            'description',
+            'review_count'
+        )
+        read_only_fields = ('review_count',)
+        optional_fields = ('review_count',)
+        source_fields = {'rating': ('review_count', 'score_total')}
         model = Title
 
-    def get_rating(self, obj):
-        rating = obj.reviews.aggregate(Avg('score')).get('score__avg')
-        if not rating:
-            return rating
-        return round(rating, 1)
+
+class TrendingTitleSerializer(TitleSerializer):
+    trending = serializers.SerializerMethodField()
+
+    class Meta(TitleSerializer.Meta):
+        fields = TitleSerializer.Meta.fields + ('trending',)
+
+    def get_trending(self, obj):
+        return round(trending.current(obj.trending), 3)
+
+
+class SimilarTitleSerializer(TitleSerializer):
+    similarity = serializers.FloatField(read_only=True)
+
+    class Meta(TitleSerializer.Meta):
+        fields = TitleSerializer.Meta.fields + ('similarity',)
 
 
 class TitleCreateSerializer(serializers.ModelSerializer):
@@ -120,11 +257,11 @@ class TitleCreateSerializer(serializers.ModelSerializer):
     )
 
     class Meta:
-        fields = '__all__'
+        fields = ('id', 'category', 'genre', 'name', 'year', 'description')
         model = Title
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     author = SlugRelatedField(
         slug_field='username',
         read_only=True,
@@ -135,7 +272,11 @@ class ReviewSerializer(serializers.ModelSerializer):
     )
 
     class Meta:
-        fields = ('id', 'text', 'author', 'score', 'pub_date')
+        fields = (
+            'id', 'text', 'author', 'score', 'pub_date', 'comment_count'
+        )
+        read_only_fields = ('comment_count',)
+        optional_fields = ('comment_count',)
         model = Review
 
     def validate(self, data):
@@ -144,15 +285,44 @@ class ReviewSerializer(serializers.ModelSerializer):
 
         title_id = self.context['view'].kwargs.get('title_id')
         author = self.context['request'].user
-        if Review.objects.filter(title=title_id, author=author).exists():
+        if any(
+            model.objects.filter(title=title_id, author=author).exists()
+            for model in (Review, ArchivedReview)
+        ):
             raise ValidationError('you already have a review')
         return data
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class ModerationReviewSerializer(ReviewSerializer):
+    """Отзыв в очереди модерации, с произведением."""
+
+    class Meta(ReviewSerializer.Meta):
+        fields = ReviewSerializer.Meta.fields + ('title',)
+        read_only_fields = fields
+
+
+class CommentSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     author = SlugRelatedField(slug_field='username', read_only=True)
 
     class Meta:
-        fields = '__all__'
+        exclude = ('is_hidden',)
         model = Comment
         read_only_fields = ('review',)
+
+
+class BatchItemSerializer(serializers.Serializer):
+    method = serializers.ChoiceField(choices=METHODS, default='GET')
+    path = serializers.RegexField(r'^/api/', max_length=2000)
+    body = serializers.JSONField(required=False)
+
+
+class BatchSerializer(serializers.Serializer):
+    """Пакет подзапросов, см. api.batch"""
+    requests = BatchItemSerializer(many=True, allow_empty=False)
+
+    def validate_requests(self, value):
+        if len(value) > settings.BATCH_MAX_REQUESTS:
+            raise serializers.ValidationError(
+                f'Не больше {settings.BATCH_MAX_REQUESTS} запросов в пакете'
+            )
+        return value
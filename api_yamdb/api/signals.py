@@ -0,0 +1,112 @@
+from django.conf import settings
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from api.events import publish, publish_record
+from api.facets import bump_catalog_version
+from jobs.queue import enqueue
+from reviews.counters import COMMENTS
+from reviews.deletion import purged
+from reviews.moderation import hidden_changed
+from reviews.models import (
+    ArchivedReview, Category, Comment, Genre, Review, Title, TitleGenre,
+)
+
+
+def schedule_publish(sections):
+    """Перепубликация снимков в фоне.
+
+    Повторные изменения до выполнения задачи схлопываются в одну задачу.
+    """
+    if settings.SNAPSHOT_ON_WRITE:
+        enqueue(
+            'publish_snapshots',
+            {'sections': list(sections)},
+            idempotency_key=f'publish_snapshots:{",".join(sections)}'
+        )
+
+
+def schedule_publish_title(title_id):
+    """Перепубликация только списков, в которые входит произведение."""
+    if settings.SNAPSHOT_ON_WRITE:
+        enqueue(
+            'publish_title_snapshots',
+            {'title_id': title_id},
+            idempotency_key=f'publish_title_snapshots:{title_id}'
+        )
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def genres_changed(sender, **kwargs):
+    """Жанры выводятся в своём разделе и в списке произведений."""
+    schedule_publish(('genres', 'titles'))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def categories_changed(sender, **kwargs):
+    schedule_publish(('categories', 'titles'))
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+def titles_changed(sender, **kwargs):
+    """Произведение могло перейти в другой жанр или категорию."""
+    schedule_publish(('titles',))
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+@receiver(hidden_changed, sender=Review)
+@receiver(hidden_changed, sender=ArchivedReview)
+def review_changed(sender, instance, **kwargs):
+    """Отзыв меняет рейтинг одного произведения."""
+    schedule_publish_title(instance.title_id)
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+@receiver(post_save, sender=TitleGenre)
+@receiver(post_delete, sender=TitleGenre)
+@receiver(m2m_changed, sender=TitleGenre)
+def facets_changed(sender, **kwargs):
+    bump_catalog_version()
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_save, sender=Comment)
+def record_saved(sender, instance, created, **kwargs):
+    """События для /api/v1/titles/{id}/events/, см. api.events."""
+    if not instance.is_hidden:
+        publish_record(instance, 'created' if created else 'updated')
+
+
+@receiver(post_delete, sender=Review)
+@receiver(post_delete, sender=Comment)
+def record_deleted(sender, instance, **kwargs):
+    if not instance.is_hidden:
+        publish_record(instance, 'deleted')
+
+
+@receiver(purged)
+def records_purged(sender, records, **kwargs):
+    """Пачка отзывов или комментариев удалена без post_delete.
+
+    Рейтинги произведений изменились: фасеты сбрасываются, снимки
+    списка произведений перепубликуются одной задачей на всё удаление.
+    """
+    bump_catalog_version()
+    schedule_publish(('titles',))
+    kind = 'review' if sender in COMMENTS else 'comment'
+    for record in records:
+        if record['is_hidden']:
+            continue
+        ids = {kind: record['pk']}
+        if kind == 'comment':
+            ids['review'] = record['review_id']
+        publish(kind, 'deleted', record['title_id'], **ids)
@@ -0,0 +1,157 @@
+"""Статические JSON-снимки каталога.
+
+Ответы API для жанров, категорий и первых страниц списка произведений
+рендерятся заранее и складываются в SNAPSHOT_ROOT, откуда их отдаёт nginx.
+Имя файла повторяет путь запроса: `api/v1/titles/index.json` для запроса
+без параметров и `api/v1/titles/index?genre=drama&page=2.json` для
+запроса с параметрами (сначала фильтр, затем номер страницы).
+Если снимка нет, nginx передаёт запрос в Django.
+
+Ссылки next и previous в снимках относительные, либо ведут
+на публичный адрес SNAPSHOT_URL, если он задан.
+"""
+import os
+import tempfile
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.test import RequestFactory
+from django.urls import resolve
+
+from reviews.models import Category, Genre, Title
+
+
+SNAPSHOT_SECTIONS = ('genres', 'categories', 'titles')
+
+
+def snapshot_path(path, query=''):
+    """Путь к файлу снимка для запроса `path?query`."""
+    name = f'index?{query}.json' if query else 'index.json'
+    return os.path.join(settings.SNAPSHOT_ROOT, path.strip('/'), name)
+
+
+def write_atomic(filename, content):
+    """Запись файла через временный файл и rename.
+
+    nginx никогда не увидит наполовину записанный снимок.
+    """
+    directory = os.path.dirname(filename)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as tmp_file:
+            tmp_file.write(content)
+        os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, filename)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+
+def public_link(url):
+    """Ссылка пагинации без адреса сервера, на котором рендерился снимок."""
+    parts = urlsplit(url)
+    link = f'{parts.path}?{parts.query}' if parts.query else parts.path
+    return settings.SNAPSHOT_URL.rstrip('/') + link
+
+
+def render(path, query=''):
+    """Рендер GET-запроса анонимного пользователя без HTTP."""
+    request = RequestFactory().get(f'{path}?{query}' if query else path)
+    match = resolve(path)
+    response = match.func(request, *match.args, **match.kwargs)
+    if isinstance(response.data, dict):
+        for key in ('next', 'previous'):
+            if response.data.get(key):
+                response.data[key] = public_link(response.data[key])
+    response.render()
+    return response
+
+
+def join_query(*parts):
+    return '&'.join(part for part in parts if part)
+
+
+def publish_pages(path, query=''):
+    """Публикация первых SNAPSHOT_PAGES страниц списка.
+
+    Возвращает множество записанных файлов.
+    """
+    written = set()
+    for page in range(1, settings.SNAPSHOT_PAGES + 1):
+        page_query = join_query(query, f'page={page}' if page > 1 else '')
+        response = render(path, page_query)
+        if response.status_code != 200:
+            break
+        filename = snapshot_path(path, page_query)
+        write_atomic(filename, response.content)
+        written.add(filename)
+        if not response.data.get('next'):
+            break
+    return written
+
+
+def title_filters(title_id=None):
+    """Фильтры списка произведений, для которых нужны снимки.
+
+    Для title_id — только списки, в которые входит это произведение.
+    """
+    genres = Genre.objects.all()
+    categories = Category.objects.all()
+    if title_id is not None:
+        genres = genres.filter(titlegenre__title=title_id)
+        categories = categories.filter(category=title_id)
+    queries = ['']
+    queries += [
+        f'genre={slug}' for slug in genres.values_list('slug', flat=True)
+    ]
+    queries += [
+        f'category={slug}'
+        for slug in categories.values_list('slug', flat=True)
+    ]
+    queries += list(settings.SNAPSHOT_TITLE_FILTERS)
+    return queries
+
+
+def remove_stale(path, written):
+    """Удаление снимков, которые не были перезаписаны.
+
+    Например, страницы удалённого жанра.
+    """
+    directory = os.path.dirname(snapshot_path(path))
+    if not os.path.isdir(directory):
+        return
+    for name in os.listdir(directory):
+        filename = os.path.join(directory, name)
+        if name.endswith('.json') and filename not in written:
+            os.unlink(filename)
+
+
+def publish(sections=SNAPSHOT_SECTIONS):
+    """Публикация снимков указанных разделов каталога.
+
+    Возвращает количество записанных файлов.
+    """
+    total = 0
+    for section in sections:
+        path = f'/api/v1/{section}/'
+        queries = title_filters() if section == 'titles' else ['']
+        written = set()
+        for query in queries:
+            written |= publish_pages(path, query)
+        remove_stale(path, written)
+        total += len(written)
+    return total
+
+
+def publish_title(title_id):
+    """Публикация списков произведений, в которые входит title_id.
+
+    Остальные снимки не меняются. Возвращает количество записанных файлов.
+    """
+    if not Title.objects.filter(pk=title_id).exists():
+        return 0
+    written = set()
+    for query in title_filters(title_id):
+        written |= publish_pages('/api/v1/titles/', query)
+    return len(written)
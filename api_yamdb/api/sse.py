@@ -0,0 +1,172 @@
+"""Поток событий произведения /api/v1/titles/{id}/events/ (ASGI).
+
+Server-Sent Events: каждое событие api.events отправляется строками
+id, event и data. Раз в EVENTS_HEARTBEAT секунд отправляется
+комментарий, чтобы прокси не закрывали простаивающее соединение.
+Остальные запросы router передаёт приложению Django.
+"""
+import asyncio
+import json
+import re
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+from api.events import RESET, backend, broker, encode
+from reviews.models import Title
+
+
+EVENTS_PATH = re.compile(r'^/api/v1/titles/(?P<title_id>\d+)/events/$')
+RETRY_MS = 3000
+
+
+def title_exists(title_id):
+    close_old_connections()
+    try:
+        return Title.objects.filter(pk=title_id).exists()
+    finally:
+        close_old_connections()
+
+
+def last_event_id(scope):
+    """Last-Event-ID из заголовка или параметра last_event_id."""
+    value = dict(scope['headers']).get(b'last-event-id', b'').decode()
+    if not value:
+        query = parse_qs(scope.get('query_string', b'').decode())
+        value = query.get('last_event_id', [''])[0]
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+def format_event(event):
+    if event is RESET:
+        return b'event: reset\ndata: {}\n\n'
+    return (
+        f'id: {event["id"]}\nevent: {event["event"]}\n'
+        f'data: {encode(event)}\n\n'
+    ).encode()
+
+
+async def send_body(send, body):
+    await send({'type': 'http.response.body', 'body': body, 'more_body': True})
+
+
+async def not_found(send):
+    await send({
+        'type': 'http.response.start',
+        'status': 404,
+        'headers': [(b'content-type', b'application/json')],
+    })
+    await send({
+        'type': 'http.response.body',
+        'body': json.dumps({'detail': 'Not found.'}).encode(),
+    })
+
+
+async def wait_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def replay(send, title_id, event_id):
+    """Пропущенные после event_id события, возвращает id последнего.
+
+    Если продолжить с event_id нельзя, отправляется reset и поток
+    продолжается со всех новых событий процесса.
+    """
+    missed, complete = broker.since(title_id, event_id)
+    if not complete:
+        await send_body(send, format_event(RESET))
+        return 0
+    for event in missed:
+        await send_body(send, format_event(event))
+        event_id = event['id']
+    return event_id
+
+
+async def stream(subscription, receive, send, event_id):
+    disconnect = asyncio.ensure_future(wait_disconnect(receive))
+    try:
+        while True:
+            get = asyncio.ensure_future(subscription.queue.get())
+            done, _ = await asyncio.wait(
+                (get, disconnect), timeout=settings.EVENTS_HEARTBEAT,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if get not in done:
+                get.cancel()
+                if disconnect in done:
+                    return
+                await send_body(send, b': ping\n\n')
+                continue
+            event = get.result()
+            if event is RESET:
+                # Поток закрывается: клиент загрузит списки заново
+                await send_body(send, format_event(RESET))
+                return
+            if event['id'] > event_id:
+                await send_body(send, format_event(event))
+                event_id = event['id']
+    finally:
+        disconnect.cancel()
+
+
+async def title_events(scope, receive, send, title_id):
+    await backend.start()
+    if not await sync_to_async(title_exists)(title_id):
+        await not_found(send)
+        return
+    subscription = broker.subscribe(title_id)
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                # Отключение буферизации ответа в nginx
+                (b'x-accel-buffering', b'no'),
+            ],
+        })
+        await send_body(send, f'retry: {RETRY_MS}\n\n'.encode())
+        event_id = last_event_id(scope)
+        if event_id is not None:
+            event_id = await replay(send, title_id, event_id)
+        await stream(subscription, receive, send, event_id or 0)
+    finally:
+        broker.unsubscribe(subscription)
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+class Router:
+    """ASGI-приложение: потоки событий и приложение Django."""
+
+    def __init__(self, application):
+        self.application = application
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http' and scope['method'] == 'GET':
+            match = EVENTS_PATH.match(scope['path'])
+            if match is not None:
+                await title_events(
+                    scope, receive, send, int(match['title_id'])
+                )
+                return
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+        await self.application(scope, receive, send)
+
+    @staticmethod
+    async def lifespan(receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
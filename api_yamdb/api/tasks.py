@@ -0,0 +1,36 @@
+from api import snapshots
+from api.utils import send_code_email
+from jobs.queue import task
+from reviews.deletion import Purge
+from reviews.models import User
+
+
+@task('send_code_email')
+def send_code_email_task(user_id):
+    user = User.objects.filter(pk=user_id).first()
+    if user is not None:
+        send_code_email(user)
+
+
+@task('publish_snapshots')
+def publish_snapshots_task(sections):
+    snapshots.publish(sections)
+
+
+@task('publish_title_snapshots')
+def publish_title_snapshots_task(title_id):
+    snapshots.publish_title(title_id)
+
+
+@task('purge_user')
+def purge_user_task(pk, chunk_size=None, progress=None):
+    purge = Purge(chunk_size, progress)
+    purge.user(pk)
+    return purge.deleted
+
+
+@task('purge_title')
+def purge_title_task(pk, chunk_size=None, progress=None):
+    purge = Purge(chunk_size, progress)
+    purge.title(pk)
+    return purge.deleted
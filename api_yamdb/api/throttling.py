@@ -0,0 +1,113 @@
+"""Ограничение частоты запросов к эндпоинтам авторизации.
+
+Счётчики скользящего окна хранятся в общем кэше (Redis в продакшене,
+память процесса локально и в тестах). Проверка выполняется до любых
+обращений к БД: у эндпоинтов авторизации отключена аутентификация,
+а идентификаторы берутся из IP и тела запроса.
+"""
+import hashlib
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 60 * 60 * 24}
+
+
+def parse_rate(rate):
+    """'5/h' -> (5, 3600)"""
+    num, period = rate.split('/')
+    return int(num), PERIODS[period[0]]
+
+
+def hit(key, timeout):
+    """Атомарное увеличение счётчика, возвращает новое значение."""
+    try:
+        return cache.incr(key)
+    except ValueError:
+        if cache.add(key, 1, timeout=timeout):
+            return 1
+        return cache.incr(key)
+
+
+def rejected_key(scope, kind):
+    return f'throttle:rejected:{scope}:{kind}'
+
+
+def rejected_counts():
+    """Количество отклонённых запросов по эндпоинтам и видам ключей."""
+    keys = [
+        rejected_key(scope, kind)
+        for scope, rates in settings.AUTH_THROTTLE_RATES.items()
+        for kind in rates
+    ]
+    return cache.get_many(keys)
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """Ограничение по нескольким ключам со своими лимитами.
+
+    Запросы считаются в двух соседних фиксированных окнах, оценка для
+    скользящего окна — взвешенная сумма: предыдущее окно учитывается
+    пропорционально своей части, попавшей в скользящее окно.
+    На каждый ключ нужно два обращения к кэшу.
+    Лимиты задаются в AUTH_THROTTLE_RATES[scope] как {вид ключа: 'N/период'}.
+    """
+    scope = None
+
+    def get_identifiers(self, request):
+        data = request.data if hasattr(request.data, 'get') else {}
+        identifiers = {'ip': self.get_ident(request)}
+        for kind in ('username', 'email'):
+            value = data.get(kind)
+            if isinstance(value, str) and value:
+                identifiers[kind] = hashlib.md5(
+                    value.strip().lower().encode()
+                ).hexdigest()
+        return identifiers
+
+    def allow_request(self, request, view):
+        rates = settings.AUTH_THROTTLE_RATES.get(self.scope, {})
+        identifiers = self.get_identifiers(request)
+        now = time.time()
+        self.retry_after = None
+        for kind, rate in rates.items():
+            if kind not in identifiers:
+                continue
+            limit, window = parse_rate(rate)
+            if self.estimate(kind, identifiers[kind], window, now) > limit:
+                self.reject(kind)
+                self.retry_after = window - now % window
+                return False
+        return True
+
+    def estimate(self, kind, ident, window, now):
+        current = int(now // window)
+        prefix = f'throttle:{self.scope}:{kind}:{ident}'
+        count = hit(f'{prefix}:{current}', timeout=window * 2)
+        previous = cache.get(f'{prefix}:{current - 1}', 0)
+        elapsed = (now % window) / window
+        return previous * (1 - elapsed) + count
+
+    def reject(self, kind):
+        hit(rejected_key(self.scope, kind), timeout=None)
+        logger.warning(
+            'Запрос отклонён ограничением частоты',
+            extra={'throttle_scope': self.scope, 'throttle_key': kind}
+        )
+
+    def wait(self):
+        return self.retry_after
+
+
+class SignUpThrottle(SlidingWindowThrottle):
+    scope = 'signup'
+
+
+class TokenThrottle(SlidingWindowThrottle):
+    scope = 'token'
@@ -2,6 +2,7 @@ from django.urls import path, include
 from rest_framework import routers
 
 from api.views import (
+    BatchView,
     UserViewSet,
     TokenViewSet,
     SignUpViewSet,
@@ -9,7 +10,9 @@ from api.views import (
     GenreViewSet,
     CategoryViewSet,
     ReviewViewSet,
-    CommentViewSet
+    CommentViewSet,
+    ReviewModerationViewSet,
+    CommentModerationViewSet,
 )
 
 
@@ -28,6 +31,14 @@ routes_v1.register(
     r'titles/(?P<title_id>\d+)/reviews/(?P<review_id>\d+)/comments',
     CommentViewSet, basename='comments'
 )
+routes_v1.register(
+    'moderation/reviews', ReviewModerationViewSet,
+    basename='moderation-reviews'
+)
+routes_v1.register(
+    'moderation/comments', CommentModerationViewSet,
+    basename='moderation-comments'
+)
 
 path_auth_v1 = [
     path('signup/', SignUpViewSet.as_view(), name='signup'),
@@ -35,6 +46,7 @@ path_auth_v1 = [
 ]
 
 urlpatterns = [
+    path('v1/batch/', BatchView.as_view(), name='batch'),
     path('v1/', include(routes_v1.urls)),
     path('v1/auth/', include(path_auth_v1))
 ]
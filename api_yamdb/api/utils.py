@@ -1,6 +1,7 @@
 from django.core.mail import send_mail
 from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
+from rest_framework.exceptions import ValidationError
 
 
 def send_code_email(user):
@@ -11,3 +12,22 @@ def send_code_email(user):
     message = f'{confirmation_code} - ваш код подтверждения'
     admin_email = settings.EMAIL_HOST
     return send_mail(subject, message, admin_email, [user.email])
+
+
+def me_cache_key(user_id):
+    """Ключ кэша ответа api/v1/users/me/"""
+    return f'users:me:{user_id}'
+
+
+def trending_limit(request):
+    """Размер ленты популярного из ?limit=, не больше TRENDING_MAX_LIMIT"""
+    value = request.query_params.get('limit', settings.TRENDING_LIMIT)
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValidationError({'limit': 'Ожидается целое число'})
+    if not 0 < limit <= settings.TRENDING_MAX_LIMIT:
+        raise ValidationError({
+            'limit': f'Допустимо от 1 до {settings.TRENDING_MAX_LIMIT}'
+        })
+    return limit
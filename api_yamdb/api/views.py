@@ -1,14 +1,16 @@
-from rest_framework import viewsets, status, filters
+from rest_framework import viewsets, status, filters, mixins
 from rest_framework.views import APIView
 from rest_framework import permissions
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.decorators import action
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import prefetch_related_objects
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.contrib.auth.tokens import default_token_generator
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import serializers
-from django.db import IntegrityError
 
 from api.serializers import (
     UserSerializer,
@@ -18,26 +20,88 @@ from api.serializers import (
     TitleSerializer,
     CategorySerializer,
     TitleCreateSerializer,
+    TrendingTitleSerializer,
+    SimilarTitleSerializer,
     ReviewSerializer,
-    CommentSerializer
+    ModerationReviewSerializer,
+    CommentSerializer,
+    BatchSerializer,
+)
+from reviews.models import (
+    User,
+    Title,
+    Category,
+    Genre,
+    Review,
+    Comment,
+    TitleSimilarity,
+    ArchivedReview,
+    ArchivedComment,
 )
-from reviews.models import User, Title, Category, Genre, Review
 from api.permissions import (
     AdminPermission,
     ModeratorPermission,
     OnlyReadAndNotUser,
+    IsAdminOrModerator,
     IsAuthorOrAdminOrModerator
 )
+from api import batch
+from api.events import publish_record
+from api.facets import title_facets
 from api.filters import TitleFilter
-from api.utils import send_code_email
+from api.mixins import (
+    ARCHIVE_METHODS,
+    ArchiveMixin,
+    HideOnDestroyMixin,
+    ParentLookupMixin,
+    PurgeMixin,
+    SparseQuerysetMixin,
+)
+from api.throttling import SignUpThrottle, TokenThrottle
+from api.utils import me_cache_key, trending_limit
+from reviews.moderation import set_hidden
+from reviews.trending import top
+from jobs.queue import enqueue
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(PurgeMixin, SparseQuerysetMixin, viewsets.ModelViewSet):
     """Список юзеров доступный только admin"""
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = (AdminPermission,)
     lookup_field = 'username'
+    filter_backends = (
+        DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter
+    )
+    filterset_fields = ('role',)
+    search_fields = ('username', 'email')
+    ordering_fields = ('username', 'email', 'role', 'date_joined')
+    ordering = ('username',)
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        cache.delete(me_cache_key(serializer.instance.pk))
+
+    purge_task = 'purge_user'
+
+    def get_purge_querysets(self, instance):
+        return (
+            Review.objects.filter(author=instance),
+            Comment.objects.filter(author=instance),
+            ArchivedReview.objects.filter(author=instance),
+            ArchivedComment.objects.filter(author=instance),
+        )
+
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        cache.delete(me_cache_key(instance.pk))
+
+    def perform_background_destroy(self, instance):
+        # Токены неактивного пользователя не принимаются до удаления
+        instance.is_active = False
+        instance.save(update_fields=('is_active',))
+        super().perform_background_destroy(instance)
+        cache.delete(me_cache_key(instance.pk))
 
     @action(
         methods=('GET', 'PATCH'),
@@ -48,8 +112,11 @@ class UserViewSet(viewsets.ModelViewSet):
         """Настройка эндпоинта api/v1/users/me/
 
         Получение и изменение данных пользователя, если он прошел аунтификацию.
+        Пользователь уже загружен аутентификацией, ответ на GET кэшируется
+        до изменения пользователя через этот эндпоинт или администратором.
         """
-        user = get_object_or_404(User, pk=request.user.id)
+        user = request.user
+        key = me_cache_key(user.pk)
         if request.method == 'PATCH':
             serializer = self.serializer_class(
                 user,
@@ -58,15 +125,21 @@ class UserViewSet(viewsets.ModelViewSet):
             )
             serializer.is_valid(raise_exception=True)
             serializer.save(role=user.role)
+            cache.set(key, serializer.data, settings.USER_ME_CACHE_TIMEOUT)
             return Response(serializer.data, status=status.HTTP_200_OK)
 
-        serializer = self.serializer_class(user)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        data = cache.get(key)
+        if data is None:
+            data = self.serializer_class(user).data
+            cache.set(key, data, settings.USER_ME_CACHE_TIMEOUT)
+        return Response(data, status=status.HTTP_200_OK)
 
 
 class TokenViewSet(APIView):
     """Классс проверки токена авторизации"""
+    authentication_classes = ()
     permission_classes = (permissions.AllowAny,)
+    throttle_classes = (TokenThrottle,)
     serializer_class = TokenSerializer
 
     def post(self, request):
@@ -92,31 +165,90 @@ class TokenViewSet(APIView):
 
 class SignUpViewSet(APIView):
     """Класс авторизации"""
+    authentication_classes = ()
     permission_classes = (permissions.AllowAny,)
+    throttle_classes = (SignUpThrottle,)
     serializer_class = SignUpSerializer
 
     def post(self, request):
 
         serializer = self.serializer_class(data=request.data)
         if serializer.is_valid(raise_exception=True):
-            try:
-                user, _ = User.objects.get_or_create(
-                    **serializer.validated_data)
-            except IntegrityError:
-                raise serializers.ValidationError()
-            send_code_email(user)
+            user = serializer.save()
+            enqueue(
+                'send_code_email',
+                {'user_id': user.pk},
+                idempotency_key=f'send_code_email:{user.pk}'
+            )
             return Response(serializer.data, status=status.HTTP_200_OK)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class BatchView(APIView):
+    """Несколько запросов к API за один, см. api.batch"""
+    permission_classes = (permissions.AllowAny,)
+
+    def post(self, request):
+        serializer = BatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(
+            batch.run(request, serializer.validated_data['requests'])
+        )
+
+
+class TitleViewSet(PurgeMixin, SparseQuerysetMixin, viewsets.ModelViewSet):
     """Класс произведения."""
     queryset = Title.objects.all()
     serializer_class = TitleSerializer
     permission_classes = (ModeratorPermission, OnlyReadAndNotUser,)
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
+    purge_task = 'purge_title'
+
+    def get_purge_querysets(self, instance):
+        return (
+            Review.objects.filter(title=instance),
+            Comment.objects.filter(review__title=instance),
+            ArchivedReview.objects.filter(title=instance),
+            ArchivedComment.objects.filter(review__title=instance),
+        )
+
+    @action(methods=('GET',), detail=False)
+    def facets(self, request):
+        """Количество произведений по жанрам, категориям и годам."""
+        return Response(title_facets(request.query_params))
+
+    @action(methods=('GET',), detail=False)
+    def trending(self, request):
+        """Популярные произведения, ?genre= и ?category= по slug."""
+        titles = top(
+            trending_limit(request),
+            request.query_params.get('genre'),
+            request.query_params.get('category'),
+        )
+        prefetch_related_objects(titles, 'genre', 'category')
+        serializer = TrendingTitleSerializer(
+            titles, many=True, context=self.get_serializer_context()
+        )
+        return Response(serializer.data)
+
+    @action(methods=('GET',), detail=True)
+    def similar(self, request, pk=None):
+        """Произведения, которые оценили те же пользователи."""
+        title = self.get_object()
+        similarities = TitleSimilarity.objects.filter(
+            title=title
+        ).select_related('similar').order_by('-score')
+        titles = []
+        for similarity in similarities:
+            similarity.similar.similarity = round(similarity.score, 4)
+            titles.append(similarity.similar)
+        prefetch_related_objects(titles, 'genre', 'category')
+        serializer = SimilarTitleSerializer(
+            titles, many=True, context=self.get_serializer_context()
+        )
+        return Response(serializer.data)
 
     def get_serializer_class(self):
         if self.request.method in ('POST', 'PATCH',):
@@ -124,7 +256,7 @@ class TitleViewSet(viewsets.ModelViewSet):
         return TitleSerializer
 
 
-class GenreViewSet(viewsets.ModelViewSet):
+class GenreViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     """Класс жанр."""
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
@@ -144,7 +276,7 @@ class GenreViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_204_NO_CONTENT)
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     """
     Класс категория.
     """
@@ -166,39 +298,111 @@ class CategoryViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_204_NO_CONTENT)
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ArchiveMixin, HideOnDestroyMixin, ParentLookupMixin,
+                    SparseQuerysetMixin, viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
     permission_classes = (IsAuthorOrAdminOrModerator,)
 
+    def get_title(self):
+        return self.get_parent(Title, id=self.kwargs.get('title_id'))
+
     def get_queryset(self):
-        title = get_object_or_404(
-            Title,
-            id=self.kwargs.get('title_id')
+        return self.sparse_queryset(
+            Review.objects.filter(title=self.get_title(), is_hidden=False)
         )
-        return title.reviews.all()
+
+    def get_archive_queryset(self):
+        return ArchivedReview.objects.filter(
+            title=self.get_title(), is_hidden=False
+        )
+
+    def get_archive_count(self):
+        return self.get_title().review_count
 
     def perform_create(self, serializer):
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, id=title_id)
-        serializer.save(author=self.request.user, title=title)
+        serializer.save(author=self.request.user, title=self.get_title())
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ArchiveMixin, HideOnDestroyMixin, ParentLookupMixin,
+                     SparseQuerysetMixin, viewsets.ModelViewSet):
     serializer_class = CommentSerializer
     permission_classes = (IsAuthorOrAdminOrModerator,)
 
+    def get_review(self):
+        """Отзыв из URL; комментарии архивного отзыва читаются и удаляются."""
+        lookup = {'id': self.kwargs.get('review_id'), 'is_hidden': False}
+        try:
+            return self.get_parent(Review, **lookup)
+        except Http404:
+            if self.request.method not in ARCHIVE_METHODS:
+                raise
+        return self.get_parent(
+            ArchivedReview, title=self.kwargs.get('title_id'), **lookup
+        )
+
     def get_queryset(self):
-        review = get_object_or_404(
-            Review,
-            id=self.kwargs.get('review_id'),
+        review = self.get_review()
+        if isinstance(review, ArchivedReview):
+            return Comment.objects.none()
+        return self.sparse_queryset(
+            Comment.objects.filter(review=review, is_hidden=False)
         )
-        return review.comments.all()
+
+    def get_archive_queryset(self):
+        review = self.get_review()
+        if isinstance(review, Review):
+            return ArchivedComment.objects.none()
+        return ArchivedComment.objects.filter(review=review, is_hidden=False)
+
+    def get_archive_count(self):
+        return self.get_review().comment_count
 
     def perform_create(self, serializer):
-        review = get_object_or_404(
-            Review,
-            id=self.kwargs.get('review_id'),
-        )
         serializer.save(
-            author=self.request.user, review=review
+            author=self.request.user, review=self.get_review()
         )
+
+
+class ModerationViewSet(SparseQuerysetMixin, mixins.ListModelMixin,
+                        mixins.RetrieveModelMixin, mixins.DestroyModelMixin,
+                        viewsets.GenericViewSet):
+    """Очередь модерации: скрытые записи.
+
+    restore возвращает запись в публичные списки, DELETE удаляет
+    её окончательно. Скрытые архивные записи в список не входят,
+    но находятся по id из archive_queryset.
+    """
+    permission_classes = (IsAdminOrModerator,)
+    filter_backends = (DjangoFilterBackend,)
+    archive_queryset = None
+
+    def get_object(self):
+        try:
+            return super().get_object()
+        except Http404:
+            instance = get_object_or_404(
+                self.archive_queryset, pk=self.kwargs['pk']
+            )
+        self.check_object_permissions(self.request, instance)
+        return instance
+
+    @action(methods=('POST',), detail=True)
+    def restore(self, request, pk=None):
+        instance = self.get_object()
+        if set_hidden(instance, False):
+            publish_record(instance, 'created')
+        return Response(self.get_serializer(instance).data)
+
+
+class ReviewModerationViewSet(ModerationViewSet):
+    queryset = Review.objects.filter(is_hidden=True).order_by('-pub_date')
+    archive_queryset = ArchivedReview.objects.filter(is_hidden=True)
+    serializer_class = ModerationReviewSerializer
+    filterset_fields = ('title',)
+
+
+class CommentModerationViewSet(ModerationViewSet):
+    queryset = Comment.objects.filter(is_hidden=True).order_by('-pub_date')
+    archive_queryset = ArchivedComment.objects.filter(is_hidden=True)
+    serializer_class = CommentSerializer
+    filterset_fields = ('review',)
@@ -3,14 +3,22 @@ ASGI config for YaMDb project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
-For more information on this file, see
-https://docs.djangoproject.com/en/3.0/howto/deployment/asgi/
+Django 2.2 не поддерживает ASGI, поэтому приложение Django работает
+через адаптер WSGI из asgiref, а потоки событий /api/v1/titles/{id}/events/
+обслуживаются асинхронно, см. api.sse. Запуск:
+
+    uvicorn api_yamdb.asgi:application
 """
 
 import os
 
-from django.core.asgi import get_asgi_application
+from asgiref.wsgi import WsgiToAsgi
+from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
 
-application = get_asgi_application()
+django_application = get_wsgi_application()
+
+from api.sse import Router  # noqa: E402 после настройки Django
+
+application = Router(WsgiToAsgi(django_application))
@@ -25,11 +25,15 @@ INSTALLED_APPS = [
     'rest_framework',
     'rest_framework_simplejwt',
     'reviews.apps.ReviewsConfig',
-    'api.apps.ApiConfig'
+    'api.apps.ApiConfig',
+    'jobs.apps.JobsConfig'
 ]
 
 MIDDLEWARE = [
+    'api.middleware.SlowQueryLogMiddleware',
+    'api.middleware.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'api.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -100,8 +104,15 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 10
+    'PAGE_SIZE': 10,
+    # Запросы приходят через nginx: IP клиента для ограничения частоты
+    # берётся из последнего адреса X-Forwarded-For, который добавил nginx
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', default=1)),
 }
 
 JWT_AUTH = {
@@ -109,6 +120,63 @@ JWT_AUTH = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Общий кэш: счётчики ограничения частоты запросов и кэши ответов.
+# В продакшене — Redis из REDIS_URL, локально и в тестах — память процесса
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Время жизни кэша ответа api/v1/users/me/, секунды
+USER_ME_CACHE_TIMEOUT = 5 * 60
+# Фасеты списка произведений, см. api.facets. Массовая загрузка без
+# сигналов (csv_download) видна в фасетах не позже чем через этот срок
+FACETS_CACHE_TIMEOUT = 10 * 60
+# Популярность произведений, см. reviews.trending. Вклад отзыва убывает
+# вдвое за TRENDING_HALF_LIFE; compact_trending пересчитывает значения
+# по отзывам за TRENDING_WINDOW, более старые вклады меньше 1/1000
+TRENDING_HALF_LIFE = 7 * 24 * 60 * 60
+TRENDING_WINDOW = 10 * TRENDING_HALF_LIFE
+TRENDING_LIMIT = 20
+TRENDING_MAX_LIMIT = 100
+# Похожие произведения, см. reviews.similarity и build_recommendations.
+# Память расчёта растёт с размером блока и популярностью его произведений
+RECOMMENDATIONS_TOP_K = 20
+RECOMMENDATIONS_MIN_COMMON = 2
+RECOMMENDATIONS_BLOCK_SIZE = 500
+RECOMMENDATIONS_CHUNK_SIZE = 5000
+
+# Наибольшее число подзапросов в /api/v1/batch/, см. api.batch
+BATCH_MAX_REQUESTS = 20
+
+# События отзывов и комментариев для /api/v1/titles/{id}/events/,
+# см. api.events.
+# MemoryBackend доставляет события только внутри процесса: с gunicorn
+# и отдельным процессом ASGI нужен PostgresBackend
+EVENTS_BACKEND = os.getenv(
+    'EVENTS_BACKEND', default='api.events.MemoryBackend'
+)
+EVENTS_LOG_SIZE = 1000
+EVENTS_QUEUE_SIZE = 100
+EVENTS_HEARTBEAT = 15
+# NOTIFY принимает до 8000 байт, большие события отправляются без data
+EVENTS_MAX_PAYLOAD = 7000
+
+# Лимиты эндпоинтов авторизации по видам ключей, см. api.throttling
+AUTH_THROTTLE_RATES = {
+    'signup': {'ip': '20/h', 'email': '5/h', 'username': '5/h'},
+    'token': {'ip': '60/m', 'username': '10/m'},
+}
 
 LANGUAGE_CODE = 'en-us'
 
@@ -136,3 +204,100 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Сжатие ответов API, см. api.middleware.CompressionMiddleware
+COMPRESSION_ENCODINGS = ('br', 'gzip')
+COMPRESSION_MIN_LENGTH = int(os.getenv('COMPRESSION_MIN_LENGTH', default=1024))
+# Только JSON API: HTML-страницы с CSRF-токеном не сжимаются (BREACH)
+COMPRESSION_CONTENT_TYPES = ('application/json',)
+COMPRESSION_BROTLI_QUALITY = 5
+
+# Статические JSON-снимки каталога, которые nginx отдаёт без Django
+SNAPSHOT_ROOT = os.path.join(STATIC_ROOT, 'snapshots')
+# Публичный адрес API для ссылок пагинации, например https://yamdb.ru;
+# пустой — относительные ссылки
+SNAPSHOT_URL = os.getenv('SNAPSHOT_URL', default='')
+SNAPSHOT_PAGES = int(os.getenv('SNAPSHOT_PAGES', default=3))
+SNAPSHOT_TITLE_FILTERS = ()
+SNAPSHOT_ON_WRITE = os.getenv('SNAPSHOT_ON_WRITE', default='') == 'True'
+
+# Очередь отложенных задач, см. jobs.queue и manage.py run_worker
+JOBS_CONCURRENCY = int(os.getenv('JOBS_CONCURRENCY', default=2))
+JOBS_POLL_INTERVAL = 1
+JOBS_LOCK_TIMEOUT = 10 * 60
+JOBS_MAX_ATTEMPTS = 5
+JOBS_RETRY_BACKOFF = 10
+JOBS_RETRY_BACKOFF_MAX = 60 * 60
+JOBS_KEEP_DONE = 7 * 24 * 60 * 60
+JOBS_CLEANUP_INTERVAL = 60 * 60
+
+# Удаление пользователей и произведений с отзывами, см. reviews.deletion.
+# Если отзывов или комментариев больше PURGE_SYNC_LIMIT,
+# удаление выполняется в фоне.
+PURGE_CHUNK_SIZE = 1000
+PURGE_SYNC_LIMIT = 1000
+
+# Перенос отзывов с комментариями старше ARCHIVE_AFTER_DAYS в архивные
+# таблицы, см. reviews.archive и manage.py archive_reviews
+ARCHIVE_AFTER_DAYS = int(os.getenv('ARCHIVE_AFTER_DAYS', default=2 * 365))
+ARCHIVE_CHUNK_SIZE = 500
+
+# Записей в пачке manage.py check_integrity, см. reviews.integrity
+INTEGRITY_CHUNK_SIZE = 10000
+
+# Списки админки без полного COUNT(*), см. reviews.admin: выборки
+# с фильтрами считаются до ADMIN_COUNT_LIMIT записей, большие таблицы
+# без фильтров — по статистике PostgreSQL
+ADMIN_COUNT_LIMIT = 10000
+
+# Прогрев до первого запроса, см. api_yamdb.startup. Выполняется только
+# хуком when_ready gunicorn с preload_app, один раз в мастер-процессе;
+# импорт wsgi.py (manage.py, тесты, другие серверы) к БД не обращается.
+WSGI_WARMUP = os.getenv('WSGI_WARMUP', default='True') == 'True'
+WARMUP_PATHS = ('/api/v1/', '/api/v1/titles/')
+
+# Журнал медленных запросов к БД, см. api.querylog.
+# Пустой SLOW_QUERY_MS отключает журнал, SLOW_QUERY_LOG — файл
+# для manage.py slow_query_report в дополнение к stderr.
+SLOW_QUERY_MS = os.getenv('SLOW_QUERY_MS', default='200')
+SLOW_QUERY_MS = float(SLOW_QUERY_MS) if SLOW_QUERY_MS else None
+SLOW_QUERY_EXPLAIN_RATE = float(
+    os.getenv('SLOW_QUERY_EXPLAIN_RATE', default=0)
+)
+SLOW_QUERY_LOG = os.getenv('SLOW_QUERY_LOG', default='')
+
+# Профилирование отдельных запросов администратором, см. api.profiling
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', default='') == 'True'
+PROFILING_ROOT = os.getenv(
+    'PROFILING_ROOT', default=os.path.join(BASE_DIR, 'profiles')
+)
+PROFILING_SAMPLE_INTERVAL = 0.001
+PROFILING_KEEP = 50
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'slow_query_console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'message',
+        },
+    },
+    'loggers': {
+        'api.querylog': {
+            'handlers': ['slow_query_console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+if SLOW_QUERY_LOG:
+    LOGGING['handlers']['slow_query_file'] = {
+        'class': 'logging.handlers.WatchedFileHandler',
+        'filename': SLOW_QUERY_LOG,
+        'formatter': 'message',
+    }
+    LOGGING['loggers']['api.querylog']['handlers'].append('slow_query_file')
@@ -0,0 +1,129 @@
+"""Прогрев процесса до первого запроса и замеры времени запуска.
+
+Django многое делает лениво, при первом запросе: импортирует urls.py
+вместе со всеми views, сериализаторами, DRF, simplejwt и django_filters,
+компилирует регулярные выражения маршрутов, загружает классы из настроек
+DRF. warmup() делает это заранее: хук when_ready в gunicorn.conf.py
+с preload_app вызывает его один раз в мастер-процессе, и воркеры после
+fork сразу готовы отвечать. Ошибка прогрева только записывается в лог:
+недоступная БД не должна мешать запуску сервера.
+
+Модуль не импортирует Django на верхнем уровне: measure() запускается
+в свежем интерпретаторе и замеряет в том числе сам импорт Django.
+"""
+import io
+import json
+import logging
+import sys
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+def wsgi_environ(path):
+    return {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_ACCEPT': 'application/json',
+        'HTTP_ACCEPT_ENCODING': 'gzip',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': False,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+
+
+def call(application, path):
+    """GET-запрос к WSGI-приложению без сервера, возвращает статус."""
+    statuses = []
+
+    def start_response(status, headers, exc_info=None):
+        statuses.append(status)
+
+    response = application(wsgi_environ(path), start_response)
+    try:
+        for _ in response:
+            pass
+    finally:
+        response.close()
+    return statuses[0]
+
+
+def warmup(application, paths):
+    """Прогрев запросами к paths.
+
+    Ошибки записываются в лог и не прерывают запуск. Открытые при этом
+    соединения с БД и кэшем закрываются: после fork их разделили бы
+    все воркеры.
+    """
+    from django.core.cache import caches
+    from django.db import connections
+
+    for path in paths:
+        try:
+            status = call(application, path)
+        except Exception:
+            logger.exception('Прогрев %s не выполнен', path)
+            continue
+        if not status.startswith(('2', '3')):
+            logger.warning('Прогрев %s: ответ %s', path, status)
+    connections.close_all()
+    for cache in caches.all():
+        cache.close()
+
+
+class Timer:
+    """Длительность этапов в мс, по порядку."""
+
+    def __init__(self):
+        self.phases = []
+
+    def step(self, name, func):
+        start = time.perf_counter()
+        try:
+            return func()
+        finally:
+            self.phases.append(
+                (name, (time.perf_counter() - start) * 1000)
+            )
+
+
+def measure(paths, warm):
+    """Длительность этапов запуска в мс.
+
+    Без прогрева маршруты и DRF загружаются внутри первого запроса,
+    с прогревом — отдельными этапами до него.
+    """
+    timer = Timer()
+    timer.step('import django', lambda: __import__('django'))
+    import django
+    from django.conf import settings
+    timer.step('settings', lambda: settings.INSTALLED_APPS)
+    timer.step('django.setup()', django.setup)
+
+    from django.core.wsgi import get_wsgi_application
+    from django.urls import get_resolver
+    if warm:
+        resolver = get_resolver()
+        timer.step('urls.py', lambda: resolver.url_patterns)
+        timer.step('url resolver', resolver._populate)
+    application = timer.step('wsgi handler', get_wsgi_application)
+    if warm:
+        timer.step('warmup', lambda: warmup(application, paths))
+    timer.step('first request', lambda: call(application, paths[0]))
+    timer.step('second request', lambda: call(application, paths[0]))
+    return timer.phases
+
+
+def main():
+    """Точка входа для manage.py profile_startup: режим и пути в argv."""
+    mode, *paths = sys.argv[1:]
+    print(json.dumps(measure(paths, warm=mode == 'warm')))
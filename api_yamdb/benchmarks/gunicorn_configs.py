@@ -0,0 +1,157 @@
+"""Бенчмарк конфигураций gunicorn на списке произведений.
+
+Для каждой конфигурации запускает gunicorn с gunicorn.conf.py
+и переменными GUNICORN_*, нагружает /api/v1/titles/ из --clients
+потоков с постоянными соединениями в течение --duration секунд
+и выводит пропускную способность и перцентили задержки.
+Конфигурации с недоступным классом воркера (gevent) пропускаются.
+
+Запуск из каталога api_yamdb при настроенной БД:
+    python benchmarks/gunicorn_configs.py --clients 32 --duration 20
+"""
+import argparse
+import http.client
+import importlib.util
+import os
+import subprocess
+import sys
+import threading
+import time
+
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CPUS = os.cpu_count() or 1
+
+CONFIGS = {
+    'sync': {
+        'GUNICORN_WORKER_CLASS': 'sync',
+        'GUNICORN_WORKERS': str(CPUS * 2 + 1),
+    },
+    'gthread': {
+        'GUNICORN_WORKER_CLASS': 'gthread',
+        'GUNICORN_WORKERS': str(CPUS + 1),
+        'GUNICORN_THREADS': '4',
+    },
+    'gthread-wide': {
+        'GUNICORN_WORKER_CLASS': 'gthread',
+        'GUNICORN_WORKERS': str(max(2, CPUS // 2)),
+        'GUNICORN_THREADS': '16',
+    },
+    'gevent': {
+        'GUNICORN_WORKER_CLASS': 'gevent',
+        'GUNICORN_WORKERS': str(CPUS + 1),
+        'GUNICORN_WORKER_CONNECTIONS': '100',
+    },
+}
+
+
+def start(config, port):
+    env = dict(os.environ, GUNICORN_BIND=f'127.0.0.1:{port}', **config)
+    return subprocess.Popen(
+        ['gunicorn', 'api_yamdb.wsgi:application', '-c', 'gunicorn.conf.py'],
+        cwd=BASE_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+def wait_ready(port, path, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port)
+            connection.request('GET', path)
+            connection.getresponse().read()
+            return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def client(port, path, deadline, timings, errors):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        try:
+            connection.request('GET', path)
+            response = connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            errors.append(1)
+            connection.close()
+            continue
+        if response.status != 200:
+            errors.append(1)
+        timings.append(time.perf_counter() - started)
+
+
+def load(port, path, clients, duration):
+    timings, errors = [], []
+    deadline = time.monotonic() + duration
+    threads = [
+        threading.Thread(
+            target=client, args=(port, path, deadline, timings, errors)
+        )
+        for _ in range(clients)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return timings, errors
+
+
+def percentile(ordered, share):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+
+def report(name, timings, errors, duration):
+    if not timings:
+        print(f'{name:<14} нет успешных запросов, ошибок: {len(errors)}')
+        return
+    ordered = sorted(timings)
+    print(
+        f'{name:<14}{len(timings) / duration:9.1f} rps'
+        f'  p50 {percentile(ordered, 0.50) * 1000:7.1f} мс'
+        f'  p95 {percentile(ordered, 0.95) * 1000:7.1f} мс'
+        f'  p99 {percentile(ordered, 0.99) * 1000:7.1f} мс'
+        f'  ошибок {len(errors)}'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--path', default='/api/v1/titles/')
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument(
+        '--config', action='append', choices=CONFIGS,
+        help='Конфигурации для сравнения, по умолчанию все'
+    )
+    args = parser.parse_args()
+
+    for name in args.config or CONFIGS:
+        config = CONFIGS[name]
+        worker_class = config['GUNICORN_WORKER_CLASS']
+        if worker_class in ('gevent', 'eventlet') and (
+            importlib.util.find_spec(worker_class) is None
+        ):
+            print(f'{name:<14} пропущено: {worker_class} не установлен')
+            continue
+        server = start(config, args.port)
+        try:
+            if not wait_ready(args.port, args.path):
+                print(f'{name:<14} gunicorn не запустился')
+                continue
+            timings, errors = load(
+                args.port, args.path, args.clients, args.duration
+            )
+            report(name, timings, errors, args.duration)
+        finally:
+            server.terminate()
+            server.wait()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""Бенчмарк рендеринга и сжатия ответов API.
+
+Для страниц /titles/ и /titles/{id}/reviews/ из текущей базы измеряет
+время кодирования JSON стандартным рендерером DRF и FastJSONRenderer,
+а также размер ответа без сжатия, с gzip и brotli.
+
+Запуск из каталога api_yamdb:
+    python benchmarks/render.py --repeat 500
+"""
+import argparse
+import os
+import sys
+import timeit
+
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+django.setup()
+
+from django.test import RequestFactory  # noqa: E402
+from django.urls import resolve  # noqa: E402
+from django.utils.text import compress_string  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from api.middleware import brotli  # noqa: E402
+from api.renderers import FastJSONRenderer, orjson  # noqa: E402
+from reviews.models import Title  # noqa: E402
+
+
+def page_data(path):
+    """Данные страницы списка в том виде, в котором их получает рендерер."""
+    match = resolve(path)
+    response = match.func(RequestFactory().get(path), **match.kwargs)
+    return response.data
+
+
+def measure(path, repeat):
+    data = page_data(path)
+    print(f'\n{path}')
+    for renderer in (JSONRenderer(), FastJSONRenderer()):
+        seconds = timeit.timeit(lambda: renderer.render(data), number=repeat)
+        print(
+            f'  {type(renderer).__name__:<18}'
+            f'{seconds / repeat * 1e6:10.1f} мкс/ответ'
+        )
+    content = FastJSONRenderer().render(data)
+    print(f'  {"identity":<18}{len(content):10d} байт')
+    print(f'  {"gzip":<18}{len(compress_string(content)):10d} байт')
+    if brotli is not None:
+        compressed = brotli.compress(content, quality=5)
+        print(f'  {"br":<18}{len(compressed):10d} байт')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+    print(f'orjson: {"да" if orjson else "нет"}, '
+          f'brotli: {"да" if brotli else "нет"}')
+    title = Title.objects.order_by('-review_count').first()
+    if title is None:
+        sys.exit('В базе нет произведений')
+    measure('/api/v1/titles/', args.repeat)
+    measure(f'/api/v1/titles/{title.pk}/reviews/', args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""Бенчмарк поиска пользователей в админском списке /users/.
+
+Дополняет таблицу пользователей синтетическими записями до --users,
+затем замеряет время типичных запросов администратора через API
+и сравнивает 95-й перцентиль с бюджетом --budget-ms.
+Завершается с кодом 1, если бюджет превышен. Всё выполняется в одной
+транзакции, которая в конце откатывается: синтетические пользователи
+в базе не остаются.
+
+Запуск из каталога api_yamdb:
+    python benchmarks/user_lookup.py --users 1000000 --budget-ms 50
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+django.setup()
+
+from django.db import connection, transaction  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+from reviews.models import User  # noqa: E402
+
+
+PREFIX = 'bench_user_'
+ROLES = ('user',) * 97 + ('moderator',) * 2 + ('admin',)
+
+
+def fill_users(total, batch_size=10000):
+    """Дозаполнение таблицы пользователей до total записей."""
+    existing = User.objects.filter(username__startswith=PREFIX).count()
+    rnd = random.Random(existing)
+    for start in range(existing, total, batch_size):
+        stop = min(start + batch_size, total)
+        with transaction.atomic():
+            User.objects.bulk_create(
+                User(
+                    username=f'{PREFIX}{number}',
+                    email=f'{PREFIX}{number}@example.com',
+                    role=rnd.choice(ROLES),
+                )
+                for number in range(start, stop)
+            )
+        print(f'\rсоздано {stop}/{total}', end='', flush=True)
+    print()
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE reviews_user')
+
+
+def measure(client, url, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.get(url)
+        timings.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200, (url, response.status_code)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95)]
+
+
+def run(args):
+    """Замеры запросов, возвращает True, если бюджет превышен."""
+    fill_users(args.users)
+    admin = User.objects.filter(role='admin').first()
+    client = APIClient()
+    client.force_authenticate(admin)
+    sample = args.users // 2
+    urls = (
+        f'/api/v1/users/?search={PREFIX}{sample}',
+        f'/api/v1/users/?search={sample}@example',
+        '/api/v1/users/?role=moderator',
+        '/api/v1/users/?role=admin&ordering=-username',
+        f'/api/v1/users/{PREFIX}{sample}/',
+    )
+    over_budget = False
+    print(f'{"запрос":<55}{"p50, мс":>10}{"p95, мс":>10}')
+    for url in urls:
+        p50, p95 = measure(client, url, args.repeat)
+        over_budget |= p95 > args.budget_ms
+        print(f'{url:<55}{p50:10.1f}{p95:10.1f}')
+    return over_budget
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=1000000)
+    parser.add_argument('--budget-ms', type=float, default=50)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+    with transaction.atomic():
+        over_budget = run(args)
+        transaction.set_rollback(True)
+    if over_budget:
+        sys.exit(f'p95 превышает бюджет {args.budget_ms} мс')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""Настройки gunicorn.
+
+Количество воркеров и потоков считается от числа доступных контейнеру
+CPU и переопределяется переменными окружения GUNICORN_*. По умолчанию
+воркеры gthread: запрос к API большую часть времени ждёт PostgreSQL,
+и потоки позволяют обслуживать несколько запросов в одном процессе
+без роста памяти. Асинхронные воркеры (GUNICORN_WORKER_CLASS=gevent)
+требуют установленных gevent и psycogreen.
+
+Время ожидания запроса в очереди считается по заголовку X-Request-Start,
+который ставит nginx.
+"""
+import importlib
+import math
+import os
+import time
+
+
+def cpu_count():
+    """CPU, доступные процессу, с учётом квоты cgroup v2."""
+    try:
+        count = len(os.sched_getaffinity(0))
+    except AttributeError:
+        count = os.cpu_count() or 1
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as cpu_max:
+            quota, period = cpu_max.read().split()
+        if quota != 'max':
+            count = min(count, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return count
+
+
+CPUS = cpu_count()
+
+bind = os.getenv('GUNICORN_BIND', default='0.0.0.0:8000')
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', default='gthread')
+if worker_class == 'gthread':
+    workers = CPUS + 1
+    threads = 4
+else:
+    workers = CPUS * 2 + 1
+    threads = 1
+workers = int(os.getenv('GUNICORN_WORKERS', default=workers))
+threads = int(os.getenv('GUNICORN_THREADS', default=threads))
+# Одновременные соединения на воркер gevent/eventlet
+worker_connections = int(
+    os.getenv('GUNICORN_WORKER_CONNECTIONS', default=100)
+)
+
+# Приложение загружается и прогревается (when_ready) в мастере до fork,
+# см. api_yamdb.startup
+preload_app = True
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', default=30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', default=30))
+keepalive = 5
+
+# Перезапуск воркеров против утечек памяти; разброс не даёт
+# всем воркерам перезапуститься одновременно
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', default=2000))
+max_requests_jitter = max_requests // 10
+
+# Метрики gunicorn и очереди запросов, например statsd:8125
+statsd_host = os.getenv('GUNICORN_STATSD_HOST')
+statsd_prefix = 'yamdb'
+
+QUEUE_WARNING_MS = int(os.getenv('GUNICORN_QUEUE_WARNING_MS', default=100))
+
+
+def when_ready(server):
+    """Прогрев приложения в мастере после preload, до запуска воркеров."""
+    if not server.cfg.preload_app:
+        return
+    from django.conf import settings
+    if settings.WSGI_WARMUP:
+        from api_yamdb.startup import warmup
+        warmup(server.app.wsgi(), settings.WARMUP_PATHS)
+
+
+def pre_fork(server, worker):
+    if server.cfg.preload_app:
+        # Соединения, открытые мастером, не должны достаться воркерам
+        from django.db import connections
+        connections.close_all()
+
+
+def post_fork(server, worker):
+    if worker_class not in ('gevent', 'eventlet'):
+        return
+    try:
+        green = importlib.import_module(f'psycogreen.{worker_class}')
+    except ImportError:
+        server.log.warning(
+            'psycogreen не установлен: запросы к PostgreSQL '
+            'блокируют весь воркер %s', worker_class
+        )
+        return
+    green.patch_psycopg()
+
+
+def request_start(req):
+    """Время приёма запроса nginx из X-Request-Start: t=<секунды>."""
+    for name, value in req.headers:
+        if name == 'X-REQUEST-START':
+            try:
+                return float(value.replace('t=', '', 1))
+            except ValueError:
+                return None
+    return None
+
+
+def pre_request(worker, req):
+    started = request_start(req)
+    if started is None:
+        return
+    waited = max(0.0, time.time() - started) * 1000
+    # У gthread — принятые воркером соединения, часть из которых
+    # ждёт свободного потока
+    busy = len(getattr(worker, 'futures', ()))
+    if hasattr(worker.log, 'histogram'):
+        worker.log.histogram('gunicorn.request.queue_time', waited)
+        worker.log.gauge('gunicorn.worker.busy', busy)
+    if waited > QUEUE_WARNING_MS:
+        worker.log.warning(
+            'Запрос %s ждал в очереди %.0f мс, соединений в воркере: %s',
+            req.path, waited, busy
+        )
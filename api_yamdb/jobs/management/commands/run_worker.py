@@ -0,0 +1,82 @@
+import logging
+import signal
+import threading
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.db import DatabaseError, connection
+
+from jobs import queue
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Запускает обработчик очереди отложенных задач'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', type=int, default=settings.JOBS_CONCURRENCY,
+            help='Количество потоков-обработчиков'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить готовые задачи и завершиться'
+        )
+
+    def handle(self, *args, **options):
+        if options['once']:
+            processed = queue.run_pending()
+            connection.close()
+            self.stdout.write(f'Выполнено задач: {processed}')
+            return
+        self.stopping = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *args: self.stopping.set())
+        signal.signal(signal.SIGINT, lambda *args: self.stopping.set())
+        workers = [
+            threading.Thread(target=self.work, name=f'worker-{number}')
+            for number in range(options['concurrency'])
+        ]
+        for worker in workers:
+            worker.start()
+        self.stdout.write(f'Запущено обработчиков: {len(workers)}')
+        while not self.stopping.is_set():
+            queue.cleanup()
+            connection.close()
+            self.stopping.wait(settings.JOBS_CLEANUP_INTERVAL)
+        for worker in workers:
+            worker.join()
+
+    def work(self):
+        """Цикл потока: выполнять задачи, пока они есть, затем ждать.
+
+        Ошибка БД не завершает поток: соединение закрывается,
+        а следующая попытка — после JOBS_POLL_INTERVAL.
+        """
+        try:
+            while not self.stopping.is_set():
+                try:
+                    busy = self.work_once()
+                except DatabaseError:
+                    logger.exception('Ошибка БД в обработчике очереди')
+                    connection.close()
+                    busy = False
+                if not busy:
+                    self.stopping.wait(settings.JOBS_POLL_INTERVAL)
+        finally:
+            connection.close()
+
+    def work_once(self):
+        """Выполнение одной задачи; False, если готовых задач нет."""
+        job = queue.claim()
+        if job is None:
+            return False
+        started = time.monotonic()
+        ok = queue.run(job)
+        self.stdout.write(
+            f'{job} {"выполнена" if ok else "ошибка"} '
+            f'за {time.monotonic() - started:.2f} с'
+        )
+        return True
@@ -0,0 +1,65 @@
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """Отложенная задача в очереди на базе таблицы БД"""
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Ожидает'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField(
+        max_length=100,
+        verbose_name='Обработчик'
+    )
+    payload = models.TextField(
+        default='{}',
+        verbose_name='Аргументы в JSON'
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=PENDING
+    )
+    idempotency_key = models.CharField(
+        max_length=255,
+        blank=True,
+        null=True,
+        verbose_name='Ключ идемпотентности'
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True, default='')
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Задача'
+        verbose_name_plural = 'Задачи'
+        indexes = (
+            models.Index(
+                fields=('status', 'run_after'),
+                name='job_status_run_after_idx'
+            ),
+        )
+        constraints = (
+            # Одинаковые ожидающие задачи схлопываются в одну
+            models.UniqueConstraint(
+                fields=('idempotency_key',),
+                condition=Q(status='pending'),
+                name='unique_pending_idempotency_key'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.name} #{self.pk} ({self.status})'
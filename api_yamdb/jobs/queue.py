@@ -0,0 +1,162 @@
+"""Очередь отложенных задач в таблице БД.
+
+Задача ставится в очередь в той же транзакции, что и изменение данных,
+поэтому откат транзакции отменяет и задачу. Воркеры (manage.py run_worker)
+забирают задачи через SELECT ... FOR UPDATE SKIP LOCKED, а на SQLite,
+где блокировок строк нет, — условным UPDATE по статусу.
+"""
+import json
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from jobs.models import Job
+
+
+logger = logging.getLogger(__name__)
+
+HANDLERS = {}
+
+
+def task(name):
+    """Регистрация обработчика задачи под именем name.
+
+    Обработчик получает аргументы из payload как именованные
+    и должен быть идемпотентным: задача может выполниться повторно.
+    """
+
+    def decorator(func):
+        HANDLERS[name] = func
+        return func
+
+    return decorator
+
+
+def enqueue(name, payload=None, idempotency_key=None, delay=0,
+            max_attempts=None):
+    """Постановка задачи в очередь.
+
+    Если ожидающая задача с тем же idempotency_key уже есть,
+    новая не создаётся и возвращается None.
+    """
+    job = Job(
+        name=name,
+        payload=json.dumps(payload or {}),
+        idempotency_key=idempotency_key,
+        run_after=timezone.now() + timedelta(seconds=delay),
+        max_attempts=max_attempts or settings.JOBS_MAX_ATTEMPTS,
+    )
+    try:
+        with transaction.atomic():
+            job.save()
+    except IntegrityError:
+        if idempotency_key is None:
+            raise
+        return None
+    return job
+
+
+def claim():
+    """Захват одной готовой к выполнению задачи.
+
+    Задачи в статусе running, чей воркер не отчитался дольше
+    JOBS_LOCK_TIMEOUT секунд, считаются брошенными и захватываются снова.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.JOBS_LOCK_TIMEOUT)
+    ready = (
+        Q(status=Job.PENDING, run_after__lte=now)
+        | Q(status=Job.RUNNING, locked_at__lt=stale)
+    )
+    while True:
+        with transaction.atomic():
+            job = (
+                Job.objects.select_for_update(skip_locked=True)
+                .filter(ready)
+                .order_by('run_after', 'pk')
+                .first()
+            )
+            if job is None:
+                return None
+            claimed = Job.objects.filter(
+                pk=job.pk, status=job.status, attempts=job.attempts
+            ).update(
+                status=Job.RUNNING,
+                locked_at=now,
+                attempts=F('attempts') + 1,
+            )
+        if claimed:
+            job.refresh_from_db()
+            return job
+
+
+def retry_delay(attempts):
+    """Экспоненциальная задержка перед повторной попыткой."""
+    return min(
+        settings.JOBS_RETRY_BACKOFF * 2 ** (attempts - 1),
+        settings.JOBS_RETRY_BACKOFF_MAX,
+    )
+
+
+def fail(job, error):
+    job.last_error = error
+    job.locked_at = None
+    if job.attempts >= job.max_attempts:
+        job.status = Job.FAILED
+        logger.error('Задача %s окончательно не выполнена', job)
+    else:
+        job.status = Job.PENDING
+        job.run_after = timezone.now() + timedelta(
+            seconds=retry_delay(job.attempts)
+        )
+    try:
+        with transaction.atomic():
+            job.save()
+    except IntegrityError:
+        # Такая же задача уже ждёт в очереди и выполнит ту же работу
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.DONE, last_error=error
+        )
+
+
+def run(job):
+    """Выполнение задачи и запись результата."""
+    handler = HANDLERS.get(job.name)
+    if handler is None:
+        fail(job, f'Нет обработчика для задачи {job.name}')
+        return False
+    try:
+        handler(**json.loads(job.payload))
+    except Exception:
+        logger.exception('Ошибка выполнения задачи %s', job)
+        fail(job, traceback.format_exc())
+        return False
+    Job.objects.filter(pk=job.pk).update(
+        status=Job.DONE, locked_at=None, last_error=''
+    )
+    return True
+
+
+def run_pending():
+    """Выполнение всех готовых задач в текущем потоке."""
+    processed = 0
+    job = claim()
+    while job is not None:
+        run(job)
+        processed += 1
+        job = claim()
+    return processed
+
+
+def cleanup():
+    """Удаление выполненных задач старше JOBS_KEEP_DONE секунд."""
+    border = timezone.now() - timedelta(seconds=settings.JOBS_KEEP_DONE)
+    deleted, _ = Job.objects.filter(
+        status=Job.DONE, created__lt=border
+    ).delete()
+    return deleted
@@ -1,13 +1,107 @@
+from django.conf import settings
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from django.core.paginator import Paginator
+from django.db import connection
+from django.utils.functional import cached_property
 
-from reviews.models import User, Title, Genre, Category, Review, Comment
+from reviews.models import (
+    User, Title, Genre, Category, Review, Comment, TitleGenre
+)
+
+
+def table_estimate(model):
+    """Оценка числа строк таблицы по статистике PostgreSQL"""
+    if connection.vendor != 'postgresql':
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+            (model._meta.db_table,)
+        )
+        row = cursor.fetchone()
+    return int(row[0]) if row else 0
+
+
+class EstimatedCountPaginator(Paginator):
+    """Страницы списков админки без полного COUNT(*).
+
+    Без фильтров и поиска для больших таблиц количество берётся
+    из статистики PostgreSQL. Выборка с фильтрами считается
+    не дальше ADMIN_COUNT_LIMIT записей: дальние страницы таких
+    выборок недоступны, их сужают фильтрами.
+    """
+
+    @cached_property
+    def count(self):
+        limit = settings.ADMIN_COUNT_LIMIT
+        if not self.object_list.query.where:
+            estimate = table_estimate(self.object_list.model)
+            if estimate > limit:
+                return estimate
+        return self.object_list[:limit].count()
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Список большой таблицы: без полного подсчёта записей"""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+class TitleGenreInline(admin.TabularInline):
+    model = TitleGenre
+    extra = 1
+
+
+@admin.register(Title)
+class TitleAdmin(LargeTableAdmin):
+    inlines = (TitleGenreInline,)
+    list_display = ('pk', 'name', 'year', 'category', 'review_count')
+    list_select_related = ('category',)
+    list_filter = ('category',)
+    # Триграммный индекс title_name_trgm_idx
+    search_fields = ('name',)
+    ordering = ('-pk',)
+
+
+class RecordAdmin(LargeTableAdmin):
+    """Отзывы и комментарии: очередь модерации и поиск по автору"""
+    raw_id_fields = ('author',)
+    list_filter = ('is_hidden',)
+    # Триграммный индекс user_username_trgm_idx
+    search_fields = ('author__username',)
+    ordering = ('-pk',)
+
+    def author_username(self, obj):
+        return obj.author.username
+
+    author_username.short_description = 'Автор'
+
+
+@admin.register(Review)
+class ReviewAdmin(RecordAdmin):
+    raw_id_fields = ('title', 'author')
+    list_display = (
+        'pk', 'title', 'author_username', 'score', 'pub_date', 'is_hidden'
+    )
+    list_select_related = ('title', 'author')
+
+
+@admin.register(Comment)
+class CommentAdmin(RecordAdmin):
+    raw_id_fields = ('review', 'author')
+    list_display = ('pk', 'review', 'author_username', 'pub_date', 'is_hidden')
+    list_select_related = ('review', 'author')
+
+
+@admin.register(User)
+class YamdbUserAdmin(LargeTableAdmin, UserAdmin):
+    list_display = ('username', 'email', 'role', 'is_staff')
+    list_filter = ('role',)
+    # Триграммные индексы из миграции 0005_user_search_indexes
+    search_fields = ('username', 'email')
+    ordering = ('username',)
 
 
-admin.site.register(Title)
 admin.site.register(Genre)
 admin.site.register(Category)
-admin.site.register(Review)
-admin.site.register(Comment)
-
-admin.site.register(User, UserAdmin)
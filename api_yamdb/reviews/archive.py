@@ -0,0 +1,138 @@
+"""Перенос старых отзывов и комментариев в архивные таблицы.
+
+Переносится отзыв целиком, с комментариями, если и отзыв,
+и все комментарии к нему старше горизонта: обсуждения с недавними
+комментариями остаются в основных таблицах. Поэтому у отзыва
+основной таблицы нет архивных комментариев, и наоборот.
+
+Записи переносятся пачками по chunk_size отзывов, каждая пачка —
+в своей транзакции. id и значения полей сохраняются. Счётчики
+произведений и отзывов не меняются: они учитывают и архивные записи,
+см. reviews.counters. Архивные записи доступны только на чтение,
+списки API читают их после записей основной таблицы (HotArchiveList).
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from reviews.deletion import raw_delete
+from reviews.models import (
+    ArchivedComment, ArchivedReview, Comment, Review,
+)
+
+
+REVIEW_FIELDS = (
+    'id', 'title_id', 'author_id', 'text', 'score', 'pub_date',
+    'is_hidden', 'comment_count',
+)
+COMMENT_FIELDS = (
+    'id', 'review_id', 'author_id', 'text', 'pub_date', 'is_hidden',
+)
+ORDERING = ('-pub_date', '-pk')
+
+
+def candidates(border):
+    """Отзывы старше border без комментариев новее border."""
+    return Review.objects.annotate(
+        recent_comments=Exists(Comment.objects.filter(
+            review=OuterRef('pk'), pub_date__gte=border
+        ))
+    ).filter(pub_date__lt=border, recent_comments=False)
+
+
+def copy(source, target, fields):
+    target.objects.bulk_create(
+        (target(**row) for row in source.values(*fields).iterator()),
+        batch_size=500,
+    )
+
+
+def archive_chunk(ids, border):
+    """Перенос пачки отзывов, возвращает (отзывов, комментариев).
+
+    Отзывы блокируются и проверяются повторно: комментарий,
+    добавленный после выбора пачки, оставит отзыв в основной таблице.
+    """
+    with transaction.atomic():
+        list(Review.objects.select_for_update().filter(pk__in=ids)
+             .values_list('pk'))
+        ids = list(candidates(border).filter(pk__in=ids)
+                   .values_list('pk', flat=True))
+        reviews = Review.objects.filter(pk__in=ids)
+        comments = Comment.objects.filter(review_id__in=ids)
+        copy(reviews, ArchivedReview, REVIEW_FIELDS)
+        copy(comments, ArchivedComment, COMMENT_FIELDS)
+        moved_comments = raw_delete(comments)
+        return raw_delete(reviews), moved_comments
+
+
+def archive(days=None, chunk_size=None, progress=None):
+    """Перенос отзывов старше days дней.
+
+    progress вызывается после каждой пачки со словарём количества
+    перенесённых отзывов и комментариев.
+    """
+    days = days or settings.ARCHIVE_AFTER_DAYS
+    chunk_size = chunk_size or settings.ARCHIVE_CHUNK_SIZE
+    border = timezone.now() - timedelta(days=days)
+    moved = {'reviews': 0, 'comments': 0}
+    last_pk = 0
+    while True:
+        ids = list(
+            candidates(border).filter(pk__gt=last_pk).order_by('pk')
+            .values_list('pk', flat=True)[:chunk_size]
+        )
+        if not ids:
+            return moved
+        reviews, comments = archive_chunk(ids, border)
+        moved['reviews'] += reviews
+        moved['comments'] += comments
+        last_pk = ids[-1]
+        if progress is not None:
+            progress(moved)
+
+
+class HotArchiveList:
+    """Записи основной таблицы, за ними — архивные, для Paginator.
+
+    Архив запрашивается, только когда страница выходит за основную
+    таблицу. count — общее количество, если оно уже известно
+    из счётчиков; иначе считается двумя COUNT.
+    """
+
+    def __init__(self, hot, archived, count=None):
+        self.hot = hot
+        self.archived = archived
+        self.total = count
+        self.hot_total = None
+
+    def count(self):
+        if self.total is None:
+            self.total = self.hot_count() + self.archived.count()
+        return self.total
+
+    def __len__(self):
+        return self.count()
+
+    def hot_count(self):
+        if self.hot_total is None:
+            self.hot_total = self.hot.count()
+        return self.hot_total
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        start, stop = key.start or 0, key.stop
+        if stop is None:
+            stop = self.count()
+        records = list(self.hot[start:stop])
+        if len(records) == stop - start:
+            return records
+        if records or start == 0:
+            self.hot_total = start + len(records)
+        skip = max(start - self.hot_count(), 0)
+        records.extend(self.archived[skip:stop - self.hot_count()])
+        return records
@@ -3,6 +3,7 @@ import csv
 from django.conf import settings
 from django.core.management import BaseCommand
 
+from reviews.counters import refresh_review_counters, refresh_title_counters
 from reviews.models import (
     User,
     Category,
@@ -36,5 +37,7 @@ class Command(BaseCommand):
             ) as csv_file:
                 reader = csv.DictReader(csv_file)
                 model.objects.bulk_create(model(**data) for data in reader)
+        refresh_title_counters()
+        refresh_review_counters()
 
         self.stdout.write(self.style.SUCCESS('Данные загружены'))
@@ -0,0 +1,62 @@
+"""Пересчёт счётчиков отзывов, оценок и комментариев.
+
+Используется после массовых операций (bulk_create, удаление наборами),
+которые не отправляют сигналы и не обновляют счётчики построчно.
+Учитываются только видимые отзывы и комментарии, в том числе
+архивные (см. reviews.archive).
+"""
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from reviews.models import (
+    ArchivedComment, ArchivedReview, Comment, Review, Title,
+)
+
+
+# Комментарии отзывов основной таблицы и архива
+COMMENTS = {Review: Comment, ArchivedReview: ArchivedComment}
+
+
+def grouped(queryset, group_by, aggregate):
+    """Подзапрос с агрегатом по родительской записи."""
+    return Coalesce(Subquery(
+        queryset.filter(**{group_by: OuterRef('pk')})
+        .order_by()
+        .values(group_by)
+        .annotate(value=aggregate)
+        .values('value')
+    ), 0)
+
+
+def visible(model):
+    return model.objects.filter(is_hidden=False)
+
+
+def refresh_title_counters(titles=None):
+    """Пересчёт количества отзывов и суммы оценок одним UPDATE."""
+    if titles is None:
+        titles = Title.objects.all()
+    return titles.update(
+        review_count=(
+            grouped(visible(Review), 'title', Count('pk'))
+            + grouped(visible(ArchivedReview), 'title', Count('pk'))
+        ),
+        score_total=(
+            grouped(visible(Review), 'title', Sum('score'))
+            + grouped(visible(ArchivedReview), 'title', Sum('score'))
+        ),
+    )
+
+
+def refresh_review_counters(reviews=None):
+    """Пересчёт количества комментариев одним UPDATE.
+
+    reviews — отзывы основной таблицы или архива.
+    """
+    if reviews is None:
+        reviews = Review.objects.all()
+    return reviews.update(
+        comment_count=grouped(
+            visible(COMMENTS[reviews.model]), 'review', Count('pk')
+        ),
+    )
@@ -0,0 +1,132 @@
+"""Быстрое удаление пользователей и произведений со всеми отзывами.
+
+Стандартный Collector Django загружает в память каждый связанный отзыв
+и комментарий, чтобы отправить по ним сигналы. Здесь связанные строки
+удаляются наборами по первичному ключу пачками по chunk_size, без загрузки
+объектов, а счётчики затронутых отзывов и произведений пересчитываются
+одним UPDATE на пачку. В памяти одновременно находится не больше
+chunk_size идентификаторов. Архивные отзывы и комментарии
+удаляются так же, как записи основных таблиц.
+
+Сигналы post_delete при этом не отправляются. Вместо них после каждой
+пачки в той же транзакции отправляется сигнал purged со списком
+удалённых записей: по нему обновляются популярность, события
+и снимки каталога.
+"""
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import F
+from django.dispatch import Signal
+
+from reviews.counters import (
+    COMMENTS,
+    refresh_review_counters,
+    refresh_title_counters,
+)
+from reviews.models import (
+    ArchivedComment, ArchivedReview, Comment, Review, Title, User,
+)
+
+
+# sender — модель, records — словари pk, title_id, review_id
+# (для комментариев) и is_hidden удалённых записей пачки
+purged = Signal(providing_args=['records'])
+
+
+def raw_delete(queryset):
+    """DELETE по условию queryset без загрузки объектов и сигналов."""
+    return queryset._raw_delete(router.db_for_write(queryset.model))
+
+
+def chunks(queryset, chunk_size):
+    """Пачки первичных ключей, пока queryset не опустеет.
+
+    Каждая пачка должна быть удалена до запроса следующей.
+    """
+    while True:
+        ids = list(queryset.values_list('pk', flat=True)[:chunk_size])
+        if not ids:
+            return
+        yield ids
+
+
+class Purge:
+    """Удаление с учётом прогресса.
+
+    progress вызывается после каждой пачки со словарём количества
+    удалённых комментариев и отзывов.
+    """
+
+    def __init__(self, chunk_size=None, progress=None):
+        self.chunk_size = chunk_size or settings.PURGE_CHUNK_SIZE
+        self.progress = progress or (lambda deleted: None)
+        self.deleted = {'comments': 0, 'reviews': 0}
+
+    def delete_comments(self, comments, refresh_reviews=True):
+        model = comments.model
+        reviews = model._meta.get_field('review').related_model
+        for ids in chunks(comments.order_by('pk'), self.chunk_size):
+            records = list(model.objects.filter(pk__in=ids).values(
+                'pk', 'review_id', 'is_hidden', title_id=F('review__title')
+            ))
+            with transaction.atomic():
+                self.deleted['comments'] += raw_delete(
+                    model.objects.filter(pk__in=ids)
+                )
+                if refresh_reviews:
+                    refresh_review_counters(reviews.objects.filter(
+                        pk__in={record['review_id'] for record in records}
+                    ))
+                purged.send(sender=model, records=records)
+            self.progress(self.deleted)
+
+    def delete_reviews(self, reviews):
+        model = reviews.model
+        for ids in chunks(reviews.order_by('pk'), self.chunk_size):
+            records = list(model.objects.filter(pk__in=ids).values(
+                'pk', 'title_id', 'is_hidden'
+            ))
+            self.delete_comments(
+                COMMENTS[model].objects.filter(review_id__in=ids),
+                refresh_reviews=False
+            )
+            with transaction.atomic():
+                self.deleted['reviews'] += raw_delete(
+                    model.objects.filter(pk__in=ids)
+                )
+                refresh_title_counters(Title.objects.filter(
+                    pk__in={record['title_id'] for record in records}
+                ))
+                purged.send(sender=model, records=records)
+            self.progress(self.deleted)
+
+    def record(self, instance):
+        """Удаление одного отзыва с комментариями или комментария."""
+        records = type(instance).objects.filter(pk=instance.pk)
+        if type(instance) in COMMENTS:
+            self.delete_reviews(records)
+        else:
+            self.delete_comments(records)
+
+    def user(self, user_id):
+        """Удаление пользователя с его отзывами и комментариями."""
+        for model in (Comment, ArchivedComment):
+            self.delete_comments(model.objects.filter(author_id=user_id))
+        for model in (Review, ArchivedReview):
+            self.delete_reviews(model.objects.filter(author_id=user_id))
+        User.objects.filter(pk=user_id).delete()
+
+    def title(self, title_id):
+        """Удаление произведения с отзывами и комментариями к ним."""
+        for model in (Review, ArchivedReview):
+            self.delete_reviews(model.objects.filter(title_id=title_id))
+        Title.objects.filter(pk=title_id).delete()
+
+
+def is_large(queryset):
+    """Больше ли в queryset строк, чем PURGE_SYNC_LIMIT.
+
+    Такие наборы удаляются в фоне, а не во время запроса.
+    """
+    limit = settings.PURGE_SYNC_LIMIT
+    return queryset.order_by()[limit:limit + 1].exists()
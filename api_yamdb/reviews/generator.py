@@ -0,0 +1,367 @@
+"""Синтетические данные для проверки под нагрузкой, см. generate_data.
+
+Строки генерируются потоком в формате static/data/*.csv: в памяти
+держатся только распределения по произведениям, а не отзывы
+и комментарии. У каждой таблицы свой Random от seed, поэтому
+одинаковые seed, scale и end дают одинаковые данные.
+
+Популярность произведений распределена по закону Ципфа: немногие
+произведения собирают большую часть отзывов. Число отзывов автора
+и комментариев к отзыву распределено геометрически, большинство
+отзывов без комментариев. Оценки разбросаны вокруг «качества»
+произведения, средняя — около 7. Количества отзывов и комментариев
+приблизительны: автор оценивает произведение не больше одного раза.
+"""
+import csv
+import itertools
+import math
+import os
+import random
+from datetime import timedelta
+
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+
+from reviews.models import (
+    Category, Comment, Genre, Review, Title, TitleGenre, User,
+)
+
+
+# Количества записей при scale=1
+SIZES = {'users': 1000, 'titles': 500, 'reviews': 20000, 'comments': 10000}
+CATEGORIES = (('Фильм', 'movie'), ('Книга', 'book'), ('Музыка', 'music'))
+GENRES = (
+    ('Драма', 'drama'), ('Комедия', 'comedy'), ('Вестерн', 'western'),
+    ('Фэнтези', 'fantasy'), ('Фантастика', 'sci-fi'),
+    ('Детектив', 'detective'), ('Триллер', 'thriller'), ('Сказка', 'tale'),
+    ('Роман', 'roman'), ('Классика', 'classical'), ('Рок', 'rock'),
+)
+ROLES = ('user', 'moderator', 'admin')
+ROLE_WEIGHTS = (989, 10, 1)
+WORDS = (
+    'фильм', 'книга', 'сюжет', 'герой', 'финал', 'автор', 'музыка',
+    'история', 'диалоги', 'атмосфера', 'актёры', 'смысл', 'очень',
+    'совсем', 'неожиданно', 'скучно', 'сильно', 'красиво', 'затянуто',
+    'понравился', 'разочаровал', 'советую', 'пересмотрю', 'не',
+    'как', 'и', 'но', 'всё', 'это', 'слишком', 'лучше', 'хуже',
+)
+TEXT_WORDS = (3, 40)
+ADJECTIVES = (
+    'Тихий', 'Последний', 'Красный', 'Долгий', 'Северный', 'Забытый',
+    'Новый', 'Странный', 'Зимний', 'Большой',
+)
+NOUNS = (
+    'дом', 'путь', 'берег', 'сад', 'город', 'остров', 'вечер', 'поезд',
+    'ветер', 'мост',
+)
+ZIPF_EXPONENT = 1.07
+SCORE_SPREAD = 1.5
+# Отзывы распределены по этому сроку до end
+PERIOD = timedelta(days=5 * 365)
+# Среднее время от отзыва до комментария, секунды
+COMMENT_DELAY = 3 * 24 * 60 * 60
+
+# Файл и столбцы static/data для каждой таблицы, в порядке загрузки
+TABLES = {
+    'users': (User, 'users.csv', (
+        'id', 'username', 'email', 'role', 'bio', 'first_name', 'last_name',
+    )),
+    'categories': (Category, 'category.csv', ('id', 'name', 'slug')),
+    'genres': (Genre, 'genre.csv', ('id', 'name', 'slug')),
+    'titles': (Title, 'titles.csv', ('id', 'name', 'year', 'category')),
+    'genre_titles': (TitleGenre, 'genre_title.csv', (
+        'id', 'title_id', 'genre_id',
+    )),
+    'reviews': (Review, 'review.csv', (
+        'id', 'title_id', 'text', 'author', 'score', 'pub_date',
+    )),
+    'comments': (Comment, 'comments.csv', (
+        'id', 'review_id', 'text', 'author', 'pub_date',
+    )),
+}
+# Столбцы CSV, которые называются не как атрибуты моделей
+ATTNAMES = {'author': 'author_id', 'category': 'category_id'}
+
+
+def geometric(rng, mean):
+    """Целое >= 0 со средним mean: целая часть экспоненциального."""
+    if mean <= 0:
+        return 0
+    return int(rng.expovariate(math.log1p(1 / mean)))
+
+
+def text(rng):
+    words = rng.choices(WORDS, k=rng.randint(*TEXT_WORDS))
+    return ' '.join(words).capitalize() + '.'
+
+
+class Generator:
+    """Строки таблиц: кортежи значений в порядке столбцов TABLES.
+
+    first_ids — первые id таблиц, по умолчанию 1: при вставке
+    в непустую базу новые записи идут после существующих.
+    """
+
+    def __init__(self, seed, scale, end, first_ids=None):
+        self.seed = seed
+        self.end = end
+        self.sizes = {
+            name: max(1, int(size * scale)) for name, size in SIZES.items()
+        }
+        self.sizes.update(categories=len(CATEGORIES), genres=len(GENRES))
+        self.first = dict.fromkeys(TABLES, 1)
+        self.first.update(first_ids or {})
+
+    def random(self, table):
+        return random.Random(f'{self.seed}:{table}')
+
+    def ids(self, table):
+        return range(self.first[table], self.first[table] + self.sizes[table])
+
+    def rows(self, table):
+        """Строки таблицы, кроме отзывов и комментариев, см. threads."""
+        return getattr(self, table)(self.random(table))
+
+    def users(self, rng):
+        for pk in self.ids('users'):
+            role = rng.choices(ROLES, ROLE_WEIGHTS)[0]
+            yield pk, f'user{pk}', f'user{pk}@yamdb.fake', role, '', '', ''
+
+    def categories(self, rng):
+        for pk, (name, slug) in zip(self.ids('categories'), CATEGORIES):
+            yield pk, f'{name} {pk}', f'{slug}-{pk}'
+
+    def genres(self, rng):
+        for pk, (name, slug) in zip(self.ids('genres'), GENRES):
+            yield pk, f'{name} {pk}', f'{slug}-{pk}'
+
+    def titles(self, rng):
+        categories = self.ids('categories')
+        for pk in self.ids('titles'):
+            # Новых произведений больше, чем старых
+            age = min(int(rng.expovariate(1 / 20)), self.end.year - 1900)
+            name = f'{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}'
+            yield pk, name, self.end.year - age, rng.choice(categories)
+
+    def genre_titles(self, rng):
+        pks = itertools.count(self.first['genre_titles'])
+        genres = self.ids('genres')
+        for title in self.ids('titles'):
+            for genre in sorted(rng.sample(genres, rng.randint(1, 3))):
+                yield next(pks), title, genre
+
+    def threads(self):
+        """Отзывы с комментариями: (отзыв, [комментарии]).
+
+        Авторы пишут отзывы по очереди, пока не наберётся
+        sizes['reviews'] отзывов.
+        """
+        rng, comment_rng = self.random('reviews'), self.random('comments')
+        popularity = Popularity(self.random('popularity'), self.ids('titles'))
+        review_ids = itertools.count(self.first['reviews'])
+        comment_ids = itertools.count(self.first['comments'])
+        per_author = self.sizes['reviews'] / self.sizes['users']
+        left = self.sizes['reviews']
+        for author in self.ids('users'):
+            count = min(geometric(rng, per_author), left)
+            titles = popularity.sample(rng, count)
+            for title in titles:
+                review = (
+                    next(review_ids), title, text(rng), author,
+                    popularity.score(rng, title), self.pub_date(rng),
+                )
+                yield review, list(
+                    self.comments(comment_rng, review, comment_ids)
+                )
+            left -= len(titles)
+            if not left:
+                return
+
+    def pub_date(self, rng):
+        return self.end - PERIOD * rng.random()
+
+    def comments(self, rng, review, comment_ids):
+        review_id, reviewed = review[0], review[-1]
+        users = self.ids('users')
+        per_review = self.sizes['comments'] / self.sizes['reviews']
+        for _ in range(geometric(rng, per_review)):
+            delay = timedelta(seconds=rng.expovariate(1 / COMMENT_DELAY))
+            yield (
+                next(comment_ids), review_id, text(rng), rng.choice(users),
+                min(reviewed + delay, self.end),
+            )
+
+
+class Popularity:
+    """Произведения по закону Ципфа и их средние оценки."""
+
+    def __init__(self, rng, titles):
+        self.titles = list(titles)
+        rng.shuffle(self.titles)
+        self.weights = list(itertools.accumulate(
+            rank ** -ZIPF_EXPONENT for rank in range(1, len(titles) + 1)
+        ))
+        self.quality = {
+            title: min(max(rng.gauss(7, 1.3), 2), 9.5)
+            for title in self.titles
+        }
+
+    def sample(self, rng, count):
+        """count разных произведений, не больше половины всех."""
+        count = min(count, max(len(self.titles) // 2, 1))
+        chosen = set()
+        while len(chosen) < count:
+            chosen.update(rng.choices(
+                self.titles, cum_weights=self.weights, k=count - len(chosen)
+            ))
+        return sorted(chosen)
+
+    def score(self, rng, title):
+        return min(max(round(
+            rng.gauss(self.quality[title], SCORE_SPREAD)
+        ), 1), 10)
+
+
+def csv_date(value):
+    """Дата в формате static/data: 2020-01-13T23:20:02.422Z"""
+    return value.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+
+
+def csv_writer(directory, table, files):
+    _, name, columns = TABLES[table]
+    csv_file = open(
+        os.path.join(directory, name), 'w', encoding='utf-8', newline=''
+    )
+    files.append(csv_file)
+    writer = csv.writer(csv_file)
+    writer.writerow(columns)
+    return writer
+
+
+def write_csv(generator, directory, progress=None):
+    """Запись таблиц в CSV-файлы directory, возвращает количества строк."""
+    counts = dict.fromkeys(TABLES, 0)
+    files = []
+    try:
+        for table in TABLES:
+            if table in ('reviews', 'comments'):
+                continue
+            writer = csv_writer(directory, table, files)
+            for row in generator.rows(table):
+                writer.writerow(row)
+                counts[table] += 1
+        reviews = csv_writer(directory, 'reviews', files)
+        comments = csv_writer(directory, 'comments', files)
+        for review, review_comments in generator.threads():
+            reviews.writerow(review[:-1] + (csv_date(review[-1]),))
+            for comment in review_comments:
+                comments.writerow(comment[:-1] + (csv_date(comment[-1]),))
+            counts['reviews'] += 1
+            counts['comments'] += len(review_comments)
+            if progress is not None and not counts['reviews'] % 100000:
+                progress(counts)
+    finally:
+        for csv_file in files:
+            csv_file.close()
+    return counts
+
+
+def next_ids():
+    """Первые свободные id таблиц для вставки в непустую базу."""
+    return {
+        table: (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+        for table, (model, _, _) in TABLES.items()
+    }
+
+
+def insert_statement(table):
+    """Начало INSERT таблицы и значения полей, которых нет в CSV.
+
+    Значения по умолчанию подготавливаются для БД один раз на таблицу.
+    """
+    model, _, columns = TABLES[table]
+    fields = [
+        model._meta.get_field(ATTNAMES.get(column, column))
+        for column in columns
+    ]
+    defaults = [
+        field for field in model._meta.local_concrete_fields
+        if field not in fields
+    ]
+    quote = connection.ops.quote_name
+    names = ', '.join(quote(field.column) for field in fields + defaults)
+    return (
+        f'INSERT INTO {quote(model._meta.db_table)} ({names}) VALUES ',
+        tuple(
+            field.get_db_prep_save(field.get_default(), connection)
+            for field in defaults
+        ),
+    )
+
+
+def raw_insert(table, rows):
+    """Многострочный INSERT без моделей.
+
+    pre_save заменил бы pub_date (auto_now_add), а подготовка каждого
+    значения через поля модели дольше самой генерации строк.
+    """
+    if not rows:
+        return
+    sql, defaults = insert_statement(table)
+    if TABLES[table][2][-1] == 'pub_date':
+        adapt = connection.ops.adapt_datetimefield_value
+        rows = [row[:-1] + (adapt(row[-1]),) for row in rows]
+    width = len(rows[0]) + len(defaults)
+    placeholder = f'({", ".join(["%s"] * width)})'
+    batch_size = connection.ops.bulk_batch_size([None] * width, rows)
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            cursor.execute(
+                sql + ', '.join([placeholder] * len(batch)),
+                [value for row in batch for value in row + defaults],
+            )
+
+
+def batches(rows, batch_size):
+    rows = iter(rows)
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def insert(generator, batch_size, progress=None):
+    """Вставка таблиц пачками по batch_size строк в одной транзакции.
+
+    Возвращает количества строк. Счётчики и популярность
+    не пересчитываются, см. generate_data.
+    """
+    counts = dict.fromkeys(TABLES, 0)
+    with transaction.atomic():
+        for table in TABLES:
+            if table in ('reviews', 'comments'):
+                continue
+            for batch in batches(generator.rows(table), batch_size):
+                raw_insert(table, batch)
+                counts[table] += len(batch)
+        for threads in batches(generator.threads(), batch_size):
+            comments = [comment for _, rows in threads for comment in rows]
+            raw_insert('reviews', [review for review, _ in threads])
+            raw_insert('comments', comments)
+            counts['reviews'] += len(threads)
+            counts['comments'] += len(comments)
+            if progress is not None:
+                progress(counts)
+        reset_sequences()
+    return counts
+
+
+def reset_sequences():
+    """Последовательности id после вставки с явными id (PostgreSQL)."""
+    models = [model for model, _, _ in TABLES.values()]
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), models):
+            cursor.execute(sql)
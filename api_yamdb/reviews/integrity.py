@@ -0,0 +1,227 @@
+"""Проверка согласованности данных, см. manage.py check_integrity.
+
+Каждая проверка просматривает одну таблицу пачками по первичному
+ключу: в памяти не больше chunk_size id нарушений. Диапазон ключей
+можно разделить между процессами. Исправление выполняется
+той же пачкой в своей транзакции, через те же функции, что
+поддерживают данные при обычной работе:
+
+    orphan_<модель>_<поле>  записи со ссылкой на несуществующую запись:
+                            ссылка обнуляется (SET_NULL) или запись
+                            удаляется с зависимыми;
+    archived_duplicates     архивные отзывы автора на произведение,
+                            у которого есть и отзыв основной таблицы;
+    title_counters          review_count и score_total произведений;
+    review_counters,
+    archived_review_counters
+                            comment_count отзывов и архивных отзывов;
+    genre_trending          копии популярности в связях с жанрами.
+"""
+from django.db import transaction
+from django.db.models import Count, Exists, F, Max, Min, OuterRef, Sum
+
+from reviews import trending
+from reviews.counters import (
+    COMMENTS,
+    grouped,
+    refresh_review_counters,
+    refresh_title_counters,
+    visible,
+)
+from reviews.deletion import Purge, raw_delete
+from reviews.models import (
+    ArchivedComment, ArchivedReview, Comment, Review, Title, TitleGenre,
+    TitleSimilarity,
+)
+
+
+# Сколько id нарушений показывать в отчёте
+SAMPLE_SIZE = 10
+# Таблицы, ссылки которых проверяются на существование записей
+LINKED_MODELS = (
+    Title, TitleGenre, TitleSimilarity, Review, Comment,
+    ArchivedReview, ArchivedComment,
+)
+
+
+class Check:
+    """Проверка записей model: defects() — записи с нарушением."""
+
+    name = ''
+    model = None
+
+    def defects(self, records):
+        raise NotImplementedError
+
+    def repair(self, ids):
+        raise NotImplementedError
+
+
+class TitleCounters(Check):
+    name = 'title_counters'
+    model = Title
+
+    def defects(self, records):
+        return records.annotate(
+            actual_count=(
+                grouped(visible(Review), 'title', Count('pk'))
+                + grouped(visible(ArchivedReview), 'title', Count('pk'))
+            ),
+            actual_total=(
+                grouped(visible(Review), 'title', Sum('score'))
+                + grouped(visible(ArchivedReview), 'title', Sum('score'))
+            ),
+        ).exclude(
+            review_count=F('actual_count'), score_total=F('actual_total')
+        )
+
+    def repair(self, ids):
+        refresh_title_counters(Title.objects.filter(pk__in=ids))
+
+
+class ReviewCounters(Check):
+
+    def __init__(self, name, model):
+        self.name = name
+        self.model = model
+
+    def defects(self, records):
+        return records.annotate(actual=grouped(
+            visible(COMMENTS[self.model]), 'review', Count('pk')
+        )).exclude(comment_count=F('actual'))
+
+    def repair(self, ids):
+        refresh_review_counters(self.model.objects.filter(pk__in=ids))
+
+
+class GenreTrending(Check):
+    name = 'genre_trending'
+    model = TitleGenre
+
+    def defects(self, records):
+        return records.exclude(trending=F('title__trending'))
+
+    def repair(self, ids):
+        trending.copy_to_genres(
+            TitleGenre.objects.filter(pk__in=ids).values('title')
+        )
+
+
+class ArchivedDuplicates(Check):
+    """Повтор отзыва в архиве: остаётся отзыв основной таблицы."""
+
+    name = 'archived_duplicates'
+    model = ArchivedReview
+
+    def defects(self, records):
+        return records.annotate(duplicate=Exists(Review.objects.filter(
+            title=OuterRef('title'), author=OuterRef('author')
+        ))).filter(duplicate=True)
+
+    def repair(self, ids):
+        Purge().delete_reviews(ArchivedReview.objects.filter(pk__in=ids))
+
+
+class Orphans(Check):
+    """Записи model, у которых field ссылается на несуществующую запись."""
+
+    def __init__(self, model, field):
+        self.model = model
+        self.field = field
+        self.name = f'orphan_{model._meta.model_name}_{field.name}'
+
+    def defects(self, records):
+        attname = self.field.attname
+        return records.filter(**{f'{attname}__isnull': False}).annotate(
+            linked=Exists(self.field.related_model.objects.filter(
+                pk=OuterRef(attname)
+            ))
+        ).filter(linked=False)
+
+    def repair(self, ids):
+        records = self.model.objects.filter(pk__in=ids)
+        if self.field.null:
+            records.update(**{self.field.attname: None})
+        elif self.model in COMMENTS:
+            Purge().delete_reviews(records)
+        elif self.model in COMMENTS.values():
+            Purge().delete_comments(records)
+        else:
+            raw_delete(records)
+
+
+def orphan_checks():
+    return [
+        Orphans(model, field)
+        for model in LINKED_MODELS
+        for field in model._meta.get_fields()
+        if field.many_to_one and field.concrete
+    ]
+
+
+# Удаление при исправлении ссылок и повторов пересчитывает счётчики,
+# поэтому счётчики проверяются после них
+CHECKS = {check.name: check for check in orphan_checks() + [
+    ArchivedDuplicates(),
+    TitleCounters(),
+    ReviewCounters('review_counters', Review),
+    ReviewCounters('archived_review_counters', ArchivedReview),
+    GenreTrending(),
+]}
+
+
+def key_ranges(model, parts):
+    """Диапазоны первичного ключа [start, stop) для parts процессов."""
+    bounds = model.objects.aggregate(first=Min('pk'), last=Max('pk'))
+    if bounds['first'] is None:
+        return []
+    first, stop = bounds['first'], bounds['last'] + 1
+    step = -(-(stop - first) // parts)
+    return [
+        (start, min(start + step, stop)) for start in range(first, stop, step)
+    ]
+
+
+def chunks(model, start, stop, chunk_size):
+    """Пачки [start, stop) по chunk_size записей в порядке ключа."""
+    while start < stop:
+        boundary = list(
+            model.objects.filter(pk__gte=start, pk__lt=stop)
+            .order_by('pk').values_list('pk', flat=True)
+            [chunk_size:chunk_size + 1]
+        )
+        end = boundary[0] if boundary else stop
+        yield start, end
+        start = end
+
+
+def run(name, start, stop, chunk_size, repair=False):
+    """Проверка name на диапазоне ключей.
+
+    Возвращает {'found': ..., 'repaired': ..., 'sample': [id, ...]}.
+    """
+    check = CHECKS[name]
+    result = {'found': 0, 'repaired': 0, 'sample': []}
+    for low, high in chunks(check.model, start, stop, chunk_size):
+        ids = list(check.defects(
+            check.model.objects.filter(pk__gte=low, pk__lt=high)
+        ).order_by().values_list('pk', flat=True))
+        if not ids:
+            continue
+        result['found'] += len(ids)
+        result['sample'].extend(ids[:SAMPLE_SIZE - len(result['sample'])])
+        if repair:
+            with transaction.atomic():
+                check.repair(ids)
+            result['repaired'] += len(ids)
+    return result
+
+
+def merge(results):
+    total = {'found': 0, 'repaired': 0, 'sample': []}
+    for result in results:
+        total['found'] += result['found']
+        total['repaired'] += result['repaired']
+        total['sample'].extend(result['sample'])
+    total['sample'] = sorted(total['sample'])[:SAMPLE_SIZE]
+    return total
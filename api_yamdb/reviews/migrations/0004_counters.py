@@ -0,0 +1,55 @@
+# Generated by Django 2.2.16 on 2026-10-19 07:28
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def grouped(model, group_by, aggregate):
+    """Подзапрос с агрегатом по родительской записи."""
+    return Coalesce(Subquery(
+        model.objects.filter(**{group_by: OuterRef('pk')})
+        .order_by()
+        .values(group_by)
+        .annotate(value=aggregate)
+        .values('value')
+    ), 0)
+
+
+def fill_counters(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    Comment = apps.get_model('reviews', 'Comment')
+    Title.objects.update(
+        review_count=grouped(Review, 'title', Count('pk')),
+        score_total=grouped(Review, 'title', Sum('score')),
+    )
+    Review.objects.update(
+        comment_count=grouped(Comment, 'review', Count('pk')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_auto_20221211_1024'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Количество комментариев'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Количество отзывов'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_total',
+            field=models.PositiveIntegerField(default=0, verbose_name='Сумма оценок'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
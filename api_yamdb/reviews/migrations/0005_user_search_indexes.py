@@ -0,0 +1,45 @@
+# Generated by Django 2.2.16 on 2026-10-19 07:35
+
+from django.db import migrations, models
+
+
+# Поиск ?search= по username и email выполняется через
+# UPPER(поле::text) LIKE UPPER('%...%'), такой запрос обслуживает
+# триграммный GIN-индекс по тому же выражению. Только для PostgreSQL.
+SEARCH_INDEXES = {
+    'user_username_trgm_idx': 'username',
+    'user_email_trgm_idx': 'email',
+}
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, column in SEARCH_INDEXES.items():
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON reviews_user '
+            f'USING gin ((UPPER({column}::text)) gin_trgm_ops)'
+        )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name in SEARCH_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['role', 'username'], name='user_role_idx'),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 2.2.16 on 2026-10-19 07:36
+
+from django.db import IntegrityError, migrations, models
+from django.db.models import Count
+
+
+# Сколько повторяющихся адресов показывать в ошибке
+SAMPLE_SIZE = 20
+
+
+def check_duplicate_emails(apps, schema_editor):
+    """Остановка миграции, если непустой email есть у нескольких
+    пользователей.
+
+    Повторы не исправляются автоматически: какой из аккаунтов оставить
+    с адресом, решает администратор. Ошибка перечисляет повторы.
+    """
+    User = apps.get_model('reviews', 'User')
+    duplicates = list(
+        User.objects.exclude(email='').values('email')
+        .annotate(users=Count('pk')).filter(users__gt=1)
+        .order_by('email').values_list('email', flat=True)
+    )
+    if not duplicates:
+        return
+    lines = [
+        f'{email}: ' + ', '.join(
+            User.objects.filter(email=email).order_by('pk')
+            .values_list('username', flat=True)
+        )
+        for email in duplicates[:SAMPLE_SIZE]
+    ]
+    if len(duplicates) > SAMPLE_SIZE:
+        lines.append(f'... ещё {len(duplicates) - SAMPLE_SIZE}')
+    raise IntegrityError(
+        'Нельзя добавить unique_user_email: один email у нескольких '
+        'пользователей. Измените или очистите адреса и повторите '
+        'миграцию.\n' + '\n'.join(lines)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_user_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_emails, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.UniqueConstraint(condition=models.Q(_negated=True, email=''), fields=('email',), name='unique_user_email'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 2.2.16 on 2026-10-19 07:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_user_email_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='is_hidden',
+            field=models.BooleanField(default=False, verbose_name='Скрыт модератором'),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='is_hidden',
+            field=models.BooleanField(default=False, verbose_name='Скрыт модератором'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(condition=models.Q(is_hidden=False), fields=['review', '-pub_date'], name='comment_visible_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(condition=models.Q(is_hidden=True), fields=['-pub_date'], name='comment_hidden_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(condition=models.Q(is_hidden=False), fields=['title', '-pub_date'], name='review_visible_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(condition=models.Q(is_hidden=True), fields=['-pub_date'], name='review_hidden_idx'),
+        ),
+    ]
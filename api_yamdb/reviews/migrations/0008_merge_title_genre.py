@@ -0,0 +1,55 @@
+"""Одна таблица связей произведений и жанров.
+
+Связи хранились в двух таблицах: автоматической reviews_title_genre
+поля Title.genre и reviews_titlegenre, которую заполнял csv_download.
+Связи из автоматической таблицы переносятся в reviews_titlegenre,
+дубли и неполные строки удаляются, после чего TitleGenre становится
+промежуточной моделью Title.genre, а автоматическая таблица удаляется
+(0009). Данные и схема меняются в разных миграциях: на PostgreSQL
+ALTER TABLE в одной транзакции с изменением строк той же таблицы
+завершается ошибкой pending trigger events.
+"""
+from django.db import migrations
+from django.db.models import Min, Q
+
+
+BATCH_SIZE = 5000
+
+
+def merge_links(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    TitleGenre = apps.get_model('reviews', 'TitleGenre')
+    AutoLink = Title.genre.through
+
+    TitleGenre.objects.filter(Q(title=None) | Q(genre=None)).delete()
+    first_ids = (
+        TitleGenre.objects.values('title_id', 'genre_id')
+        .annotate(first_id=Min('id'))
+        .values('first_id')
+    )
+    TitleGenre.objects.exclude(id__in=first_ids).delete()
+
+    existing = set(TitleGenre.objects.values_list('title_id', 'genre_id'))
+    missing = []
+    for pair in AutoLink.objects.values_list(
+        'title_id', 'genre_id'
+    ).iterator():
+        if pair in existing:
+            continue
+        existing.add(pair)
+        missing.append(TitleGenre(title_id=pair[0], genre_id=pair[1]))
+        if len(missing) >= BATCH_SIZE:
+            TitleGenre.objects.bulk_create(missing)
+            missing = []
+    TitleGenre.objects.bulk_create(missing)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_moderation'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_links, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,56 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def drop_auto_table(apps, schema_editor):
+    schema_editor.delete_model(apps.get_model('reviews', 'Title').genre.through)
+
+
+def restore_auto_table(apps, schema_editor):
+    AutoLink = apps.get_model('reviews', 'Title').genre.through
+    TitleGenre = apps.get_model('reviews', 'TitleGenre')
+    schema_editor.create_model(AutoLink)
+    AutoLink.objects.bulk_create(
+        AutoLink(title_id=title_id, genre_id=genre_id)
+        for title_id, genre_id in TitleGenre.objects.values_list(
+            'title_id', 'genre_id'
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_merge_title_genre'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='titlegenre',
+            name='genre',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='reviews.Genre', verbose_name='Жанр'),
+        ),
+        migrations.AlterField(
+            model_name='titlegenre',
+            name='title',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='reviews.Title', verbose_name='Название произведения'),
+        ),
+        migrations.AddConstraint(
+            model_name='titlegenre',
+            constraint=models.UniqueConstraint(fields=('title', 'genre'), name='unique_title_genre'),
+        ),
+        migrations.AddIndex(
+            model_name='titlegenre',
+            index=models.Index(fields=['genre', 'title'], name='titlegenre_genre_title_idx'),
+        ),
+        migrations.RunPython(drop_auto_table, restore_auto_table),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='title',
+                    name='genre',
+                    field=models.ManyToManyField(related_name='genre', through='reviews.TitleGenre', to='reviews.Genre', verbose_name='Жанр'),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 2.2.16 on 2026-10-19 07:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_title_genre_through'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='trending',
+            field=models.FloatField(default=0, verbose_name='Популярность'),
+        ),
+        migrations.AddField(
+            model_name='titlegenre',
+            name='trending',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['-trending'], name='title_trending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', '-trending'], name='title_category_trending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='titlegenre',
+            index=models.Index(fields=['genre', '-trending'], name='titlegenre_trending_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 2.2.16 on 2026-10-19 07:59
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0010_trending'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleSimilarity',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(verbose_name='Сходство')),
+                ('similar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reviews.Title')),
+                ('title', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='similarities', to='reviews.Title')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='titlesimilarity',
+            index=models.Index(fields=['title', '-score'], name='similarity_title_score_idx'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 2.2.16 on 2026-10-19 08:07
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0011_title_similarity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedReview',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('text', models.TextField()),
+                ('score', models.PositiveSmallIntegerField()),
+                ('pub_date', models.DateTimeField()),
+                ('is_hidden', models.BooleanField(default=False)),
+                ('comment_count', models.PositiveIntegerField(default=0)),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_reviews', to=settings.AUTH_USER_MODEL)),
+                ('title', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='archived_reviews', to='reviews.Title')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedComment',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('text', models.TextField()),
+                ('pub_date', models.DateTimeField()),
+                ('is_hidden', models.BooleanField(default=False)),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_comments', to=settings.AUTH_USER_MODEL)),
+                ('review', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='reviews.ArchivedReview')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='archivedreview',
+            index=models.Index(condition=models.Q(is_hidden=False), fields=['title', '-pub_date'], name='archivedreview_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedcomment',
+            index=models.Index(condition=models.Q(is_hidden=False), fields=['review', '-pub_date'], name='archivedcomment_review_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations
+
+
+# Поиск в админке и фильтр ?name= по названию произведения выполняются
+# через UPPER(name::text) LIKE UPPER('%...%'), как и поиск пользователей
+# в 0005_user_search_indexes. Только для PostgreSQL.
+INDEX_NAME = 'title_name_trgm_idx'
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS {INDEX_NAME} ON reviews_title '
+        f'USING gin ((UPPER(name::text)) gin_trgm_ops)'
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS {INDEX_NAME}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0012_archive'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
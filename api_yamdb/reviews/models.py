@@ -36,6 +36,21 @@ class User(AbstractUser):
         null=True
     )
 
+    class Meta(AbstractUser.Meta):
+        indexes = (
+            # Фильтр ?role= со стандартной сортировкой по username
+            models.Index(fields=('role', 'username'), name='user_role_idx'),
+        )
+        constraints = (
+            # Пустой email допустим у нескольких пользователей,
+            # например у созданных через createsuperuser
+            models.UniqueConstraint(
+                fields=('email',),
+                condition=~models.Q(email=''),
+                name='unique_user_email'
+            ),
+        )
+
     def __str__(self):
         return self.role
 
@@ -97,6 +112,7 @@ class Title(models.Model):
     )
     genre = models.ManyToManyField(
         Genre,
+        through='TitleGenre',
         related_name='genre',
         verbose_name='Жанр'
     )
@@ -108,33 +124,108 @@ class Title(models.Model):
         related_name='category',
         verbose_name='Категория',
     )
+    review_count = models.PositiveIntegerField(
+        verbose_name='Количество отзывов',
+        default=0
+    )
+    score_total = models.PositiveIntegerField(
+        verbose_name='Сумма оценок',
+        default=0
+    )
+    # Популярность по недавним отзывам, см. reviews.trending
+    trending = models.FloatField(
+        verbose_name='Популярность',
+        default=0
+    )
 
     class Meta:
         verbose_name = 'Название произведения'
         ordering = ('-year',)
+        indexes = (
+            models.Index(fields=('-trending',), name='title_trending_idx'),
+            models.Index(
+                fields=('category', '-trending'),
+                name='title_category_trending_idx'
+            ),
+        )
 
     def __str__(self):
         return self.name
 
+    @property
+    def rating(self):
+        """Средняя оценка по счётчикам, без агрегации отзывов"""
+        if not self.review_count:
+            return None
+        return round(self.score_total / self.review_count, 1)
+
 
 class TitleGenre(models.Model):
+    # Отдельные индексы по внешним ключам не нужны: их заменяют
+    # составные индексы (title, genre) и (genre, title)
     title = models.ForeignKey(
         Title,
-        on_delete=models.SET_NULL,
+        on_delete=models.CASCADE,
         verbose_name='Название произведения',
-        null=True,
+        db_index=False,
     )
     genre = models.ForeignKey(
         Genre,
-        on_delete=models.SET_NULL,
+        on_delete=models.CASCADE,
         verbose_name='Жанр',
-        null=True,
+        db_index=False,
     )
+    # Копия Title.trending для выборки популярных произведений жанра
+    trending = models.FloatField(default=0)
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('title', 'genre'),
+                name='unique_title_genre'
+            ),
+        )
+        indexes = (
+            # Фильтр произведений по жанру
+            models.Index(
+                fields=('genre', 'title'), name='titlegenre_genre_title_idx'
+            ),
+            models.Index(
+                fields=('genre', '-trending'), name='titlegenre_trending_idx'
+            ),
+        )
 
     def __str__(self):
         return f'{self.genre} {self.title}'
 
 
+class TitleSimilarity(models.Model):
+    """Похожие произведения, см. reviews.similarity"""
+    # Индекс по title заменяет составной (title, -score)
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='similarities',
+        db_index=False,
+    )
+    similar = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    score = models.FloatField(verbose_name='Сходство')
+
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=('title', '-score'), name='similarity_title_score_idx'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.title_id} {self.similar_id}'
+
+
 class MixinFields(models.Model):
     author = models.ForeignKey(
         User,
@@ -143,6 +234,14 @@ class MixinFields(models.Model):
     )
     pub_date = models.DateTimeField(auto_now_add=True)
     text = models.TextField()
+    is_hidden = models.BooleanField(
+        verbose_name='Скрыт модератором',
+        default=False
+    )
+
+    # Поля, значения которых запоминаются при загрузке из БД,
+    # чтобы обновлять счётчики на разницу при изменении записи
+    tracked_fields = ('is_hidden',)
 
     class Meta:
         ordering = ('-pub_date',)
@@ -151,6 +250,14 @@ class MixinFields(models.Model):
     def __str__(self):
         return self.text[0:30]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded = {
+            name: instance.__dict__.get(name) for name in cls.tracked_fields
+        }
+        return instance
+
 
 class Review(MixinFields):
     title = models.ForeignKey(
@@ -164,6 +271,12 @@ class Review(MixinFields):
         error_messages={'validators': 'Оценка может быть от 1 до 10'},
         default=1
     )
+    comment_count = models.PositiveIntegerField(
+        verbose_name='Количество комментариев',
+        default=0
+    )
+
+    tracked_fields = ('is_hidden', 'score')
 
     class Meta:
         constraints = (
@@ -172,6 +285,20 @@ class Review(MixinFields):
                 name='unique_author_review'
             ),
         )
+        indexes = (
+            # Публичный список отзывов произведения
+            models.Index(
+                fields=('title', '-pub_date'),
+                condition=models.Q(is_hidden=False),
+                name='review_visible_idx'
+            ),
+            # Очередь модерации
+            models.Index(
+                fields=('-pub_date',),
+                condition=models.Q(is_hidden=True),
+                name='review_hidden_idx'
+            ),
+        )
         default_related_name = 'reviews'
         verbose_name = 'review'
 
@@ -184,6 +311,85 @@ class Comment(MixinFields):
     )
 
     class Meta:
+        indexes = (
+            models.Index(
+                fields=('review', '-pub_date'),
+                condition=models.Q(is_hidden=False),
+                name='comment_visible_idx'
+            ),
+            models.Index(
+                fields=('-pub_date',),
+                condition=models.Q(is_hidden=True),
+                name='comment_hidden_idx'
+            ),
+        )
         default_related_name = 'comments'
         verbose_name = 'Comment'
         verbose_name_plural = 'Comments'
+
+
+class ArchivedReview(models.Model):
+    """Отзыв, перенесённый из Review, см. reviews.archive.
+
+    id и значения полей сохраняются, запись доступна только на чтение.
+    """
+    id = models.IntegerField(primary_key=True)
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='archived_reviews',
+        db_index=False,
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_reviews',
+    )
+    text = models.TextField()
+    score = models.PositiveSmallIntegerField()
+    pub_date = models.DateTimeField()
+    is_hidden = models.BooleanField(default=False)
+    comment_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=('title', '-pub_date'),
+                condition=models.Q(is_hidden=False),
+                name='archivedreview_title_idx'
+            ),
+        )
+
+    def __str__(self):
+        return self.text[0:30]
+
+
+class ArchivedComment(models.Model):
+    """Комментарий архивного отзыва."""
+    id = models.IntegerField(primary_key=True)
+    review = models.ForeignKey(
+        ArchivedReview,
+        on_delete=models.CASCADE,
+        related_name='comments',
+        db_index=False,
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_comments',
+    )
+    text = models.TextField()
+    pub_date = models.DateTimeField()
+    is_hidden = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=('review', '-pub_date'),
+                condition=models.Q(is_hidden=False),
+                name='archivedcomment_review_idx'
+            ),
+        )
+
+    def __str__(self):
+        return self.text[0:30]
@@ -0,0 +1,56 @@
+"""Скрытие отзывов и комментариев модераторами.
+
+Скрытая запись остаётся в БД, но не попадает в публичные списки
+и счётчики. Флаг меняется условным UPDATE: при одновременных запросах
+двух модераторов счётчики изменятся только один раз.
+
+post_save при этом не отправляется, поэтому после изменения флага
+в той же транзакции отправляется сигнал hidden_changed.
+"""
+from django.db import transaction
+from django.dispatch import Signal
+
+from reviews.counters import COMMENTS
+from reviews.signals import (
+    change_review_counters,
+    change_title_counters,
+    comment_counts,
+    review_counts,
+)
+
+
+# sender — модель, instance — запись, hidden — новое значение флага
+hidden_changed = Signal(providing_args=['instance', 'hidden'])
+
+
+def set_hidden(instance, hidden):
+    """Скрытие или восстановление записи.
+
+    Запись может быть и архивной (ArchivedReview, ArchivedComment).
+    Возвращает False, если запись уже была в нужном состоянии.
+    """
+    model = type(instance)
+    with transaction.atomic():
+        changed = model.objects.filter(
+            pk=instance.pk, is_hidden=not hidden
+        ).update(is_hidden=hidden)
+        if changed:
+            if model in COMMENTS:
+                change_title_counters(
+                    instance.title_id,
+                    review_counts(not hidden, instance.score),
+                    review_counts(hidden, instance.score),
+                )
+            else:
+                change_review_counters(
+                    instance.review_id,
+                    comment_counts(not hidden),
+                    comment_counts(hidden),
+                    model._meta.get_field('review').related_model,
+                )
+            hidden_changed.send(
+                sender=model, instance=instance, hidden=hidden
+            )
+    instance.is_hidden = hidden
+    instance._loaded = dict(getattr(instance, '_loaded', {}), is_hidden=hidden)
+    return bool(changed)
@@ -0,0 +1,128 @@
+"""Поддержка счётчиков отзывов, оценок и комментариев.
+
+Счётчики обновляются одним UPDATE с F-выражением на каждую запись,
+поэтому списки произведений и отзывов не агрегируют связанные таблицы.
+Скрытые модератором отзывы и комментарии в счётчики не входят.
+Новые отзывы сразу учитываются в популярности, см. reviews.trending.
+"""
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from reviews import trending
+from reviews.deletion import purged
+from reviews.models import Comment, Review, Title, TitleGenre
+
+
+def review_counts(is_hidden, score):
+    """Вклад отзыва в счётчики произведения: (отзывов, сумма оценок)."""
+    if is_hidden:
+        return 0, 0
+    return 1, score
+
+
+def comment_counts(is_hidden):
+    """Вклад комментария в счётчик отзыва."""
+    return 0 if is_hidden else 1
+
+
+def change_title_counters(title_id, before, after):
+    count, total = after[0] - before[0], after[1] - before[1]
+    if count or total:
+        Title.objects.filter(pk=title_id).update(
+            review_count=F('review_count') + count,
+            score_total=F('score_total') + total,
+        )
+
+
+def change_review_counters(review_id, before, after, model=Review):
+    """model — Review или ArchivedReview."""
+    if after != before:
+        model.objects.filter(pk=review_id).update(
+            comment_count=F('comment_count') + after - before
+        )
+
+
+def loaded_values(instance):
+    """Значения отслеживаемых полей до сохранения.
+
+    None, если запись загружена без них и разница неизвестна.
+    """
+    loaded = getattr(instance, '_loaded', {})
+    if any(loaded.get(name) is None for name in instance.tracked_fields):
+        return None
+    return loaded
+
+
+def remember_values(instance):
+    instance._loaded = {
+        name: getattr(instance, name) for name in instance.tracked_fields
+    }
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, **kwargs):
+    after = review_counts(instance.is_hidden, instance.score)
+    if created:
+        change_title_counters(instance.title_id, (0, 0), after)
+        if not instance.is_hidden:
+            trending.add_review(
+                instance.title_id, instance.score, instance.pub_date
+            )
+    else:
+        loaded = loaded_values(instance)
+        if loaded is not None:
+            change_title_counters(
+                instance.title_id, review_counts(**loaded), after
+            )
+    remember_values(instance)
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    change_title_counters(
+        instance.title_id,
+        review_counts(instance.is_hidden, instance.score),
+        (0, 0),
+    )
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    after = comment_counts(instance.is_hidden)
+    if created:
+        change_review_counters(instance.review_id, 0, after)
+    else:
+        loaded = loaded_values(instance)
+        if loaded is not None:
+            change_review_counters(
+                instance.review_id, comment_counts(**loaded), after
+            )
+    remember_values(instance)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    change_review_counters(
+        instance.review_id, comment_counts(instance.is_hidden), 0
+    )
+
+
+@receiver(post_save, sender=TitleGenre)
+def title_genre_saved(sender, instance, created, **kwargs):
+    if created:
+        trending.copy_to_genres((instance.title_id,))
+
+
+@receiver(m2m_changed, sender=TitleGenre)
+def title_genres_changed(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    """Популярность в новых связях произведения с жанрами."""
+    if action == 'post_add' and pk_set:
+        trending.copy_to_genres(pk_set if reverse else (instance.pk,))
+
+
+@receiver(purged, sender=Review)
+def reviews_purged(sender, records, **kwargs):
+    """Удалённые пачкой отзывы вычитаются из популярности."""
+    trending.refresh({record['title_id'] for record in records})
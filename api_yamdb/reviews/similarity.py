@@ -0,0 +1,141 @@
+"""Похожие произведения по оценкам пользователей.
+
+Сходство двух произведений — косинус между векторами оценок по авторам
+отзывов: Σ s(a, t) · s(a, u) / (‖t‖ · ‖u‖). Матрица автор × произведение
+сильно разрежена, поэтому скалярные произведения считаются не по всей
+матрице, а по парам оценок каждого автора. Произведения обрабатываются
+блоками по block_size, отзывы читаются потоком пачками по chunk_size.
+Учитываются и архивные отзывы, скрытые — нет.
+
+Память расчёта блока не ограничена константой: в ней все оценки
+произведений блока и по две суммы на каждую пару (произведение блока,
+произведение с общим автором). Для популярных произведений пар почти
+столько же, сколько произведений в каталоге, то есть до block_size × N.
+Объём регулируется размером блока.
+
+Для каждого произведения в TitleSimilarity сохраняются top_k самых
+похожих с не менее чем min_common общими авторами.
+"""
+import heapq
+import math
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Sum
+
+from reviews.models import ArchivedReview, Review, Title, TitleSimilarity
+
+
+def visible_reviews(model=Review):
+    return model.objects.filter(is_hidden=False).order_by()
+
+
+def ratings(chunk_size, **lookup):
+    """(автор, произведение, оценка) из основной таблицы и архива."""
+    for model in (Review, ArchivedReview):
+        yield from visible_reviews(model).filter(**lookup).values_list(
+            'author', 'title', 'score'
+        ).iterator(chunk_size)
+
+
+def norms():
+    """Длины векторов оценок всех произведений."""
+    totals = Counter()
+    for model in (Review, ArchivedReview):
+        totals.update(dict(
+            visible_reviews(model).values('title')
+            .annotate(total=Sum(F('score') * F('score')))
+            .values_list('title', 'total')
+        ))
+    return {title_id: math.sqrt(total) for title_id, total in totals.items()}
+
+
+def co_ratings(block, chunk_size):
+    """Суммы произведений оценок и число общих авторов для блока.
+
+    Возвращает словари {title: Counter({other: value})}: по записи
+    на каждое произведение, у которого есть общий автор с title.
+    """
+    in_block = defaultdict(list)
+    for author, title, score in ratings(chunk_size, title__in=block):
+        in_block[author].append((title, score))
+
+    dots, counts = defaultdict(Counter), defaultdict(Counter)
+    authors = sorted(in_block)
+    for start in range(0, len(authors), chunk_size):
+        for author, other, score in ratings(
+            chunk_size, author__in=authors[start:start + chunk_size]
+        ):
+            for title, own in in_block[author]:
+                if other != title:
+                    dots[title][other] += own * score
+                    counts[title][other] += 1
+    return dots, counts
+
+
+def neighbours(title, dots, counts, lengths, top_k, min_common):
+    """Самые похожие произведения: [(сходство, id), ...]."""
+    return heapq.nlargest(top_k, (
+        (dot / (lengths[title] * lengths[other]), other)
+        for other, dot in dots.items()
+        if counts[other] >= min_common
+    ))
+
+
+def save_block(block, rows):
+    with transaction.atomic():
+        TitleSimilarity.objects.filter(title__in=block).delete()
+        TitleSimilarity.objects.bulk_create(rows, batch_size=1000)
+
+
+def build(titles=None, block_size=None, chunk_size=None, progress=None):
+    """Пересчёт похожих для titles, по умолчанию для всех произведений.
+
+    Возвращает количество сохранённых пар.
+    """
+    block_size = block_size or settings.RECOMMENDATIONS_BLOCK_SIZE
+    chunk_size = chunk_size or settings.RECOMMENDATIONS_CHUNK_SIZE
+    if titles is None:
+        titles = Title.objects.values_list('pk', flat=True)
+    titles = sorted(titles)
+    lengths = norms()
+    saved = 0
+    for start in range(0, len(titles), block_size):
+        block = titles[start:start + block_size]
+        dots, counts = co_ratings(block, chunk_size)
+        rows = [
+            TitleSimilarity(title_id=title, similar_id=other, score=score)
+            for title in block
+            for score, other in neighbours(
+                title, dots[title], counts[title], lengths,
+                settings.RECOMMENDATIONS_TOP_K,
+                settings.RECOMMENDATIONS_MIN_COMMON,
+            )
+        ]
+        save_block(block, rows)
+        saved += len(rows)
+        if progress is not None:
+            progress(start + len(block), len(titles))
+    return saved
+
+
+def changed_titles(since):
+    """Произведения, чьи списки похожих могли измениться после since.
+
+    Новая оценка автора меняет скалярные произведения оцененного
+    произведения со всеми произведениями, которые оценивал этот автор,
+    поэтому пересчитываются все они. Длина вектора оцененного
+    произведения тоже меняется, а сходство симметрично: добавляются
+    произведения, в списках которых уже есть изменившиеся.
+    """
+    authors = visible_reviews().filter(pub_date__gte=since).values('author')
+    changed = set()
+    for model in (Review, ArchivedReview):
+        changed.update(visible_reviews(model).filter(
+            author__in=authors
+        ).values_list('title', flat=True).distinct())
+    changed.update(TitleSimilarity.objects.filter(
+        similar__in=changed
+    ).values_list('title', flat=True).distinct())
+    return changed
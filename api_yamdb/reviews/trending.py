@@ -0,0 +1,183 @@
+"""Популярность произведений по недавним отзывам.
+
+Вклад отзыва равен его оценке и убывает вдвое каждые TRENDING_HALF_LIFE
+секунд с момента публикации. В Title.trending хранится логарифм суммы
+вкладов без затухания, отсчитанного от EPOCH:
+
+    trending = ln Σ score · e^(λ · (pub_date - EPOCH)),  λ = ln 2 / T½
+
+Текущая популярность равна e^(trending - λ · (now - EPOCH)). Множитель
+затухания на момент чтения общий для всех произведений, поэтому порядок
+по хранимому значению совпадает с порядком по текущей популярности
+и первые K произведений читаются по индексу. Логарифм растёт линейно
+со временем и не переполняется.
+
+Новый отзыв добавляется к значению одним UPDATE (logaddexp) без чтения
+остальных отзывов. Копия значения в TitleGenre обслуживает выборку
+по жанру индексом (genre, -trending). Удалённые, скрытые и изменённые
+отзывы не вычитаются: значения пересчитываются по отзывам за последние
+TRENDING_WINDOW секунд командой manage.py compact_trending, а после
+удаления пачки отзывов (reviews.deletion) — для затронутых произведений.
+"""
+import math
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import (
+    Case, F, FloatField, OuterRef, Subquery, Value, When,
+)
+from django.db.models.functions import Abs, Exp, Greatest, Least, Ln
+from django.utils import timezone
+
+from reviews.models import Review, Title, TitleGenre
+
+
+EPOCH = datetime(2000, 1, 1, tzinfo=timezone.utc)
+# Значение произведения без отзывов. Вклад любого отзыва после EPOCH
+# больше нуля, а e^0 после затухания пренебрежимо мал
+EMPTY = 0.0
+# Ограничение показателя экспоненты: PostgreSQL считает ошибкой
+# потерю значимости в exp(), а e^-50 уже не меняет сумму
+MAX_GAP = 50.0
+
+
+def decay_rate():
+    return math.log(2) / settings.TRENDING_HALF_LIFE
+
+
+def seconds(moment):
+    return (moment - EPOCH).total_seconds()
+
+
+def contribution(score, pub_date):
+    """Логарифм вклада отзыва без затухания."""
+    return math.log(score) + decay_rate() * seconds(pub_date)
+
+
+def log_add(left, right):
+    """ln(e^left + e^right) без переполнения."""
+    if left == EMPTY:
+        return right
+    high, low = max(left, right), min(left, right)
+    return high + math.log1p(math.exp(max(low - high, -MAX_GAP)))
+
+
+def log_add_expression(value):
+    """log_add для колонки trending в UPDATE."""
+    value = Value(value, output_field=FloatField())
+    return Case(
+        When(trending=EMPTY, then=value),
+        default=Greatest(F('trending'), value) + Ln(
+            Value(1.0, output_field=FloatField())
+            + Exp(-Least(Abs(F('trending') - value), Value(MAX_GAP)))
+        ),
+        output_field=FloatField(),
+    )
+
+
+def add_review(title_id, score, pub_date):
+    """Учёт нового отзыва в популярности произведения и его жанров."""
+    expression = log_add_expression(contribution(score, pub_date))
+    Title.objects.filter(pk=title_id).update(trending=expression)
+    TitleGenre.objects.filter(title_id=title_id).update(trending=expression)
+
+
+def copy_to_genres(titles):
+    """Копирование популярности в связи произведений с жанрами."""
+    return TitleGenre.objects.filter(title__in=titles).update(
+        trending=Subquery(
+            Title.objects.filter(pk=OuterRef('title')).values('trending')
+        )
+    )
+
+
+def current(trending, now=None):
+    """Популярность на момент now по хранимому значению."""
+    if trending == EMPTY:
+        return 0.0
+    now = now or timezone.now()
+    return math.exp(trending - decay_rate() * seconds(now))
+
+
+def top(limit, genre=None, category=None):
+    """Первые limit произведений по популярности.
+
+    При фильтре по жанру порядок читается из TitleGenre, иначе из Title.
+    """
+    if genre is None:
+        titles = Title.objects.exclude(trending=EMPTY)
+        if category is not None:
+            titles = titles.filter(category__slug=category)
+        return list(titles.order_by('-trending')[:limit])
+    links = TitleGenre.objects.filter(genre__slug=genre).exclude(
+        trending=EMPTY
+    )
+    if category is not None:
+        links = links.filter(title__category__slug=category)
+    ids = list(
+        links.order_by('-trending').values_list('title', flat=True)[:limit]
+    )
+    titles = Title.objects.in_bulk(ids)
+    return [titles[pk] for pk in ids if pk in titles]
+
+
+def window_since():
+    return timezone.now() - timedelta(seconds=settings.TRENDING_WINDOW)
+
+
+def window_values(since, title_ids=None):
+    """Значения trending по видимым отзывам, опубликованным после since."""
+    values = {}
+    reviews = Review.objects.filter(is_hidden=False, pub_date__gte=since)
+    if title_ids is not None:
+        reviews = reviews.filter(title_id__in=title_ids)
+    reviews = reviews.order_by().values_list('title_id', 'score', 'pub_date')
+    for title_id, score, pub_date in reviews.iterator():
+        values[title_id] = log_add(
+            values.get(title_id, EMPTY), contribution(score, pub_date)
+        )
+    return values
+
+
+def set_values(ids, values):
+    """Запись trending произведений ids; без значения в values — EMPTY."""
+    Title.objects.filter(pk__in=ids).update(trending=Case(
+        *(When(pk=pk, then=Value(values[pk])) for pk in ids if pk in values),
+        default=Value(EMPTY),
+        output_field=FloatField(),
+    ))
+
+
+def refresh(title_ids):
+    """Пересчёт популярности произведений title_ids по TRENDING_WINDOW.
+
+    Нужен после удаления отзывов без сигналов, см. reviews.deletion.
+    """
+    title_ids = sorted(title_ids)
+    set_values(title_ids, window_values(window_since(), title_ids))
+    copy_to_genres(title_ids)
+
+
+def compact(chunk_size=500):
+    """Пересчёт популярности по отзывам за TRENDING_WINDOW.
+
+    Возвращает количество произведений с ненулевой популярностью.
+    Отзыв, добавленный во время пересчёта, может не попасть
+    в результат до следующего запуска.
+    """
+    values = window_values(window_since())
+    with transaction.atomic():
+        stale = set(
+            Title.objects.exclude(trending=EMPTY).values_list('pk', flat=True)
+        ) - set(values)
+        ids = sorted(stale)
+        for start in range(0, len(ids), chunk_size):
+            Title.objects.filter(pk__in=ids[start:start + chunk_size]).update(
+                trending=EMPTY
+            )
+        ids = sorted(values)
+        for start in range(0, len(ids), chunk_size):
+            set_values(ids[start:start + chunk_size], values)
+        copy_to_genres(Title.objects.all())
+    return len(values)
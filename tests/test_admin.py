@@ -0,0 +1,33 @@
+import pytest
+
+from reviews.models import Review, Title, User
+
+
+@pytest.mark.django_db
+class TestAdmin:
+
+    def test_review_changelist_count_limited(
+        self, admin_client, settings, django_assert_max_num_queries
+    ):
+        settings.ADMIN_COUNT_LIMIT = 3
+        title = Title.objects.create(name='Фильм', year=2000)
+        for number in range(5):
+            author = User.objects.create(
+                username=f'user{number}', email=f'user{number}@yamdb.fake'
+            )
+            Review.objects.create(
+                title=title, author=author, text='Отзыв', score=5
+            )
+
+        with django_assert_max_num_queries(5):
+            response = admin_client.get(
+                '/admin/reviews/review/', {'is_hidden__exact': 0}
+            )
+
+        assert response.status_code == 200
+        assert response.context['cl'].result_count == 3, (
+            'Записи с фильтром должны считаться до ADMIN_COUNT_LIMIT'
+        )
+        assert b'user4' in response.content, (
+            'В списке должны выводиться имена авторов'
+        )
@@ -0,0 +1,148 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from reviews.archive import archive
+from reviews.models import (
+    ArchivedComment, ArchivedReview, Comment, Review, Title, User,
+)
+
+
+@pytest.fixture
+def title():
+    return Title.objects.create(name='Фильм', year=2000)
+
+
+def review(title, username, score, days=0):
+    author = User.objects.create(
+        username=username, email=f'{username}@yamdb.fake'
+    )
+    record = Review.objects.create(
+        title=title, author=author, text='Отзыв', score=score
+    )
+    Review.objects.filter(pk=record.pk).update(
+        pub_date=timezone.now() - timedelta(days=days)
+    )
+    return record
+
+
+@pytest.mark.django_db
+class TestArchive:
+
+    def test_old_threads_moved_with_comments(self, title):
+        old = review(title, 'old', 4, days=1000)
+        Comment.objects.create(review=old, author=old.author, text='Да')
+        Comment.objects.update(pub_date=timezone.now() - timedelta(days=900))
+        discussed = review(title, 'discussed', 6, days=1000)
+        Comment.objects.create(review=discussed, author=old.author, text='Нет')
+        review(title, 'fresh', 8)
+
+        assert archive(days=365) == {'reviews': 1, 'comments': 1}
+        assert list(ArchivedReview.objects.values_list('pk', flat=True)) == [
+            old.pk
+        ]
+        assert ArchivedComment.objects.get().review_id == old.pk
+        assert Review.objects.filter(pk=discussed.pk).exists(), (
+            'Отзыв с недавними комментариями должен остаться '
+            'в основной таблице'
+        )
+        title.refresh_from_db()
+        assert (title.review_count, title.score_total) == (3, 18), (
+            'Счётчики произведения должны учитывать архивные отзывы'
+        )
+
+    def test_archived_records_read_only_in_api(self, title):
+        old = review(title, 'old', 4, days=1000)
+        Comment.objects.create(review=old, author=old.author, text='Да')
+        Comment.objects.update(pub_date=timezone.now() - timedelta(days=900))
+        fresh = review(title, 'fresh', 8)
+        archive(days=365)
+        client = APIClient()
+        client.force_authenticate(old.author)
+        reviews_url = f'/api/v1/titles/{title.pk}/reviews/'
+
+        listed = client.get(reviews_url).json()
+        detail = client.get(f'{reviews_url}{old.pk}/')
+        comments = client.get(f'{reviews_url}{old.pk}/comments/').json()
+        changed = client.patch(f'{reviews_url}{old.pk}/', {'text': 'Новый'})
+        repeated = client.post(reviews_url, {'text': 'Ещё', 'score': 5})
+
+        assert listed['count'] == 2
+        assert [item['id'] for item in listed['results']] == [
+            fresh.pk, old.pk
+        ], 'Архивные отзывы должны следовать за отзывами основной таблицы'
+        assert detail.status_code == 200
+        assert comments['count'] == 1
+        assert changed.status_code == 404, (
+            'Архивный отзыв нельзя изменить'
+        )
+        assert repeated.status_code == 400, (
+            'Архивный отзыв автора должен учитываться при проверке повтора'
+        )
+
+
+@pytest.mark.django_db
+class TestArchiveModeration:
+
+    @pytest.fixture
+    def archived(self, title):
+        old = review(title, 'old', 4, days=1000)
+        reader = User.objects.create(username='reader', email='r@yamdb.fake')
+        Comment.objects.create(review=old, author=reader, text='Оскорбление')
+        Comment.objects.update(pub_date=timezone.now() - timedelta(days=900))
+        review(title, 'fresh', 8)
+        archive(days=365)
+        return ArchivedReview.objects.get(pk=old.pk)
+
+    @pytest.fixture
+    def moderator(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create(
+            username='moderator', email='m@yamdb.fake', role='moderator'
+        ))
+        return client
+
+    def test_moderator_hides_and_restores_archived(
+        self, title, archived, moderator
+    ):
+        reviews_url = f'/api/v1/titles/{title.pk}/reviews/'
+        comment = ArchivedComment.objects.get()
+
+        assert moderator.delete(
+            f'{reviews_url}{archived.pk}/comments/{comment.pk}/'
+        ).status_code == 204
+        assert moderator.delete(
+            f'{reviews_url}{archived.pk}/'
+        ).status_code == 204
+
+        archived.refresh_from_db()
+        assert archived.is_hidden and ArchivedComment.objects.get().is_hidden
+        assert archived.comment_count == 0
+        title.refresh_from_db()
+        assert (title.review_count, title.score_total) == (1, 8), (
+            'Скрытый архивный отзыв не учитывается в рейтинге'
+        )
+        assert APIClient().get(f'{reviews_url}{archived.pk}/').status_code \
+            == 404
+
+        assert moderator.post(
+            f'/api/v1/moderation/reviews/{archived.pk}/restore/'
+        ).status_code == 200
+        title.refresh_from_db()
+        assert (title.review_count, title.score_total) == (2, 12)
+
+    def test_author_deletes_archived(self, title, archived):
+        client = APIClient()
+        client.force_authenticate(archived.author)
+
+        response = client.delete(
+            f'/api/v1/titles/{title.pk}/reviews/{archived.pk}/'
+        )
+
+        assert response.status_code == 204
+        assert not ArchivedReview.objects.exists()
+        assert not ArchivedComment.objects.exists()
+        title.refresh_from_db()
+        assert (title.review_count, title.score_total) == (1, 8)
@@ -0,0 +1,59 @@
+import pytest
+from rest_framework.test import APIClient
+
+from reviews.models import Review, Title, User
+
+
+BATCH_URL = '/api/v1/batch/'
+
+
+@pytest.fixture
+def author():
+    return User.objects.create(username='author', email='author@yamdb.fake')
+
+
+@pytest.fixture
+def title():
+    return Title.objects.create(name='Фильм', year=2000)
+
+
+@pytest.mark.django_db
+class TestBatch:
+
+    def test_batch_runs_requests_as_outer_user(self, author, title):
+        client = APIClient()
+        client.force_authenticate(author)
+        reviews_url = f'/api/v1/titles/{title.pk}/reviews/'
+
+        response = client.post(BATCH_URL, {'requests': [
+            {'method': 'POST', 'path': reviews_url,
+             'body': {'text': 'Отзыв', 'score': 7}},
+            {'path': reviews_url},
+            {'path': '/api/v1/auth/token/', 'method': 'POST'},
+        ]}, format='json')
+
+        assert response.status_code == 200
+        created, listed, excluded = response.json()
+        assert created['status'] == 201
+        assert Review.objects.get().author == author, (
+            'Подзапрос должен выполняться от пользователя пакета'
+        )
+        assert listed['body']['count'] == 1
+        assert excluded['status'] == 404
+
+    def test_batch_checks_permissions_per_request(self, title):
+        response = APIClient().post(BATCH_URL, {'requests': [
+            {'path': f'/api/v1/titles/{title.pk}/'},
+            {'method': 'DELETE', 'path': f'/api/v1/titles/{title.pk}/'},
+        ]}, format='json')
+
+        assert [item['status'] for item in response.json()] == [200, 403]
+        assert Title.objects.filter(pk=title.pk).exists()
+
+    def test_batch_size_limited(self, settings):
+        settings.BATCH_MAX_REQUESTS = 1
+        response = APIClient().post(BATCH_URL, {'requests': [
+            {'path': '/api/v1/titles/'}, {'path': '/api/v1/genres/'},
+        ]}, format='json')
+
+        assert response.status_code == 400
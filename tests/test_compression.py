@@ -0,0 +1,83 @@
+import gzip
+import json
+
+import pytest
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from api import middleware
+from api.middleware import CompressionMiddleware, parse_accept_encoding
+from api.renderers import FastJSONRenderer
+
+
+BODY = json.dumps({'results': ['отзыв'] * 200}).encode()
+
+
+def compressed(accept_encoding, content_type='application/json'):
+    request = RequestFactory().get(
+        '/api/v1/titles/', HTTP_ACCEPT_ENCODING=accept_encoding
+    )
+    response = HttpResponse(BODY, content_type=content_type)
+    return CompressionMiddleware().process_response(request, response)
+
+
+@pytest.fixture
+def no_brotli(monkeypatch):
+    monkeypatch.setattr(middleware, 'brotli', None)
+
+
+class TestCompressionMiddleware:
+
+    def test_parse_accept_encoding(self):
+        assert parse_accept_encoding('gzip;q=0.5, br, *;q=0') == {
+            'gzip': 0.5, 'br': 1.0, '*': 0.0,
+        }
+        assert parse_accept_encoding('') == {}
+
+    def test_json_compressed(self, no_brotli):
+        response = compressed('gzip, deflate')
+        assert response['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(response.content) == BODY
+        assert 'Accept-Encoding' in response['Vary']
+
+    def test_zero_quality_refused(self, no_brotli):
+        for accept_encoding in ('gzip;q=0', 'gzip;q=0.0, identity', '*;q=0'):
+            response = compressed(accept_encoding)
+            assert not response.has_header('Content-Encoding'), (
+                f'{accept_encoding}: кодировка с q=0 недопустима'
+            )
+        assert compressed('*')['Content-Encoding'] == 'gzip'
+
+    def test_highest_quality_wins(self, monkeypatch):
+        monkeypatch.setattr(middleware, 'brotli', gzip)
+        monkeypatch.setattr(
+            CompressionMiddleware, 'compress',
+            lambda self, encoding, content: gzip.compress(content)
+        )
+        assert compressed('br;q=0.5, gzip')['Content-Encoding'] == 'gzip'
+        assert compressed('gzip, br')['Content-Encoding'] == 'br', (
+            'При равных q выбирается первая из COMPRESSION_ENCODINGS'
+        )
+        assert compressed('gzip, br;q=0')['Content-Encoding'] == 'gzip'
+
+    def test_html_not_compressed(self, no_brotli):
+        response = compressed('gzip', content_type='text/html')
+        assert not response.has_header('Content-Encoding'), (
+            'HTML не сжимается из-за атаки BREACH'
+        )
+
+
+class TestFastJSONRenderer:
+
+    def render(self, data):
+        return json.loads(FastJSONRenderer().render(data))
+
+    def test_non_str_keys(self):
+        assert self.render({1: 'a', None: 'b'}) == {'1': 'a', 'null': 'b'}
+
+    def test_big_int_falls_back(self):
+        assert self.render({'id': 2 ** 70}) == {'id': 2 ** 70}
+
+    def test_line_separators_escaped(self):
+        content = FastJSONRenderer().render({'text': '\u2028\u2029'})
+        assert b'\\u2028\\u2029' in content
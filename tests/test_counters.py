@@ -0,0 +1,145 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+
+TITLES_URL = '/api/v1/titles/'
+
+
+def client_for(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+def user(username, role='user'):
+    return User.objects.create(
+        username=username, email=f'{username}@yamdb.fake', role=role
+    )
+
+
+def add_titles(count):
+    category = Category.objects.get_or_create(name='Фильм', slug='movie')[0]
+    genre = Genre.objects.get_or_create(name='Драма', slug='drama')[0]
+    author = User.objects.get_or_create(
+        username='author', email='author@yamdb.fake'
+    )[0]
+    for _ in range(count):
+        title = Title.objects.create(
+            name=f'Фильм {Title.objects.count()}', year=2000,
+            category=category,
+        )
+        title.genre.set((genre,))
+        review = Review.objects.create(
+            title=title, author=author, text='Отзыв', score=7
+        )
+        Comment.objects.create(review=review, author=author, text='Да')
+    return title
+
+
+def queries(url):
+    with CaptureQueriesContext(connection) as context:
+        assert APIClient().get(url).status_code == 200
+    return len(context)
+
+
+@pytest.mark.django_db
+class TestCounterFields:
+
+    def test_counters_only_on_include(self):
+        title = add_titles(1)
+        review = title.reviews.get()
+        reviews_url = f'{TITLES_URL}{title.pk}/reviews/'
+        client = APIClient()
+
+        assert 'review_count' not in client.get(TITLES_URL).json()[
+            'results'
+        ][0], 'Необязательные поля не отдаются по умолчанию'
+        included = client.get(
+            TITLES_URL, {'include': 'review_count'}
+        ).json()['results'][0]
+        assert included['review_count'] == 1
+        assert included['rating'] == 7
+
+        assert 'comment_count' not in client.get(
+            f'{reviews_url}{review.pk}/'
+        ).json()
+        assert client.get(
+            reviews_url, {'include': 'comment_count'}
+        ).json()['results'][0]['comment_count'] == 1
+        assert client.get(
+            reviews_url, {'fields': 'id,comment_count'}
+        ).json()['results'][0] == {'id': review.pk, 'comment_count': 1}
+
+    def test_counters_follow_changes(self):
+        title = Title.objects.create(name='Фильм', year=2000)
+        reviews_url = f'{TITLES_URL}{title.pk}/reviews/'
+        author, other = user('author'), user('other')
+        moderator = client_for(user('moderator', role='moderator'))
+
+        def counters():
+            title.refresh_from_db()
+            return title.review_count, title.score_total, title.rating
+
+        review_id = client_for(author).post(
+            reviews_url, {'text': 'Отзыв', 'score': 6}
+        ).json()['id']
+        client_for(other).post(reviews_url, {'text': 'Отзыв', 'score': 9})
+        assert counters() == (2, 15, 7.5)
+
+        client_for(author).patch(f'{reviews_url}{review_id}/', {'score': 2})
+        assert counters() == (2, 11, 5.5), 'Изменение оценки меняет сумму'
+
+        comments_url = f'{reviews_url}{review_id}/comments/'
+        comment_id = client_for(other).post(
+            comments_url, {'text': 'Не согласен'}
+        ).json()['id']
+        client_for(author).post(comments_url, {'text': 'Согласен'})
+        assert Review.objects.get(pk=review_id).comment_count == 2
+        moderator.delete(f'{comments_url}{comment_id}/')
+        assert Review.objects.get(pk=review_id).comment_count == 1, (
+            'Скрытый комментарий не учитывается'
+        )
+
+        other_review = Review.objects.get(author=other)
+        moderator.delete(f'{reviews_url}{other_review.pk}/')
+        assert counters() == (1, 2, 2.0), 'Скрытый отзыв не учитывается'
+
+        client_for(author).delete(f'{reviews_url}{review_id}/')
+        assert counters() == (0, 0, None)
+
+
+@pytest.mark.django_db
+class TestListQueries:
+
+    def test_titles_constant_queries(self):
+        add_titles(2)
+        few = queries(f'{TITLES_URL}?include=review_count')
+        add_titles(6)
+        assert queries(f'{TITLES_URL}?include=review_count') == few, (
+            'Число запросов списка произведений не зависит от их количества'
+        )
+
+    def test_reviews_constant_queries(self):
+        title = Title.objects.create(name='Фильм', year=2000)
+        url = f'{TITLES_URL}{title.pk}/reviews/?include=comment_count'
+
+        def add_reviews(count):
+            for _ in range(count):
+                review = Review.objects.create(
+                    title=title, author=user(f'user{User.objects.count()}'),
+                    text='Отзыв', score=5,
+                )
+                Comment.objects.create(
+                    review=review, author=review.author, text='Да'
+                )
+
+        add_reviews(2)
+        few = queries(url)
+        add_reviews(6)
+        assert queries(url) == few, (
+            'Число запросов списка отзывов не зависит от их количества'
+        )
@@ -0,0 +1,203 @@
+import asyncio
+import json
+
+import pytest
+from django.db import connection, transaction
+
+from api.events import (
+    Broker, EventIds, PostgresBackend, broker, build, next_id,
+)
+from api.sse import replay, stream
+from reviews.models import Review, Title, User
+
+
+def event(title_id, review_id=1):
+    return build('review', 'created', title_id, None, review=review_id)
+
+
+def delivered_since(log, title_id, since):
+    return [
+        item for item in log.log
+        if item['title'] == title_id and item['id'] > since
+    ]
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+async def streamed(log, title_id, events):
+    """Тела ответа потока SSE после доставки events."""
+    subscription = log.subscribe(title_id)
+    sent = []
+    done = asyncio.Event()
+
+    async def receive():
+        await done.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        sent.append(message['body'])
+        if len(sent) == len(events):
+            done.set()
+
+    for item in events:
+        log.deliver(item)
+    await asyncio.wait_for(stream(subscription, receive, send, 0), 5)
+    return sent
+
+
+class TestBroker:
+
+    def test_since_reports_evicted_events(self):
+        log = Broker(log_size=2, queue_size=10)
+        log.deliver(event(1))
+        first = log.log[0]
+        log.deliver(event(1))
+        log.deliver(event(2))
+        second, third = log.log
+
+        assert log.since(1, second['id']) == ([], True)
+        assert log.since(2, second['id']) == ([third], True)
+        missed, complete = log.since(1, first['id'])
+        assert not complete, (
+            'Если события вытеснены из журнала, клиенту нужен reset'
+        )
+
+    def test_other_process_id_resets(self):
+        log = Broker(log_size=10, queue_size=10)
+        other_process = EventIds()
+        foreign = other_process()
+        log.deliver(event(1))
+
+        assert log.since(1, foreign) == ([], False), (
+            'Id другого процесса не сравнивается с журналом: нужен reset'
+        )
+        sent = []
+
+        async def send(message):
+            sent.append(message['body'])
+
+        assert run(replay(send, 1, foreign)) == 0, (
+            'После reset поток отдаёт все новые события процесса'
+        )
+        assert sent == [b'event: reset\ndata: {}\n\n']
+
+    def test_reset_clears_log(self):
+        log = Broker(log_size=10, queue_size=10)
+        log.deliver(event(1))
+        last = log.log[-1]['id']
+        log.reset()
+        log.deliver(event(1))
+        assert log.since(1, last) == ([], False), (
+            'После потери событий продолжить с прежнего id нельзя'
+        )
+
+    def test_ids_assigned_in_delivery_order(self):
+        log = Broker(log_size=10, queue_size=10)
+        # Транзакция второго события завершилась раньше первой
+        first, second = event(1, review_id=1), event(1, review_id=2)
+        since = next_id()
+
+        sent = run(streamed(log, 1, (second, first)))
+
+        missed = delivered_since(log, 1, since)
+        assert [item['review'] for item in missed] == [2, 1]
+        assert missed[0]['id'] < missed[1]['id'], (
+            'Id возрастают в порядке доставки, а не создания события'
+        )
+        assert [
+            json.loads(body.split(b'data: ')[1])['review'] for body in sent
+        ] == [2, 1], 'Поток не должен пропускать события, пришедшие позже'
+        assert log.since(1, missed[0]['id'])[0] == [missed[1]], (
+            'Переподключение после первого события возвращает второе'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestEvents:
+
+    def test_new_review_published_after_commit(self):
+        since = next_id()
+        title = Title.objects.create(name='Фильм', year=2000)
+        author = User.objects.create(
+            username='author', email='author@yamdb.fake'
+        )
+        review = Review.objects.create(
+            title=title, author=author, text='Отзыв', score=8
+        )
+
+        missed = delivered_since(broker, title.pk, since)
+        assert [item['event'] for item in missed] == ['review.created']
+        assert missed[0]['review'] == review.pk
+        assert missed[0]['data']['author'] == 'author'
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'postgresql', reason='NOTIFY/LISTEN PostgreSQL'
+)
+@pytest.mark.django_db(transaction=True)
+class TestPostgresBackend:
+
+    @staticmethod
+    def publish(backend, item, commit=True):
+        with transaction.atomic():
+            backend.publish(item)
+            transaction.set_rollback(not commit)
+        connection.close()
+
+    async def delivered(self, backend, *items):
+        loop = asyncio.get_event_loop()
+        await backend.start()
+        try:
+            for item, commit in items:
+                await loop.run_in_executor(
+                    None, self.publish, backend, item, commit
+                )
+            for _ in range(50):
+                await asyncio.sleep(0.1)
+                if len(backend.broker.log) >= 1:
+                    await asyncio.sleep(0.2)
+                    break
+            return list(backend.broker.log)
+        finally:
+            loop.remove_reader(backend.fd)
+            backend.listener.close()
+
+    def test_only_committed_events_delivered(self):
+        backend = PostgresBackend(Broker(log_size=10, queue_size=10))
+        log = run(self.delivered(
+            backend,
+            (event(1, review_id=1), False),
+            (event(1, review_id=2), True),
+        ))
+        assert [item['review'] for item in log] == [2], (
+            'События отменённой транзакции не доставляются'
+        )
+
+    def test_reconnect_resets_subscribers(self):
+        backend = PostgresBackend(Broker(log_size=10, queue_size=10))
+
+        async def scenario():
+            subscription = backend.broker.subscribe(1)
+            await backend.start()
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT pg_terminate_backend(%s)',
+                    (backend.listener.get_backend_pid(),)
+                )
+            reset = await asyncio.wait_for(subscription.queue.get(), 5)
+            await self.delivered(backend, (event(1), True))
+            return reset
+
+        reset = run(scenario())
+        assert reset['event'] == 'reset', (
+            'После потери соединения LISTEN подписчики получают reset'
+        )
+        assert [item['event'] for item in backend.broker.log] == [
+            'review.created'
+        ], 'После переподключения события снова доставляются'
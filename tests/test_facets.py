@@ -0,0 +1,73 @@
+import pytest
+from rest_framework.test import APIClient
+
+from reviews.models import Category, Genre, Title
+
+
+TITLES_URL = '/api/v1/titles/'
+FACETS_URL = TITLES_URL + 'facets/'
+
+
+@pytest.fixture
+def catalog():
+    movie = Category.objects.create(name='Фильм', slug='movie')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    comedy = Genre.objects.create(name='Комедия', slug='comedy')
+    first = Title.objects.create(name='Первый', year=2000, category=movie)
+    first.genre.set((drama, comedy))
+    second = Title.objects.create(name='Второй', year=2001, category=movie)
+    second.genre.set((drama,))
+    return movie, drama, comedy
+
+
+def counts(facet):
+    return {
+        item.get('slug', item.get('year')): item['count'] for item in facet
+    }
+
+
+@pytest.mark.django_db
+class TestFacets:
+
+    def test_facets_for_genre_filter(self, catalog):
+        response = APIClient().get(FACETS_URL, {'genre': 'comedy'})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data['count'] == 1
+        assert counts(data['genre']) == {'comedy': 1, 'drama': 2}, (
+            'Счётчики жанров не должны учитывать фильтр по самому жанру'
+        )
+        assert counts(data['category']) == {'movie': 1}
+        assert counts(data['year']) == {2000: 1}
+
+    def test_facets_updated_after_title_change(self, catalog):
+        movie, drama, _ = catalog
+        client = APIClient()
+        client.get(FACETS_URL)
+
+        title = Title.objects.create(name='Третий', year=2002, category=movie)
+        title.genre.set((drama,))
+
+        data = client.get(FACETS_URL).json()
+        assert data['count'] == 3, (
+            'Фасеты должны пересчитываться после изменения произведений'
+        )
+        assert counts(data['genre'])['drama'] == 3
+
+
+@pytest.mark.django_db
+class TestTitleFilter:
+
+    def names(self, **params):
+        response = APIClient().get(TITLES_URL, params)
+        assert response.status_code == 200
+        return sorted(title['name'] for title in response.json()['results'])
+
+    def test_genre_filter(self, catalog):
+        assert self.names(genre='drama') == ['Второй', 'Первый'], (
+            'Произведение с несколькими жанрами выводится один раз'
+        )
+        assert self.names(genre='comedy') == ['Первый']
+        assert self.names(genre='comedy', year=2001) == []
+        assert self.names(genre='horror') == []
@@ -0,0 +1,62 @@
+import csv
+from datetime import datetime, timezone
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Sum
+
+from reviews.generator import TABLES
+from reviews.models import Comment, Review, Title
+
+
+END = '2026-01-01'
+ARGS = ('--scale', '0.01', '--seed', '7', '--end', END)
+
+
+def read_tables(directory):
+    tables = {}
+    for _, name, _ in TABLES.values():
+        with open(directory / name, encoding='utf-8') as csv_file:
+            tables[name] = list(csv.DictReader(csv_file))
+    return tables
+
+
+class TestGenerateData:
+
+    def test_csv_repeats_for_same_seed(self, tmp_path):
+        for name in ('first', 'second'):
+            call_command(
+                'generate_data', '--output', str(tmp_path / name), *ARGS
+            )
+
+        first = read_tables(tmp_path / 'first')
+        assert first == read_tables(tmp_path / 'second'), (
+            'Одинаковый seed должен давать одинаковые данные'
+        )
+        reviews = first['review.csv']
+        pairs = {(row['title_id'], row['author']) for row in reviews}
+        assert len(pairs) == len(reviews), (
+            'Автор не должен оценивать произведение дважды'
+        )
+        assert max(row['pub_date'] for row in reviews) < END
+
+    @pytest.mark.django_db
+    def test_insert_keeps_dates_and_counters(self):
+        call_command('generate_data', '--insert', *ARGS)
+
+        assert Review.objects.exists() and Comment.objects.exists()
+        assert Review.objects.filter(
+            pub_date__gte=datetime(2026, 1, 1, tzinfo=timezone.utc)
+        ).count() == 0, 'Даты отзывов должны сохраняться при вставке'
+        for title in Title.objects.all():
+            assert title.review_count == title.reviews.count(), (
+                'После вставки счётчики должны быть пересчитаны'
+            )
+
+    @pytest.mark.django_db
+    def test_insert_small_batches(self):
+        call_command('generate_data', '--insert', *ARGS, '--batch-size', '1')
+
+        assert Review.objects.count() == Title.objects.aggregate(
+            total=Sum('review_count')
+        )['total'], 'Пачки без комментариев не должны прерывать вставку'
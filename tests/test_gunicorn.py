@@ -0,0 +1,162 @@
+import builtins
+import importlib.util
+import io
+import os
+import time
+from os.path import dirname, join
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+
+from api_yamdb import startup
+
+
+CONFIG = join(dirname(dirname(__file__)), 'api_yamdb', 'gunicorn.conf.py')
+
+
+def load_config(monkeypatch, cpus=2, cpu_max=None, **env):
+    """gunicorn.conf.py с заданными числом CPU, квотой cgroup и окружением."""
+    for name in list(os.environ):
+        if name.startswith('GUNICORN_'):
+            monkeypatch.delenv(name)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    monkeypatch.setattr(
+        os, 'sched_getaffinity', lambda pid: set(range(cpus)), raising=False
+    )
+    real_open = builtins.open
+
+    def fake_open(path, *args, **kwargs):
+        if path != '/sys/fs/cgroup/cpu.max':
+            return real_open(path, *args, **kwargs)
+        if cpu_max is None:
+            raise FileNotFoundError(path)
+        return io.StringIO(cpu_max)
+
+    spec = importlib.util.spec_from_file_location('gunicorn_conf', CONFIG)
+    config = importlib.util.module_from_spec(spec)
+    with mock.patch.object(builtins, 'open', fake_open):
+        spec.loader.exec_module(config)
+    return config
+
+
+def server(preload_app=True):
+    application = object()
+    return SimpleNamespace(
+        cfg=SimpleNamespace(preload_app=preload_app),
+        app=SimpleNamespace(wsgi=lambda: application),
+    )
+
+
+class TestWhenReady:
+
+    def warmed(self, monkeypatch, settings, master, warmup=True):
+        settings.WSGI_WARMUP = warmup
+        calls = []
+        monkeypatch.setattr(
+            startup, 'warmup', lambda *args: calls.append(args)
+        )
+        load_config(monkeypatch).when_ready(master)
+        return calls
+
+    def test_preload_warms_up_master(self, monkeypatch, settings):
+        master = server()
+        assert self.warmed(monkeypatch, settings, master) == [
+            (master.app.wsgi(), settings.WARMUP_PATHS)
+        ]
+
+    def test_no_warmup_without_preload(self, monkeypatch, settings):
+        assert not self.warmed(monkeypatch, settings, server(False)), (
+            'Без preload_app прогрев выполнялся бы в мастере напрасно'
+        )
+
+    def test_warmup_disabled(self, monkeypatch, settings):
+        assert not self.warmed(monkeypatch, settings, server(), False)
+
+
+class Log:
+    """Журнал воркера с метриками statsd."""
+
+    def __init__(self):
+        self.warnings = []
+        self.metrics = {}
+
+    def warning(self, message, *args):
+        self.warnings.append(message % args)
+
+    def histogram(self, name, value):
+        self.metrics[name] = value
+
+    def gauge(self, name, value):
+        self.metrics[name] = value
+
+
+def request(*headers):
+    return SimpleNamespace(path='/api/v1/titles/', headers=list(headers))
+
+
+class TestConfig:
+
+    @pytest.mark.parametrize('cpus, cpu_max, workers', (
+        (4, None, 5),
+        (8, '200000 100000', 3),
+        (8, '50000 100000', 2),
+        (2, 'max 100000', 3),
+    ))
+    def test_gthread_workers(self, monkeypatch, cpus, cpu_max, workers):
+        config = load_config(monkeypatch, cpus=cpus, cpu_max=cpu_max)
+        assert config.worker_class == 'gthread'
+        assert (config.workers, config.threads) == (workers, 4), (
+            'Воркеров на один больше доступных CPU с учётом квоты cgroup'
+        )
+
+    def test_async_workers(self, monkeypatch):
+        config = load_config(
+            monkeypatch, cpus=2, GUNICORN_WORKER_CLASS='gevent'
+        )
+        assert (config.workers, config.threads) == (5, 1)
+
+    def test_environment_overrides(self, monkeypatch):
+        config = load_config(
+            monkeypatch, cpus=16,
+            GUNICORN_WORKERS='3', GUNICORN_THREADS='8',
+            GUNICORN_TIMEOUT='60', GUNICORN_MAX_REQUESTS='1000',
+        )
+        assert (config.workers, config.threads) == (3, 8)
+        assert config.timeout == 60
+        assert (config.max_requests, config.max_requests_jitter) == (
+            1000, 100
+        )
+
+    def test_request_start(self, monkeypatch):
+        config = load_config(monkeypatch)
+        assert config.request_start(
+            request(('HOST', 'yamdb'), ('X-REQUEST-START', 't=1700.25'))
+        ) == 1700.25
+        assert config.request_start(request()) is None
+        assert config.request_start(
+            request(('X-REQUEST-START', 't=-'))
+        ) is None, 'Неверный заголовок не ломает запрос'
+
+    def test_pre_request_queue_time(self, monkeypatch):
+        config = load_config(monkeypatch, GUNICORN_QUEUE_WARNING_MS='100')
+        worker = SimpleNamespace(log=Log(), futures=[1, 2])
+
+        config.pre_request(worker, request(
+            ('X-REQUEST-START', f't={time.time() - 0.5}')
+        ))
+        assert worker.log.metrics['gunicorn.worker.busy'] == 2
+        assert worker.log.metrics['gunicorn.request.queue_time'] >= 500
+        [warning] = worker.log.warnings
+        assert '/api/v1/titles/' in warning
+
+        worker = SimpleNamespace(log=Log())
+        config.pre_request(worker, request(
+            ('X-REQUEST-START', f't={time.time()}')
+        ))
+        assert not worker.log.warnings, (
+            'Короткое ожидание в очереди не попадает в лог'
+        )
+        config.pre_request(worker, request())
+        assert len(worker.log.metrics) == 2
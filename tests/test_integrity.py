@@ -0,0 +1,49 @@
+import pytest
+from django.core.management import CommandError, call_command
+
+from reviews.models import (
+    ArchivedReview, Comment, Genre, Review, Title, TitleGenre, User,
+)
+
+
+@pytest.fixture
+def review():
+    title = Title.objects.create(name='Фильм', year=2000)
+    title.genre.set((Genre.objects.create(name='Драма', slug='drama'),))
+    author = User.objects.create(username='author', email='author@yamdb.fake')
+    review = Review.objects.create(
+        title=title, author=author, text='Отзыв', score=7
+    )
+    Comment.objects.create(review=review, author=author, text='Комментарий')
+    return review
+
+
+@pytest.mark.django_db
+class TestCheckIntegrity:
+
+    def test_clean_data_passes(self, review):
+        call_command('check_integrity')
+
+    def test_defects_found_and_repaired(self, review):
+        Title.objects.update(review_count=5)
+        Review.objects.update(comment_count=0)
+        TitleGenre.objects.update(trending=1)
+        ArchivedReview.objects.create(
+            id=review.pk + 1, title=review.title, author=review.author,
+            text='Повтор', score=3, pub_date=review.pub_date,
+        )
+
+        with pytest.raises(CommandError):
+            call_command('check_integrity', '--chunk-size', '1')
+        call_command('check_integrity', '--repair')
+
+        title = Title.objects.get()
+        assert (title.review_count, title.score_total) == (1, 7), (
+            'Счётчики произведения должны быть пересчитаны'
+        )
+        assert Review.objects.get().comment_count == 1
+        assert not ArchivedReview.objects.exists(), (
+            'Повтор отзыва в архиве должен быть удалён'
+        )
+        assert TitleGenre.objects.get().trending == title.trending
+        call_command('check_integrity')
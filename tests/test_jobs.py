@@ -0,0 +1,123 @@
+import threading
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.db import DatabaseError
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from jobs import queue
+from jobs.management.commands.run_worker import Command
+from jobs.models import Job
+
+
+@pytest.fixture
+def failing_task(monkeypatch):
+    def handler():
+        raise ValueError('сбой')
+
+    monkeypatch.setitem(queue.HANDLERS, 'failing', handler)
+    return 'failing'
+
+
+def make_ready(job):
+    Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+
+
+@pytest.mark.django_db
+class TestQueue:
+
+    def test_idempotency_key_collapses_pending(self):
+        first = queue.enqueue('task', {'id': 1}, idempotency_key='title-1')
+        assert queue.enqueue('task', {'id': 1}, idempotency_key='title-1') \
+            is None, 'Ожидающая задача с тем же ключом уже есть'
+        assert Job.objects.get().pk == first.pk
+
+        queue.claim()
+        assert queue.enqueue('task', idempotency_key='title-1') is not None, (
+            'Ключ занят только ожидающей задачей, не выполняемой'
+        )
+
+    def test_retry_with_backoff(self, settings, failing_task):
+        settings.JOBS_RETRY_BACKOFF = 10
+        job = queue.enqueue(failing_task, max_attempts=3)
+
+        for attempt, delay in ((1, 10), (2, 20)):
+            started = timezone.now()
+            assert queue.run(queue.claim()) is False
+            job.refresh_from_db()
+            assert (job.status, job.attempts) == (Job.PENDING, attempt)
+            assert 'сбой' in job.last_error
+            assert job.run_after >= started + timedelta(seconds=delay), (
+                'Задержка повтора должна удваиваться'
+            )
+            assert queue.claim() is None, 'Задача ждёт до run_after'
+            make_ready(job)
+
+        queue.run(queue.claim())
+        job.refresh_from_db()
+        assert (job.status, job.attempts) == (Job.FAILED, 3), (
+            'После max_attempts задача не повторяется'
+        )
+        make_ready(job)
+        assert queue.claim() is None
+
+    def test_stale_running_reclaimed(self, settings):
+        settings.JOBS_LOCK_TIMEOUT = 60
+        job = queue.enqueue('task')
+        assert queue.claim().pk == job.pk
+        assert queue.claim() is None, (
+            'Задачу с живым воркером нельзя захватить повторно'
+        )
+
+        Job.objects.filter(pk=job.pk).update(
+            locked_at=timezone.now() - timedelta(seconds=61)
+        )
+        reclaimed = queue.claim()
+        assert reclaimed.pk == job.pk, 'Брошенная задача захватывается снова'
+        assert (reclaimed.status, reclaimed.attempts) == (Job.RUNNING, 2)
+
+    def test_claims_do_not_repeat(self):
+        jobs = {queue.enqueue('task').pk for _ in range(2)}
+        claimed = {queue.claim().pk, queue.claim().pk}
+        assert claimed == jobs, 'Каждая задача захватывается один раз'
+        assert queue.claim() is None
+
+    def test_claim_skips_job_taken_by_another_worker(self, monkeypatch):
+        job = queue.enqueue('task')
+        update = QuerySet.update
+
+        def concurrent_update(records, **values):
+            # Между выборкой и обновлением задачу забрал другой воркер
+            monkeypatch.setattr(QuerySet, 'update', update)
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.RUNNING, locked_at=timezone.now(), attempts=1
+            )
+            return update(records, **values)
+
+        monkeypatch.setattr(QuerySet, 'update', concurrent_update)
+        assert queue.claim() is None, (
+            'Задача, захваченная другим воркером, не захватывается'
+        )
+        assert Job.objects.get().attempts == 1
+
+
+@pytest.mark.django_db
+class TestWorker:
+
+    def test_database_error_does_not_stop_thread(self, settings, monkeypatch):
+        settings.JOBS_POLL_INTERVAL = 0
+        command = Command(stdout=StringIO())
+        command.stopping = threading.Event()
+        calls = []
+
+        def claim():
+            calls.append(1)
+            if len(calls) == 1:
+                raise DatabaseError('соединение потеряно')
+            command.stopping.set()
+
+        monkeypatch.setattr(queue, 'claim', claim)
+        command.work()
+        assert len(calls) == 2, 'После ошибки БД поток продолжает работу'
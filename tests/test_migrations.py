@@ -0,0 +1,85 @@
+import pytest
+from django.db import IntegrityError, connection
+from django.db.migrations.executor import MigrationExecutor
+
+
+BEFORE = [('reviews', '0007_moderation')]
+AFTER = [('reviews', '0009_title_genre_through')]
+BEFORE_EMAIL = [('reviews', '0005_user_search_indexes')]
+AFTER_EMAIL = [('reviews', '0006_user_email_unique')]
+
+
+def migrate(targets):
+    executor = MigrationExecutor(connection)
+    executor.loader.build_graph()
+    executor.migrate(targets)
+    return executor.loader.project_state(targets).apps
+
+
+@pytest.fixture(autouse=True)
+def latest_schema():
+    yield
+    executor = MigrationExecutor(connection)
+    migrate(executor.loader.graph.leaf_nodes())
+
+
+@pytest.mark.django_db(transaction=True)
+class TestMergeTitleGenre:
+
+    def test_links_merged_without_duplicates(self):
+        apps = migrate(BEFORE)
+        Title = apps.get_model('reviews', 'Title')
+        Genre = apps.get_model('reviews', 'Genre')
+        TitleGenre = apps.get_model('reviews', 'TitleGenre')
+        first = Title.objects.create(name='Первое', year=2000)
+        second = Title.objects.create(name='Второе', year=2001)
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        comedy = Genre.objects.create(name='Комедия', slug='comedy')
+        first.genre.add(drama, comedy)
+        second.genre.add(drama)
+        TitleGenre.objects.bulk_create([
+            TitleGenre(title=first, genre=drama),
+            TitleGenre(title=first, genre=drama),
+            TitleGenre(title=second, genre=comedy),
+            TitleGenre(title=second, genre=None),
+        ])
+
+        apps = migrate(AFTER)
+        TitleGenre = apps.get_model('reviews', 'TitleGenre')
+        links = list(TitleGenre.objects.values_list(
+            'title__name', 'genre__slug'
+        ))
+        assert sorted(links) == [
+            ('Второе', 'comedy'), ('Второе', 'drama'),
+            ('Первое', 'comedy'), ('Первое', 'drama'),
+        ], 'Связи обеих таблиц объединяются без дублей и пустых строк'
+        assert 'reviews_title_genre' not in (
+            connection.introspection.table_names()
+        ), 'Автоматическая таблица связей удаляется'
+
+
+@pytest.mark.django_db(transaction=True)
+class TestUserEmailUnique:
+
+    def test_duplicate_emails_listed(self):
+        User = migrate(BEFORE_EMAIL).get_model('reviews', 'User')
+        for username, email in (
+            ('first', 'same@yamdb.fake'), ('second', 'same@yamdb.fake'),
+            ('third', 'other@yamdb.fake'), ('empty', ''), ('blank', ''),
+        ):
+            User.objects.create(username=username, email=email)
+
+        with pytest.raises(IntegrityError) as error:
+            migrate(AFTER_EMAIL)
+        assert 'same@yamdb.fake: first, second' in str(error.value), (
+            'Ошибка миграции должна перечислять повторы email'
+        )
+        assert 'other@yamdb.fake' not in str(error.value)
+
+        User.objects.filter(username='second').update(
+            email='second@yamdb.fake'
+        )
+        User = migrate(AFTER_EMAIL).get_model('reviews', 'User')
+        assert User.objects.count() == 5, (
+            'Пустой email допустим у нескольких пользователей'
+        )
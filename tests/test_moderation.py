@@ -0,0 +1,106 @@
+import pytest
+from rest_framework.test import APIClient
+
+from jobs.models import Job
+from reviews.models import Category, Review, Title, User
+
+
+def client_for(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.fixture
+def title():
+    category = Category.objects.create(name='Фильм', slug='movie')
+    return Title.objects.create(name='Фильм', year=2000, category=category)
+
+
+@pytest.fixture
+def moderator():
+    return User.objects.create(
+        username='moderator', email='moderator@yamdb.fake', role='moderator'
+    )
+
+
+@pytest.fixture
+def review(title):
+    author = User.objects.create(
+        username='author', email='author@yamdb.fake'
+    )
+    Review.objects.create(title=title, author=author, text='Отзыв', score=8)
+    return Review.objects.get(title=title, author=author)
+
+
+def review_url(review):
+    return f'/api/v1/titles/{review.title_id}/reviews/{review.pk}/'
+
+
+@pytest.mark.django_db
+class TestModeration:
+
+    def test_moderator_delete_hides_review(self, moderator, review):
+        response = client_for(moderator).delete(review_url(review))
+
+        assert response.status_code == 204
+        review.refresh_from_db()
+        assert review.is_hidden, (
+            'Удаление чужого отзыва модератором должно скрывать отзыв'
+        )
+        title = Title.objects.get(pk=review.title_id)
+        assert (title.review_count, title.score_total) == (0, 0), (
+            'Скрытый отзыв не должен учитываться в рейтинге произведения'
+        )
+        assert APIClient().get(review_url(review)).status_code == 404
+
+    def test_restore_returns_review_to_rating(self, moderator, review):
+        client = client_for(moderator)
+        client.delete(review_url(review))
+        queue = client.get('/api/v1/moderation/reviews/').json()
+        assert [item['id'] for item in queue['results']] == [review.pk]
+
+        response = client.post(
+            f'/api/v1/moderation/reviews/{review.pk}/restore/'
+        )
+
+        assert response.status_code == 200
+        title = Title.objects.get(pk=review.title_id)
+        assert (title.review_count, title.score_total) == (1, 8)
+        assert APIClient().get(review_url(review)).status_code == 200
+
+    def test_hide_and_restore_republish_snapshots(
+        self, settings, moderator, review
+    ):
+        settings.SNAPSHOT_ON_WRITE = True
+        client = client_for(moderator)
+
+        def republished():
+            jobs = Job.objects.filter(
+                name='publish_title_snapshots',
+                payload__contains=f'"title_id": {review.title_id}',
+            )
+            found = jobs.exists()
+            Job.objects.all().delete()
+            return found
+
+        client.delete(review_url(review))
+        assert republished(), (
+            'Скрытие отзыва меняет рейтинг: снимки перепубликуются'
+        )
+        client.post(f'/api/v1/moderation/reviews/{review.pk}/restore/')
+        assert republished(), 'Восстановление отзыва перепубликует снимки'
+
+    def test_author_delete_removes_review(self, review):
+        response = client_for(review.author).delete(review_url(review))
+
+        assert response.status_code == 204
+        assert not Review.objects.filter(pk=review.pk).exists()
+        assert Title.objects.get(pk=review.title_id).review_count == 0
+
+    def test_queue_only_for_moderators(self, review):
+        response = client_for(review.author).get(
+            '/api/v1/moderation/reviews/'
+        )
+
+        assert response.status_code == 403
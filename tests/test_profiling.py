@@ -0,0 +1,77 @@
+import json
+import os
+
+import pytest
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from reviews.models import User
+
+
+URL = '/api/v1/titles/'
+
+
+@pytest.fixture
+def profiles(settings, tmp_path):
+    settings.PROFILING_ENABLED = True
+    settings.PROFILING_ROOT = str(tmp_path)
+    return tmp_path
+
+
+def client_for(role=None):
+    """Клиент с JWT: профилирование проверяет токен до DRF."""
+    client = APIClient()
+    if role is not None:
+        user = User.objects.create(
+            username=role, email=f'{role}@yamdb.fake', role=role
+        )
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+        )
+    return client
+
+
+@pytest.mark.django_db
+class TestProfiling:
+
+    @pytest.mark.parametrize('role', (None, 'user', 'moderator'))
+    def test_not_admin_not_profiled(self, profiles, role):
+        client = client_for(role)
+        for response in (
+            client.get(URL, HTTP_X_PROFILE='all'),
+            client.get(URL, {'profile': 'cprofile'}),
+        ):
+            assert response.status_code == 200
+            assert 'X-Profile-Id' not in response
+            assert 'Server-Timing' not in response
+        assert not os.listdir(profiles), (
+            'Профили сохраняются только для администраторов'
+        )
+
+    def test_invalid_token_not_profiled(self, profiles):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION='Bearer invalid')
+        response = client.get(URL, HTTP_X_PROFILE='all')
+        assert 'X-Profile-Id' not in response
+        assert not os.listdir(profiles)
+
+    def test_admin_profile_saved(self, profiles):
+        response = client_for('admin').get(URL, HTTP_X_PROFILE='all')
+
+        assert response.status_code == 200
+        profile_id = response['X-Profile-Id']
+        assert os.listdir(profiles) == [profile_id]
+        directory = profiles / profile_id
+        assert sorted(os.listdir(directory)) == [
+            'profile.pstats', 'request.json', 'stacks.collapsed'
+        ]
+        summary = json.loads((directory / 'request.json').read_text())
+        assert summary['path'] == URL
+        assert summary['status'] == 200
+        assert summary['queries'], 'В профиль попадают SQL-запросы'
+        assert 'sql;dur=' in response['Server-Timing']
+
+    def test_admin_without_header_not_profiled(self, profiles):
+        response = client_for('admin').get(URL)
+        assert 'X-Profile-Id' not in response
+        assert not os.listdir(profiles)
@@ -0,0 +1,109 @@
+import pytest
+from rest_framework.test import APIClient
+
+from api.events import broker, next_id
+from jobs import queue
+from jobs.models import Job
+from reviews import trending
+from reviews.deletion import Purge
+from reviews.models import Comment, Genre, Review, Title, TitleGenre, User
+
+
+@pytest.fixture
+def spammer():
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    spammer = User.objects.create(username='spammer', email='s@yamdb.fake')
+    reader = User.objects.create(username='reader', email='r@yamdb.fake')
+    for number in range(3):
+        title = Title.objects.create(name=f'Фильм {number}', year=2000)
+        title.genre.set((drama,))
+        review = Review.objects.create(
+            title=title, author=spammer, text='Спам', score=10
+        )
+        Comment.objects.create(review=review, author=reader, text='Ответ')
+        Comment.objects.create(review=review, author=spammer, text='Спам')
+    kept = Review.objects.create(
+        title=title, author=reader, text='Отзыв', score=4
+    )
+    Comment.objects.create(review=kept, author=spammer, text='Спам')
+    return spammer
+
+
+@pytest.mark.django_db(transaction=True)
+class TestPurge:
+
+    def test_chunked_user_purge(self, settings, spammer):
+        settings.SNAPSHOT_ON_WRITE = True
+        since = next_id()
+        progress = []
+        purge = Purge(chunk_size=2, progress=lambda deleted: progress.append(
+            dict(deleted)
+        ))
+        purge.user(spammer.pk)
+
+        assert purge.deleted == {'comments': 7, 'reviews': 3}
+        assert len(progress) > 2, 'Удаление идёт пачками'
+        assert not User.objects.filter(pk=spammer.pk).exists()
+        assert Review.objects.get().comment_count == 0
+        for title in Title.objects.all():
+            assert title.review_count == title.reviews.count()
+            assert trending.current(title.trending) == pytest.approx(
+                4 if title.reviews.exists() else 0, rel=1e-3
+            ), 'Удалённые отзывы вычитаются из популярности'
+        assert not TitleGenre.objects.exclude(
+            trending__in=Title.objects.values('trending')
+        ).exists()
+
+        events = [
+            item['event']
+            for title in Title.objects.all()
+            for item in broker.log
+            if item['title'] == title.pk and item['id'] > since
+        ]
+        assert events.count('review.deleted') == 3, (
+            'Подписчики получают события об удалённых пачкой отзывах'
+        )
+        assert events.count('comment.deleted') == 7
+        assert list(Job.objects.values_list('name', flat=True)) == [
+            'publish_snapshots'
+        ], 'Снимки перепубликуются одной задачей на всё удаление'
+
+
+@pytest.mark.django_db
+class TestPurgeApi:
+
+    @pytest.fixture
+    def admin_client(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create(
+            username='admin', email='admin@yamdb.fake', role='admin'
+        ))
+        return client
+
+    def test_small_purge_runs_in_request(self, admin_client, spammer):
+        response = admin_client.delete('/api/v1/users/spammer/')
+
+        assert response.status_code == 204
+        assert not Review.objects.filter(author=spammer).exists()
+
+    def test_large_purge_runs_in_background(
+        self, settings, admin_client, spammer
+    ):
+        settings.PURGE_SYNC_LIMIT = 1
+        response = admin_client.delete('/api/v1/users/spammer/')
+
+        assert response.status_code == 202
+        assert User.objects.filter(pk=spammer.pk).exists(), (
+            'Большое удаление выполняется не во время запроса'
+        )
+        assert admin_client.delete(
+            '/api/v1/users/spammer/'
+        ).status_code == 202
+        assert Job.objects.filter(name='purge_user').count() == 1, (
+            'Повторный запрос не ставит задачу второй раз'
+        )
+
+        queue.run_pending()
+        assert not User.objects.filter(pk=spammer.pk).exists()
+        assert not Comment.objects.filter(author=spammer).exists()
+        assert Review.objects.get().comment_count == 0
@@ -0,0 +1,24 @@
+from api.querylog import fingerprint, normalize
+
+
+class TestQueryLog:
+
+    def test_normalize_replaces_values(self):
+        sql = (
+            "SELECT * FROM reviews_title WHERE name = 'O''Brien' "
+            'AND year > 1999 AND category_id = %s'
+        )
+        assert normalize(sql) == (
+            'SELECT * FROM reviews_title WHERE name = ? '
+            'AND year > ? AND category_id = ?'
+        )
+
+    def test_in_lists_share_fingerprint(self):
+        assert fingerprint(
+            'SELECT * FROM reviews_review WHERE id IN (%s, %s, %s)'
+        ) == fingerprint(
+            'SELECT * FROM reviews_review WHERE id IN (%s)'
+        ), 'Списки IN разной длины должны давать один отпечаток'
+
+    def test_identifiers_with_digits_kept(self):
+        assert normalize('SELECT t1.id FROM t1') == 'SELECT t1.id FROM t1'
@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from reviews.models import Review, Title, TitleSimilarity, User
+
+
+@pytest.fixture
+def ratings():
+    titles = [
+        Title.objects.create(name=name, year=2000)
+        for name in ('Первый', 'Второй', 'Третий')
+    ]
+    scores = {
+        'first': (10, 9, 1),
+        'second': (9, 10, 2),
+        'third': (1, 2, 10),
+    }
+    for username, row in scores.items():
+        author = User.objects.create(
+            username=username, email=f'{username}@yamdb.fake'
+        )
+        for title, score in zip(titles, row):
+            Review.objects.create(
+                title=title, author=author, text='Отзыв', score=score
+            )
+    return titles
+
+
+@pytest.mark.django_db
+class TestRecommendations:
+
+    def test_similar_titles_ordered_by_cosine(self, ratings):
+        first, second, third = ratings
+        call_command('build_recommendations', '--block-size', '2')
+
+        response = APIClient().get(f'/api/v1/titles/{first.pk}/similar/')
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [item['id'] for item in data] == [second.pk, third.pk], (
+            'Похожие произведения должны быть упорядочены по сходству'
+        )
+        assert data[0]['similarity'] == pytest.approx(0.9919, abs=1e-4)
+
+    def test_incremental_matches_full_rebuild(self, ratings):
+        Review.objects.update(pub_date=timezone.now() - timedelta(days=2))
+        call_command('build_recommendations')
+        fourth = Title.objects.create(name='Четвёртый', year=2000)
+        for username, score in (('first', 8), ('second', 7)):
+            Review.objects.create(
+                title=fourth, author=User.objects.get(username=username),
+                text='Отзыв', score=score,
+            )
+
+        call_command('build_recommendations', '--since-hours', '1')
+        incremental = set(TitleSimilarity.objects.values_list(
+            'title', 'similar', 'score'
+        ))
+        call_command('build_recommendations')
+        full = set(TitleSimilarity.objects.values_list(
+            'title', 'similar', 'score'
+        ))
+        assert incremental == full, (
+            'Пересчёт изменившихся произведений должен совпадать с полным'
+        )
+        assert (ratings[0].pk, fourth.pk) in {pair[:2] for pair in full}
@@ -0,0 +1,67 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from reviews.models import User
+
+
+SIGNUP_URL = '/api/v1/auth/signup/'
+
+
+def user_queries(captured):
+    return [
+        query['sql'] for query in captured
+        if 'reviews_user' in query['sql']
+    ]
+
+
+@pytest.mark.django_db
+class TestSignUp:
+
+    def test_signup_single_user_query(self):
+        client = APIClient()
+        with CaptureQueriesContext(connection) as captured:
+            response = client.post(
+                SIGNUP_URL,
+                {'username': 'new_user', 'email': 'new_user@yamdb.fake'},
+                format='json'
+            )
+
+        assert response.status_code == 200, (
+            'Проверьте, что регистрация нового пользователя возвращает 200'
+        )
+        queries = user_queries(captured.captured_queries)
+        assert len(queries) == 1, (
+            'Регистрация нового пользователя должна выполнять один запрос '
+            f'к таблице пользователей, выполнено: {queries}'
+        )
+
+    def test_signup_existing_user(self):
+        User.objects.create(username='old_user', email='old_user@yamdb.fake')
+        response = APIClient().post(
+            SIGNUP_URL,
+            {'username': 'old_user', 'email': 'old_user@yamdb.fake'},
+            format='json'
+        )
+
+        assert response.status_code == 200, (
+            'Проверьте, что повторная регистрация с теми же username и email '
+            'возвращает 200'
+        )
+        assert User.objects.filter(username='old_user').count() == 1
+
+    def test_signup_taken_email(self):
+        User.objects.create(username='old_user', email='old_user@yamdb.fake')
+        response = APIClient().post(
+            SIGNUP_URL,
+            {'username': 'other_user', 'email': 'old_user@yamdb.fake'},
+            format='json'
+        )
+
+        assert response.status_code == 400, (
+            'Проверьте, что регистрация с занятым email возвращает 400'
+        )
+        assert list(response.json()) == ['email'], (
+            'Проверьте, что ошибка занятого email относится к полю email'
+        )
@@ -0,0 +1,126 @@
+import json
+import os
+
+import pytest
+from django.core.management import call_command
+
+from api import snapshots
+from jobs import queue
+from jobs.models import Job
+from reviews.models import Category, Genre, Review, Title, User
+
+
+@pytest.fixture
+def snapshot_root(settings, tmp_path):
+    settings.SNAPSHOT_ROOT = str(tmp_path)
+    settings.SNAPSHOT_PAGES = 3
+    return tmp_path
+
+
+@pytest.fixture
+def catalog():
+    movie = Category.objects.create(name='Фильм', slug='movie')
+    book = Category.objects.create(name='Книга', slug='book')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    comedy = Genre.objects.create(name='Комедия', slug='comedy')
+    for number in range(12):
+        title = Title.objects.create(
+            name=f'Фильм {number}', year=2000, category=movie
+        )
+        title.genre.set((drama,))
+    title = Title.objects.create(name='Книга', year=2000, category=book)
+    title.genre.set((comedy,))
+    return title
+
+
+def read(root, name):
+    with open(root / 'api' / 'v1' / name, encoding='utf-8') as snapshot:
+        return json.load(snapshot)
+
+
+@pytest.mark.django_db
+class TestPublish:
+
+    def test_pages_with_relative_links(self, snapshot_root, catalog):
+        call_command('publish_snapshots')
+
+        first = read(snapshot_root, 'titles/index.json')
+        assert first['count'] == 13
+        assert first['next'] == '/api/v1/titles/?page=2', (
+            'Ссылки снимков не должны вести на адрес сервера рендеринга'
+        )
+        second = read(snapshot_root, 'titles/index?page=2.json')
+        assert second['previous'] == '/api/v1/titles/'
+        assert read(snapshot_root, 'titles/index?genre=comedy.json')[
+            'count'
+        ] == 1
+        assert read(snapshot_root, 'genres/index.json')['count'] == 2
+
+    def test_public_url(self, settings, snapshot_root, catalog):
+        settings.SNAPSHOT_URL = 'https://yamdb.ru/'
+        snapshots.publish(('titles',))
+        assert read(snapshot_root, 'titles/index.json')['next'] == (
+            'https://yamdb.ru/api/v1/titles/?page=2'
+        )
+
+    def test_stale_snapshots_removed(self, snapshot_root, catalog):
+        snapshots.publish(('titles',))
+        Genre.objects.get(slug='comedy').delete()
+        snapshots.publish(('titles',))
+        assert not (
+            snapshot_root / 'api/v1/titles/index?genre=comedy.json'
+        ).exists(), 'Снимки удалённого жанра удаляются'
+
+    def test_review_republishes_only_its_lists(
+        self, settings, snapshot_root, catalog
+    ):
+        settings.SNAPSHOT_ON_WRITE = True
+        snapshots.publish()
+        drama = snapshot_root / 'api/v1/titles/index?genre=drama.json'
+        genres = snapshot_root / 'api/v1/genres/index.json'
+        os.utime(drama, (0, 0))
+        os.utime(genres, (0, 0))
+        Job.objects.all().delete()
+
+        author = User.objects.create(username='author', email='a@yamdb.fake')
+        Review.objects.create(title=catalog, author=author, text='Да', score=9)
+        assert list(Job.objects.values_list('name', flat=True)) == [
+            'publish_title_snapshots'
+        ]
+        queue.run_pending()
+
+        book = read(snapshot_root, 'titles/index?category=book.json')
+        assert book['results'][0]['rating'] == 9
+        assert os.stat(drama).st_mtime == 0, (
+            'Списки, в которые произведение не входит, не перепубликуются'
+        )
+        assert os.stat(genres).st_mtime == 0
+
+
+class TestWriteAtomic:
+
+    def test_replaces_file(self, tmp_path):
+        filename = str(tmp_path / 'a' / 'index.json')
+        snapshots.write_atomic(filename, b'old')
+        snapshots.write_atomic(filename, b'new')
+        with open(filename, 'rb') as snapshot:
+            assert snapshot.read() == b'new'
+        assert os.listdir(tmp_path / 'a') == ['index.json'], (
+            'Временные файлы не должны оставаться'
+        )
+
+    def test_failed_write_keeps_old_file(self, tmp_path, monkeypatch):
+        filename = str(tmp_path / 'index.json')
+        snapshots.write_atomic(filename, b'old')
+
+        def broken_replace(src, dst):
+            raise OSError('диск заполнен')
+
+        monkeypatch.setattr(os, 'replace', broken_replace)
+        with pytest.raises(OSError):
+            snapshots.write_atomic(filename, b'new')
+        with open(filename, 'rb') as snapshot:
+            assert snapshot.read() == b'old', (
+                'При ошибке записи nginx отдаёт прежний снимок'
+            )
+        assert os.listdir(tmp_path) == ['index.json']
@@ -0,0 +1,97 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from reviews.models import Category, Genre, Review, Title, User
+
+
+TITLES_URL = '/api/v1/titles/'
+
+
+@pytest.fixture
+def title():
+    category = Category.objects.create(name='Фильм', slug='movie')
+    title = Title.objects.create(
+        name='Фильм', year=2000, description='Описание', category=category
+    )
+    title.genre.set((Genre.objects.create(name='Драма', slug='drama'),))
+    author = User.objects.create(username='author', email='a@yamdb.fake')
+    Review.objects.create(title=title, author=author, text='Отзыв', score=8)
+    return title
+
+
+def titles(params):
+    """Первое произведение списка и SQL выполненных запросов."""
+    with CaptureQueriesContext(connection) as context:
+        response = APIClient().get(TITLES_URL, params)
+    assert response.status_code == 200
+    return response.json()['results'][0], [
+        query['sql'] for query in context.captured_queries
+    ]
+
+
+def mentions(sql, model):
+    return any(model._meta.db_table in query for query in sql)
+
+
+@pytest.mark.django_db
+class TestSparseFields:
+
+    def test_fields_and_omit_trim_payload(self, title):
+        assert set(titles({'fields': 'id,name'})[0]) == {'id', 'name'}
+        assert set(titles({'omit': 'description,genre'})[0]) == {
+            'id', 'rating', 'category', 'name', 'year'
+        }
+        assert set(titles({'fields': 'id,name', 'omit': 'name'})[0]) == {
+            'id'
+        }, '?omit= убирает поле и из ?fields='
+
+    def test_nested_serializers_not_trimmed(self, title):
+        data = titles({'fields': 'genre,category'})[0]
+        assert data == {
+            'genre': [{'name': 'Драма', 'slug': 'drama'}],
+            'category': {'name': 'Фильм', 'slug': 'movie'},
+        }, 'Поля выбираются только у корневого сериализатора'
+
+    def test_write_requests_return_all_fields(self, title):
+        author = User.objects.create(username='other', email='o@yamdb.fake')
+        client = APIClient()
+        client.force_authenticate(author)
+        response = client.post(
+            f'{TITLES_URL}{title.pk}/reviews/?fields=id',
+            {'text': 'Отзыв', 'score': 5},
+        )
+        assert response.status_code == 201
+        assert set(response.json()) == {
+            'id', 'text', 'author', 'score', 'pub_date'
+        }, 'Запросы на запись не учитывают ?fields='
+
+    def test_omitted_columns_not_selected(self, title):
+        data, sql = titles({'fields': 'id,name'})
+        assert data == {'id': title.pk, 'name': 'Фильм'}
+        assert not mentions(sql, Genre), 'Жанры не загружаются'
+        assert not mentions(sql, Category), 'Категория не присоединяется'
+        assert not any('"description"' in query for query in sql), (
+            'Пропущенные колонки не читаются из БД'
+        )
+
+    def test_omitted_relations_not_prefetched(self, title):
+        data, sql = titles({'omit': 'genre,category'})
+        assert 'genre' not in data
+        assert not mentions(sql, Genre)
+        assert not mentions(sql, Category)
+
+        data, sql = titles({})
+        assert mentions(sql, Genre) and mentions(sql, Category), (
+            'Без ?omit= жанры и категория загружаются'
+        )
+
+    def test_rating_reads_source_fields(self, title):
+        data, sql = titles({'fields': 'id,rating'})
+        assert data == {'id': title.pk, 'rating': 8}, (
+            'Рейтинг считается из колонок Meta.source_fields'
+        )
+        assert len(sql) == 2, (
+            'Колонки рейтинга не дочитываются отдельными запросами'
+        )
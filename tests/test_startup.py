@@ -0,0 +1,65 @@
+import importlib
+import logging
+
+from api_yamdb import startup
+
+
+class Response(list):
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class Application:
+    """WSGI-приложение, запоминающее пути запросов."""
+
+    def __init__(self, status='200 OK', failing=()):
+        self.status = status
+        self.failing = failing
+        self.paths = []
+
+    def __call__(self, environ, start_response):
+        path = environ['PATH_INFO']
+        self.paths.append(path)
+        if path in self.failing:
+            raise RuntimeError('БД недоступна')
+        start_response(self.status, [])
+        return Response([b'{}'])
+
+
+class TestWarmup:
+
+    def test_calls_paths(self):
+        application = Application()
+        startup.warmup(application, ('/api/v1/', '/api/v1/titles/'))
+        assert application.paths == ['/api/v1/', '/api/v1/titles/']
+
+    def test_error_logged(self, caplog):
+        application = Application(failing=('/api/v1/',))
+        with caplog.at_level(logging.WARNING, logger=startup.__name__):
+            startup.warmup(application, ('/api/v1/', '/api/v1/titles/'))
+
+        assert application.paths == ['/api/v1/', '/api/v1/titles/'], (
+            'Ошибка прогрева не прерывает прогрев остальных путей'
+        )
+        [record] = caplog.records
+        assert record.levelno == logging.ERROR
+        assert '/api/v1/' in record.getMessage()
+        assert record.exc_info, 'В лог попадает трассировка ошибки'
+
+    def test_server_error_logged(self, caplog):
+        application = Application(status='500 Internal Server Error')
+        with caplog.at_level(logging.WARNING, logger=startup.__name__):
+            startup.warmup(application, ('/api/v1/',))
+        assert '500' in caplog.records[0].getMessage()
+
+
+def test_wsgi_import_skips_warmup(monkeypatch, settings):
+    settings.WSGI_WARMUP = True
+    calls = []
+    monkeypatch.setattr(startup, 'call', lambda *args: calls.append(args))
+    wsgi = importlib.import_module('api_yamdb.wsgi')
+    importlib.reload(wsgi)
+    assert not calls, 'Импорт wsgi.py не обращается к приложению и БД'
+
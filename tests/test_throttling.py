@@ -0,0 +1,40 @@
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+
+SIGNUP_URL = '/api/v1/auth/signup/'
+
+
+@pytest.fixture
+def one_signup_per_ip(settings):
+    cache.clear()
+    settings.AUTH_THROTTLE_RATES = {'signup': {'ip': '1/h'}}
+    yield
+    cache.clear()
+
+
+def signup(forwarded_for):
+    return APIClient().post(
+        SIGNUP_URL, {}, format='json', HTTP_X_FORWARDED_FOR=forwarded_for
+    )
+
+
+@pytest.mark.django_db
+class TestThrottling:
+
+    def test_forwarded_clients_counted_separately(self, one_signup_per_ip):
+        assert signup('10.0.0.1').status_code == 400
+        assert signup('10.0.0.1').status_code == 429, (
+            'Повторный запрос с того же IP должен быть отклонён'
+        )
+        assert signup('10.0.0.2').status_code == 400, (
+            'У каждого IP клиента должен быть свой лимит'
+        )
+
+    def test_client_forwarded_header_ignored(self, one_signup_per_ip):
+        assert signup('1.1.1.1, 10.0.0.1').status_code == 400
+        assert signup('2.2.2.2, 10.0.0.1').status_code == 429, (
+            'IP клиента берётся из адреса, добавленного nginx, '
+            'а не из присланного клиентом заголовка'
+        )
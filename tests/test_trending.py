@@ -0,0 +1,68 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from reviews import trending
+from reviews.models import Category, Genre, Review, Title, User
+
+
+TRENDING_URL = '/api/v1/titles/trending/'
+
+
+@pytest.fixture
+def titles():
+    movie = Category.objects.create(name='Фильм', slug='movie')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    first = Title.objects.create(name='Первый', year=2000, category=movie)
+    second = Title.objects.create(name='Второй', year=2001, category=movie)
+    second.genre.set((drama,))
+    return first, second
+
+
+def review(title, username, score):
+    author = User.objects.create(
+        username=username, email=f'{username}@yamdb.fake'
+    )
+    return Review.objects.create(
+        title=title, author=author, text='Отзыв', score=score
+    )
+
+
+def ranking(response):
+    return [item['id'] for item in response.json()]
+
+
+@pytest.mark.django_db
+class TestTrending:
+
+    def test_trending_ranked_by_new_reviews(self, titles):
+        first, second = titles
+        review(first, 'first', 3)
+        review(second, 'second', 5)
+        review(second, 'third', 5)
+
+        response = APIClient().get(TRENDING_URL)
+
+        assert response.status_code == 200
+        assert ranking(response) == [second.pk, first.pk]
+        assert response.json()[0]['trending'] == pytest.approx(10, 0.01)
+        genre = APIClient().get(TRENDING_URL, {'genre': 'drama'})
+        assert ranking(genre) == [second.pk], (
+            'Лента жанра должна содержать только произведения жанра'
+        )
+
+    def test_compact_drops_old_and_hidden_reviews(self, titles):
+        first, second = titles
+        old = review(first, 'first', 10)
+        Review.objects.filter(pk=old.pk).update(
+            pub_date=timezone.now() - timedelta(days=365)
+        )
+        hidden = review(second, 'second', 10)
+        Review.objects.filter(pk=hidden.pk).update(is_hidden=True)
+
+        assert trending.compact() == 0
+        assert APIClient().get(TRENDING_URL).json() == [], (
+            'После пересчёта старые и скрытые отзывы не должны учитываться'
+        )
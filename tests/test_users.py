@@ -0,0 +1,87 @@
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from reviews.models import User
+
+
+ME_URL = '/api/v1/users/me/'
+
+
+def client_for(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.fixture
+def user():
+    cache.clear()
+    return User.objects.create(username='user', email='user@yamdb.fake')
+
+
+@pytest.fixture
+def admin():
+    return User.objects.create(
+        username='admin', email='admin@yamdb.fake', role='admin'
+    )
+
+
+@pytest.mark.django_db
+class TestMeCache:
+
+    def test_patch_updates_cached_me(self, user):
+        client = client_for(user)
+        assert client.get(ME_URL).json()['bio'] == ''
+
+        client.patch(ME_URL, {'bio': 'Новое'}, format='json')
+        user.refresh_from_db()
+
+        assert client_for(user).get(ME_URL).json()['bio'] == 'Новое', (
+            'После PATCH /users/me/ ответ из кэша должен обновиться'
+        )
+
+    def test_admin_update_invalidates_me(self, user, admin):
+        client_for(user).get(ME_URL)
+
+        client_for(admin).patch(
+            '/api/v1/users/user/', {'bio': 'От администратора'}, format='json'
+        )
+        user.refresh_from_db()
+
+        assert client_for(user).get(ME_URL).json()['bio'] == (
+            'От администратора'
+        ), 'Изменение администратором должно сбрасывать кэш /users/me/'
+
+
+@pytest.mark.django_db
+class TestUserList:
+
+    @pytest.fixture
+    def users(self, admin):
+        for username, role in (
+            ('anna', 'user'), ('boris', 'moderator'), ('vera', 'moderator'),
+        ):
+            User.objects.create(
+                username=username, email=f'{username}@mail.fake', role=role
+            )
+        return client_for(admin)
+
+    def usernames(self, client, params):
+        response = client.get('/api/v1/users/', params)
+        assert response.status_code == 200
+        return [user['username'] for user in response.json()['results']]
+
+    def test_search_by_username_and_email(self, users):
+        assert self.usernames(users, {'search': 'BOR'}) == ['boris']
+        assert self.usernames(users, {'search': 'vera@mail'}) == ['vera'], (
+            'Поиск должен выполняться и по email'
+        )
+
+    def test_role_filter_and_ordering(self, users):
+        assert self.usernames(users, {'role': 'moderator'}) == [
+            'boris', 'vera'
+        ], 'По умолчанию список упорядочен по username'
+        assert self.usernames(
+            users, {'role': 'moderator', 'ordering': '-username'}
+        ) == ['vera', 'boris']